@@ -38,7 +38,83 @@ class Settings(BaseSettings):
     )
     food_model_dir: Path = Field(default=PROJECT_ROOT / "ml_model" / "saved_models" / "food_cnn")
     disease_model_dir: Path = Field(default=PROJECT_ROOT / "ml_model" / "saved_models" / "disease_model")
+    indian_food_path: Path = Field(default=PROJECT_ROOT / "datasets" / "Updated_Indian_Food_Nutrition_Dataset.xlsx")
+    disease_risk_table_path: Path = Field(
+        default=BACKEND_DIR / "models" / "disease_risk_table.json",
+        description="Precomputed per-food disease risk, built by backend.services.disease_risk_table",
+    )
     food_mapping_path: Path = Field(default=PROJECT_ROOT / "ml_model" / "food_mapping.json")
+    risk_model_path: Path = Field(default=BACKEND_DIR / "models" / "risk_model.pkl")
+    risk_scorer_path: Path = Field(
+        default=BACKEND_DIR / "models" / "risk_model.json",
+        description="Exported LogisticRegression parameters served without scikit-learn",
+    )
+
+    food_model_backend: str = Field(
+        default="auto",
+        description="auto|keras|tflite|onnx; auto prefers model.tflite, then model.onnx, then Keras",
+    )
+
+    food_index_path: Optional[Path] = Field(
+        default=None, description="Reference-dish embedding index (default: <food_model_dir>/food_index)"
+    )
+    food_knn_max_confidence: float = Field(
+        default=0.5, ge=0, le=1, description="Consult the kNN index when softmax confidence is below this"
+    )
+    food_knn_min_similarity: float = Field(
+        default=0.6, ge=-1, le=1, description="...and use its nearest dish if cosine similarity reaches this"
+    )
+
+    # ---- Food CNN micro-batching ----
+    food_batch_max_size: int = Field(default=16, ge=1, description="Flush a batch at this many images")
+    food_batch_max_wait_ms: float = Field(default=10.0, ge=0, description="...or when the oldest has waited this long")
+    image_decode_workers: int = Field(
+        default=0, ge=0, description="Processes for scan image decoding (0 = default thread executor)"
+    )
+    image_decode_slots: int = Field(
+        default=0, ge=0, description="Shared-memory decode slots (0 = 4 per worker); bounds in-flight decodes"
+    )
+    food_warmup_batch_sizes: List[int] = Field(
+        default_factory=lambda: [1, 16],
+        description="Dummy batch sizes run through the food CNN at startup (empty = lazy load)",
+    )
+
+    # ---- Scan uploads ----
+    upload_max_bytes: int = Field(default=10 * 1024 * 1024, ge=1, description="Largest accepted scan upload")
+    upload_max_pixels: int = Field(default=40_000_000, ge=1, description="Width x height limit, from the header")
+    upload_chunk_bytes: int = Field(default=64 * 1024, ge=1024)
+
+    # ---- Executor pools (bulkheads; see backend.services.bulkheads) ----
+    # Each pool admits workers + queue calls; beyond that requests get a 503
+    image_pool_workers: int = Field(default=4, ge=1)
+    image_pool_queue: int = Field(default=32, ge=0)
+    inference_pool_workers: int = Field(default=1, ge=1, description="Batches already run one at a time")
+    inference_pool_queue: int = Field(default=4, ge=0)
+    firestore_pool_workers: int = Field(default=8, ge=1)
+    firestore_pool_queue: int = Field(default=64, ge=0)
+    password_pool_workers: int = Field(default=2, ge=1)
+    password_pool_queue: int = Field(default=16, ge=0)
+    files_pool_workers: int = Field(default=1, ge=1, description="Appends to one CSV are serialized anyway")
+    files_pool_queue: int = Field(default=32, ge=0)
+
+    # ---- Nutrient resolution (see backend.services.nutrient_resolver) ----
+    remote_nutrients_path: Path = Field(
+        default=BACKEND_DIR / "data" / "remote_nutrients.csv",
+        description="Edamam results written back as unified-table rows, served locally afterwards",
+    )
+    nutrient_fuzzy_min_score: float = Field(
+        default=90.0, ge=0, le=100, description="Token-sort similarity (0-100) for a fuzzy local hit"
+    )
+    nutrient_miss_ttl_seconds: int = Field(
+        default=6 * 3600, ge=1, description="How long a name Edamam could not match skips the remote tier"
+    )
+
+    # ---- Edamam nutrient lookups (see backend.services.nutrient_lookup) ----
+    edamam_base_url: str = Field(default="https://api.edamam.com", description="Or a local edamam_stub")
+    edamam_timeout_s: float = Field(default=5.0, gt=0, description="Per-lookup deadline, including slot wait")
+    edamam_max_connections: int = Field(default=10, ge=1, description="Pooled keep-alive connections")
+    edamam_max_concurrency: int = Field(default=8, ge=1, description="Lookups in flight at once")
+    edamam_keepalive_s: float = Field(default=30.0, ge=0)
 
     # ---- Rate limiting ----
     rate_limit_per_minute: int = Field(default=60, ge=1)
@@ -46,6 +122,11 @@ class Settings(BaseSettings):
     # ---- Caching / Redis ----
     redis_url: Optional[str] = Field(default=None, description="e.g. redis://localhost:6379/0")
     cache_ttl_seconds: int = Field(default=3600, ge=1)
+    prediction_cache_ttl_seconds: int = Field(default=86400, ge=1, description="Image -> FoodPrediction cache TTL")
+    prediction_cache_max_items: int = Field(default=10000, ge=1, description="In-memory backend only")
+    prediction_cache_phash: bool = Field(
+        default=False, description="Also match near-identical photos by 64-bit difference hash"
+    )
 
 
 @lru_cache(maxsize=1)
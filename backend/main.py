@@ -13,10 +13,14 @@ from backend.config import get_settings
 from backend.utils.fastapi_app import register_exception_handlers
 from backend.utils.logging import configure_logging
 from backend.utils.rate_limit import RateLimitMiddleware
+from backend.utils.uploads import UploadLimitMiddleware
 
 # Load settings
 _settings = get_settings()
 
+# Scan upload routes (the mobile app posts to /api/food/predict_food)
+SCAN_UPLOAD_PATHS = ("/api/predict_food", "/api/food/predict_food")
+
 # Configure logging
 configure_logging(level="INFO", json_logs=_settings.environment != "dev")
 
@@ -37,17 +41,51 @@ async def lifespan(app: FastAPI):
         data_loader.get_food_safety_df()
         
         # Train model if not exists
-        model_path = "backend/models/risk_model.pkl"
+        model_path = _settings.risk_model_path
         if not os.path.exists(model_path):
             print("risk_model.pkl not found, running ml_trainer...")
             train_model()
+
+        # Export the NumPy scorer for models trained before it existed
+        if os.path.exists(model_path) and not _settings.risk_scorer_path.exists():
+            import joblib
+            from backend.services.risk_scorer import export_risk_model
+
+            export_risk_model(joblib.load(model_path), _settings.risk_scorer_path)
+            print(f"Exported risk scorer to {_settings.risk_scorer_path}")
             
+        # Load disease models once so per-food predictions skip disk I/O
+        from ml_model.training.disease_registry import get_registry
+
+        get_registry().get(_settings.disease_model_dir)
+
+        # Local nutrient store + learned Edamam rows, so lookups never load them inline
+        from backend.services.nutrient_resolver import get_nutrient_resolver
+
+        get_nutrient_resolver().load()
+
+        # Trace the food CNN at the configured batch sizes before reporting ready
+        if _settings.food_warmup_batch_sizes and _settings.food_model_dir.exists():
+            from backend.services.food_model_service import get_food_classifier
+
+            try:
+                print(f"Food model warm-up: {await get_food_classifier().warmup()}")
+            except Exception as e:
+                print(f"Food model warm-up skipped: {e}")
+
         print("Nutribot backend ready")
     except Exception as e:
         print(f"Startup error: {e}")
         
     yield
     # On shutdown
+    from backend.services.bulkheads import close_bulkheads
+    from backend.services.image_pool import close_image_decode_pool
+    from backend.services.nutrient_lookup import close_edamam_client
+
+    close_image_decode_pool()
+    close_bulkheads()
+    await close_edamam_client()
     print("Nutribot backend shutting down")
 
 # Create single app instance
@@ -73,6 +111,9 @@ app.add_middleware(
     requests_per_minute=_settings.rate_limit_per_minute
 )
 
+# Refuse oversized scan uploads from Content-Length before the body is read
+app.add_middleware(UploadLimitMiddleware, max_bytes=_settings.upload_max_bytes, paths=SCAN_UPLOAD_PATHS)
+
 # Include central router
 # This now includes food, chat, auth, and meal routes
 app.include_router(router, prefix="/api")
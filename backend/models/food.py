@@ -7,7 +7,10 @@ from typing import Any, Dict, Optional
 @dataclass(frozen=True)
 class FoodPrediction:
     class_name: str
-    confidence: float
+    confidence: float  # softmax probability of the CNN's top class, also when source is "knn"
+    source: str = "softmax"  # "softmax" (CNN class) or "knn" (nearest reference dish)
+    nutrient_row: Optional[int] = None  # row in the local FoodStore, if the label resolves to one
+    similarity: Optional[float] = None  # cosine similarity to the reference dish (source "knn" only)
 
 
 @dataclass(frozen=True)
@@ -20,4 +23,6 @@ class FoodAnalysisResult:
     disease_flags: Dict[str, Any]
     diet_type: Optional[str]
     recommendation_notes: Optional[str]
+    nutrient_source: Optional[str] = None  # resolver tier, or "label_table" for image labels
+    similarity: Optional[float] = None  # set when the dish came from the kNN reference index
 
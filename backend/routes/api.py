@@ -9,8 +9,13 @@ from .exercise_router import router as exercise_router
 from .chat_router import router as chat_router
 from .safety_router import router as safety_router
 
+from backend.config import get_settings
 from backend.schemas.food import PredictFoodResponse
 from backend.services.food_analysis_service import FoodAnalysisService
+from backend.services.bulkheads import bulkhead_stats
+from backend.services.food_model_service import get_food_classifier
+from backend.services.nutrient_lookup import edamam_stats
+from backend.services.nutrient_resolver import get_nutrient_resolver
 
 # Main API Router
 router = APIRouter()
@@ -31,3 +36,35 @@ _analysis_service = FoodAnalysisService()
 @router.get("/health")
 async def api_health():
     return {"status": "ok", "version": "1.0.0"}
+
+
+@router.get("/health/food-model")
+async def food_model_health():
+    """Micro-batching stats for the food CNN (batch-size histogram, queue delay) and label -> nutrient coverage."""
+    classifier = get_food_classifier()
+    return {
+        "status": "ok",
+        "backend": classifier.backend_name,
+        "batching": classifier.batch_metrics(),
+        "nutrient_resolution": classifier.nutrient_resolution(),
+    }
+
+
+@router.get("/health/nutrients")
+async def nutrient_resolution_health():
+    """Nutrient lookups answered per tier (local, learned, fuzzy, remote, miss) and Edamam client stats."""
+    return {"status": "ok", "resolver": get_nutrient_resolver().stats(), "edamam": edamam_stats()}
+
+
+@router.get("/health/disease-models")
+async def disease_models_health():
+    """Disease models loaded vs skipped (feature mismatch) for the configured model directory."""
+    from ml_model.training.disease_registry import get_registry
+
+    return {"status": "ok", "registry": get_registry().status(get_settings().disease_model_dir)}
+
+
+@router.get("/health/pools")
+async def executor_pools_health():
+    """Per-subsystem executor pools: running, queued, rejected, queue wait."""
+    return {"status": "ok", "pools": bulkhead_stats()}
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from backend.core.database import users_collection
 from passlib.context import CryptContext
+from backend.services.bulkheads import get_bulkhead
 
 router = APIRouter()
 
@@ -32,18 +33,21 @@ def hash_password(password: str) -> str:
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
+def _find_user_by_email(email: str):
+    return users_collection.where("email", "==", email).limit(1).get()
+
 # ===== SIGNUP =====
 @router.post("/signup")
 async def signup(user: SignupRequest):
     # Check if user already exists
-    # Note: Using get() is blocking, but Firestore also has streaming for lists.
-    # For a single check, where().limit(1).get() is usually fine.
-    existing = users_collection.where("email", "==", user.email).limit(1).get()
+    # Blocking Firestore and hashing calls run on their own bounded pools so a
+    # slow backend answers 503 instead of tying up the event loop
+    existing = await get_bulkhead("firestore").run(_find_user_by_email, user.email)
 
     if existing:
         raise HTTPException(status_code=400, detail="User already exists")
 
-    hashed = hash_password(user.password)
+    hashed = await get_bulkhead("password").run(hash_password, user.password)
 
     # Calculate BMI group
     bmi = user.weight / ((user.height / 100) ** 2) if user.height else 0
@@ -71,7 +75,7 @@ async def signup(user: SignupRequest):
     }
 
     # Store in Firestore
-    _, doc_ref = users_collection.add(new_user_data)
+    _, doc_ref = await get_bulkhead("firestore").run(users_collection.add, new_user_data)
 
     return {
         "message": "User created successfully",
@@ -82,7 +86,7 @@ async def signup(user: SignupRequest):
 @router.post("/login")
 async def login(data: LoginRequest):
     # Fetch user by email
-    docs = users_collection.where("email", "==", data.email).limit(1).get()
+    docs = await get_bulkhead("firestore").run(_find_user_by_email, data.email)
 
     if not docs:
         raise HTTPException(status_code=401, detail="Invalid email or password")
@@ -91,7 +95,7 @@ async def login(data: LoginRequest):
     user_data = user_doc.to_dict()
 
     # Validate credentials correctly (fix the bug)
-    if not verify_password(data.password, user_data.get("password", "")):
+    if not await get_bulkhead("password").run(verify_password, data.password, user_data.get("password", "")):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
     # Success: return all user data (excluding password)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from backend.core.database import users_collection
+from backend.services.bulkheads import get_bulkhead
 from backend.services.exercise_service import exercise_service
+from backend.utils.errors import AppError
 
 router = APIRouter()
 
@@ -12,7 +14,7 @@ class ExerciseRecommendationRequest(BaseModel):
 async def recommend_exercise(request: ExerciseRecommendationRequest):
     try:
         # Fetch user data from Firestore
-        user_doc = users_collection.document(request.user_id).get()
+        user_doc = await get_bulkhead("firestore").run(users_collection.document(request.user_id).get)
         
         if not user_doc.exists:
             raise HTTPException(status_code=404, detail="User not found")
@@ -41,5 +43,7 @@ async def recommend_exercise(request: ExerciseRecommendationRequest):
             "recommendations": exercises
         }
         
+    except (HTTPException, AppError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to recommend exercises: {str(e)}")
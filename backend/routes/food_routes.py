@@ -4,8 +4,11 @@ from typing import Optional
 
 from fastapi import APIRouter, File, Form, UploadFile, HTTPException
 
+from backend.config import get_settings
 from backend.schemas.food import PredictFoodResponse
 from backend.services.food_analysis_service import FoodAnalysisService
+from backend.utils.errors import AppError
+from backend.utils.uploads import read_image_upload
 
 router = APIRouter()
 
@@ -18,17 +21,29 @@ async def predict_food(
     food_name: Optional[str] = Form(None),
     user_id: Optional[str] = Form(None),
 ) -> PredictFoodResponse:
+    """
+    `file` is an encoded image (JPEG/PNG/...) or a preprocessed 224x224x3
+    uint8 tensor with an NBT1 header (backend.utils.tensor_upload), which
+    skips server-side decode and resize. Uploads are read in chunks and
+    rejected early when too large (413) or not a supported format (415).
+    """
 
     # Validation
     if not file and not food_name:
         raise HTTPException(status_code=400, detail="Provide image or food_name")
 
     try:
-        content: Optional[bytes] = None
+        content: Optional[bytearray] = None
 
         # Read image if provided
         if file and file.filename:
-            content = await file.read()
+            s = get_settings()
+            content = await read_image_upload(
+                file,
+                max_bytes=s.upload_max_bytes,
+                max_pixels=s.upload_max_pixels,
+                chunk_size=s.upload_chunk_bytes,
+            )
 
         # Call service
         result = await _analysis_service.analyze(
@@ -42,11 +57,15 @@ async def predict_food(
             detected_from_image=result.detected_from_image,
             mapped_food_name=result.mapped_food_name,
             model_confidence=result.model_confidence,
+            similarity=result.similarity,
+            nutrient_source=result.nutrient_source,
             nutrients=result.nutrients,
             disease_suitability=result.disease_flags,
             diet_type=result.diet_type,
             recommendation_notes=result.recommendation_notes,
         )
 
+    except AppError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Food analysis failed: {str(e)}")
@@ -1,30 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, File, UploadFile
 from typing import Dict, Any
-import joblib
-import pandas as pd
-import os
+import io
 
+from backend.config import get_settings
 from backend.core.auth import get_current_user
+from backend.services.cohort_risk import intake_csv_to_frame, score_cohort, score_user_ids, to_records
+from backend.services.risk_scorer import ACTIVITY_MAP, RISK_MAP, get_risk_scorer
+from backend.services.safety_rules import SAFETY_LABEL_RULES
 from backend.utils.firestore_helper import get_user_profile
 
 router = APIRouter()
 
-# Activity level mapping from Task 3
-ACTIVITY_MAP = {
-    "Sedentary": 0,
-    "Lightly Active": 0,
-    "Low": 0,
-    "Moderately Active": 1,
-    "Moderate": 1,
-    "Very Active": 2,
-    "High": 2
-}
-
-RISK_MAP = {
-    0: "Safe",
-    1: "Caution",
-    2: "Danger"
-}
+# Upper bound for one cohort request (Firestore reads are chunked with get_all)
+MAX_BATCH_USERS = 10000
 
 @router.post("/check-safety")
 async def check_safety(
@@ -53,17 +41,11 @@ async def check_safety(
     sodium_remaining = sodium_limit - sodium_consumed
     
     # Step 3 - Rule-based Safety Label
-    safety_label = "Safe"
-    if calorie_remaining < 0:
-        safety_label = "Calorie limit exceeded"
-    elif sodium_remaining < 0:
-        safety_label = "Sodium limit exceeded"
-    elif fiber_remaining == 0:
-        safety_label = "Fiber limit reached"
-    elif fiber_remaining < 2:
-        safety_label = "Restricted – fiber limit critical"
-    elif fiber_remaining < 5:
-        safety_label = "Caution – low fiber budget"
+    safety_label = SAFETY_LABEL_RULES.evaluate({
+        "calorie_remaining": calorie_remaining,
+        "sodium_remaining": sodium_remaining,
+        "fiber_remaining": fiber_remaining,
+    }).label
         
     # Step 4 - ML prediction
     medical_condition = user_profile.get("medical_condition", "Healthy")
@@ -73,28 +55,35 @@ async def check_safety(
     # BMI, Activity_Level_Encoded, Calorie_Target, Calories_Consumed, Protein_Consumed, Carbs_Consumed, Fat_Consumed, Sugar_Consumed, Sodium_Consumed, Sodium_Limit
     if medical_condition in ["Hypertension", "Diabetes Type 2", "Healthy", "Diabetes"]:
         try:
-            model_path = "backend/models/risk_model.pkl"
-            if os.path.exists(model_path):
+            # Build feature vector
+            activity_str = user_profile.get("activity_level", "Sedentary")
+            activity_encoded = ACTIVITY_MAP.get(activity_str, 0)
+
+            features = {
+                'BMI': float(user_profile.get("bmi", 22.0)),
+                'Activity_Level_Encoded': activity_encoded,
+                'Calorie_Target': cal_target,
+                'Calories_Consumed': cal_consumed,
+                'Protein_Consumed': float(user_profile.get("protein_consumed", 0)),
+                'Carbs_Consumed': float(user_profile.get("carbs_consumed", 0)),
+                'Fat_Consumed': float(user_profile.get("fat_consumed", 0)),
+                'Sugar_Consumed': float(user_profile.get("sugar_consumed", 0)),
+                'Sodium_Consumed': sodium_consumed,
+                'Sodium_Limit': sodium_limit
+            }
+
+            # Prefer the exported NumPy scorer; fall back to the sklearn pickle
+            scorer = get_risk_scorer()
+            model_path = get_settings().risk_model_path
+            if scorer is not None:
+                pred = scorer.predict(scorer.rows_from_dicts([features]))[0]
+                ml_risk = RISK_MAP.get(int(pred), "Safe")
+            elif model_path.exists():
+                import joblib
+                import pandas as pd
+
                 model = joblib.load(model_path)
-                
-                # Build feature vector
-                activity_str = user_profile.get("activity_level", "Sedentary")
-                activity_encoded = ACTIVITY_MAP.get(activity_str, 0)
-                
-                features = pd.DataFrame([{
-                    'BMI': float(user_profile.get("bmi", 22.0)),
-                    'Activity_Level_Encoded': activity_encoded,
-                    'Calorie_Target': cal_target,
-                    'Calories_Consumed': cal_consumed,
-                    'Protein_Consumed': float(user_profile.get("protein_consumed", 0)),
-                    'Carbs_Consumed': float(user_profile.get("carbs_consumed", 0)),
-                    'Fat_Consumed': float(user_profile.get("fat_consumed", 0)),
-                    'Sugar_Consumed': float(user_profile.get("sugar_consumed", 0)),
-                    'Sodium_Consumed': sodium_consumed,
-                    'Sodium_Limit': sodium_limit
-                }])
-                
-                pred = model.predict(features)[0]
+                pred = model.predict(pd.DataFrame([features]))[0]
                 ml_risk = RISK_MAP.get(int(pred), "Safe")
         except Exception as e:
             print(f"Error predicting ML risk: {e}")
@@ -120,3 +109,37 @@ async def check_safety(
         "needs_exercise": needs_exercise,
         "message": message
     }
+
+
+@router.post("/check-safety-batch")
+async def check_safety_batch(
+    payload: Dict[str, Any] = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Score many users at once: {"user_ids": [...]} -> risk_level + safety_label per user."""
+    user_ids = payload.get("user_ids")
+    if not isinstance(user_ids, list) or not user_ids:
+        raise HTTPException(status_code=400, detail="user_ids (non-empty list) is required")
+    if len(user_ids) > MAX_BATCH_USERS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_USERS} user_ids per request")
+
+    scored = await score_user_ids([str(u) for u in user_ids])
+    return {"count": len(scored), "results": to_records(scored)}
+
+
+@router.post("/check-safety-batch/csv")
+async def check_safety_batch_csv(
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Score an uploaded CSV in the User_Daily_Intake.csv layout."""
+    content = await file.read()
+    try:
+        frame = intake_csv_to_frame(io.BytesIO(content))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse CSV: {e}")
+    if len(frame) > MAX_BATCH_USERS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_USERS} rows per request")
+
+    scored = score_cohort(frame)
+    return {"count": len(scored), "results": to_records(scored)}
@@ -50,7 +50,15 @@ class PredictFoodResponse(BaseModel):
     food_name: Optional[str] = None
     detected_from_image: bool = False
     mapped_food_name: Optional[str] = Field(default=None, description="Nutrition dataset key after mapping")
-    model_confidence: Optional[float] = None
+    model_confidence: Optional[float] = Field(
+        default=None, description="Softmax probability of the CNN's top class (low when the kNN index was used)"
+    )
+    similarity: Optional[float] = Field(
+        default=None, description="Cosine similarity to the matched reference dish; set only for kNN matches"
+    )
+    nutrient_source: Optional[str] = Field(
+        default=None, description="Where nutrients came from: exact|learned|fuzzy|remote|label_table"
+    )
 
     nutrients: NutrientSummary = Field(default_factory=NutrientSummary)
     disease_suitability: DiseaseSuitability = Field(default_factory=DiseaseSuitability)
@@ -0,0 +1,151 @@
+"""
+Bounded, isolated executor pools per subsystem ("bulkheads").
+
+Blocking work used to share the event loop's default executor, so a burst of
+image decodes or slow Firestore calls could starve password hashing and model
+inference of threads. Each subsystem now gets its own named pool:
+
+    image      scan image decode / resize (thread path; see image_pool)
+    inference  food CNN load, warm-up and batch calls
+    firestore  blocking Firestore client calls
+    password   passlib hash / verify
+    files      local data-file writes (learned nutrient rows)
+
+A `Bulkhead` is a `concurrent.futures.Executor`, so it can be handed to
+`loop.run_in_executor` or `MicroBatcher(executor=...)` directly. At most
+`workers + max_queue` calls are admitted at once; past that `submit` raises
+`ServiceUnavailableError` (503) immediately instead of queueing without bound.
+
+`stats()` reports running / queued counts, rejections and queue wait
+(submit -> start) percentiles per pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.utils.errors import ServiceUnavailableError
+
+POOLS = ("image", "inference", "firestore", "password", "files")
+
+
+class Bulkhead(Executor):
+    def __init__(self, name: str, *, workers: int, max_queue: int, window: int = 1024):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be >= 0")
+        self.name = name
+        self.workers = int(workers)
+        self.max_queue = int(max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"bulkhead-{name}")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._waits_ms: Deque[float] = deque(maxlen=window)
+        self._max_wait_ms = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self._rejected += 1
+                raise ServiceUnavailableError(
+                    f"The {self.name} pool is saturated; try again shortly.",
+                    details={"pool": self.name, "capacity": self.capacity},
+                )
+            self._admitted += 1
+        enqueued = time.perf_counter()
+
+        def _call() -> Any:
+            wait_ms = (time.perf_counter() - enqueued) * 1000.0
+            with self._lock:
+                self._running += 1
+                self._waits_ms.append(wait_ms)
+                self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._admitted -= 1
+                    self._completed += 1
+
+        try:
+            return self._executor.submit(_call)
+        except BaseException:
+            with self._lock:
+                self._admitted -= 1
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """`await` fn(*args) on this pool; raises ServiceUnavailableError when saturated."""
+        return await asyncio.get_running_loop().run_in_executor(self, fn, *args)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = np.fromiter(self._waits_ms, dtype=float) if self._waits_ms else np.zeros(1)
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_ms": {
+                    "p50": float(np.percentile(waits, 50)),
+                    "p95": float(np.percentile(waits, 95)),
+                    "max": float(self._max_wait_ms),
+                },
+            }
+
+
+_pools: Dict[str, Bulkhead] = {}
+_pools_lock = threading.Lock()
+
+
+def get_bulkhead(name: str) -> Bulkhead:
+    """Process-wide pool for one subsystem (see POOLS); sizes come from settings."""
+    if name not in POOLS:
+        raise ValueError(f"Unknown bulkhead {name!r}; expected one of {POOLS}")
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            s = get_settings()
+            pool = _pools[name] = Bulkhead(
+                name,
+                workers=getattr(s, f"{name}_pool_workers"),
+                max_queue=getattr(s, f"{name}_pool_queue"),
+            )
+        return pool
+
+
+def bulkhead_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every pool created so far in this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
+
+def close_bulkheads() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from functools import lru_cache
 
 from backend.config import get_settings
-from backend.utils.cache import RedisJsonCache, TTLCache
+from backend.utils.cache import RedisJsonCache, SingleFlight, TTLCache
 
 
 @lru_cache(maxsize=1)
@@ -13,3 +13,26 @@ def get_cache():
         return RedisJsonCache(s.redis_url, ttl_seconds=s.cache_ttl_seconds)
     return TTLCache(ttl_seconds=s.cache_ttl_seconds)
 
+
+
+@lru_cache(maxsize=1)
+def get_prediction_cache():
+    """Image-content -> FoodPrediction cache, with its own TTL / size limit and key prefix."""
+    s = get_settings()
+    if s.redis_url:
+        return RedisJsonCache(s.redis_url, ttl_seconds=s.prediction_cache_ttl_seconds, key_prefix="nutribot:pred:")
+    return TTLCache(ttl_seconds=s.prediction_cache_ttl_seconds, max_items=s.prediction_cache_max_items)
+
+
+@lru_cache(maxsize=1)
+def get_nutrient_miss_cache():
+    """Normalized food names Edamam had no match for (negative cache)."""
+    s = get_settings()
+    if s.redis_url:
+        return RedisJsonCache(s.redis_url, ttl_seconds=s.nutrient_miss_ttl_seconds, key_prefix="nutribot:miss:")
+    return TTLCache(ttl_seconds=s.nutrient_miss_ttl_seconds, max_items=s.prediction_cache_max_items)
+
+
+@lru_cache(maxsize=1)
+def get_prediction_flights() -> SingleFlight:
+    return SingleFlight()
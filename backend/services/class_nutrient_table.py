@@ -0,0 +1,111 @@
+"""
+Compiled model label -> local nutrient row resolution.
+
+Built once when the food model loads. Each CNN class is resolved through
+food_mapping.json (or, without a mapping entry, its own cleaned name) to a row
+id in the local `FoodStore`: exact normalized-name match first, then a strict
+fuzzy match. The result is an int array indexed by class index (-1 =
+unresolved), so an image prediction reaches its nutrients with one array
+index instead of string munging and a remote lookup.
+
+Extra labels (the kNN index's reference dishes) are resolved the same way.
+The build report lists classes without a mapping entry, mapping targets the
+store does not contain, and fuzzy matches worth reviewing:
+
+    python -m backend.services.class_nutrient_table
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from backend.services.food_store import FoodStore
+
+UNRESOLVED = -1
+
+
+@dataclass
+class ClassNutrientTable:
+    store: FoodStore
+    class_names: List[str]
+    row_ids: np.ndarray  # (n_classes,) int32, UNRESOLVED where no local row
+    by_label: Dict[str, int]  # every resolved label (classes + extra labels) -> row
+    report: Dict[str, Any] = field(default_factory=dict)
+
+    def row_for_class(self, idx: int) -> Optional[int]:
+        row = int(self.row_ids[idx]) if 0 <= idx < len(self.row_ids) else UNRESOLVED
+        return None if row == UNRESOLVED else row
+
+    def row_for_label(self, label: str) -> Optional[int]:
+        return self.by_label.get(label)
+
+    def summary(self) -> Dict[str, Any]:
+        r = self.report
+        return {
+            "classes": len(self.class_names),
+            "resolved": r.get("resolved", 0),
+            "fuzzy": len(r.get("fuzzy", [])),
+            "unmapped": len(r.get("unmapped", [])),
+            "unresolvable": len(r.get("unresolvable", [])),
+        }
+
+
+def build_class_nutrient_table(
+    class_names: Sequence[str],
+    mapping: Mapping[str, str],
+    store: FoodStore,
+    *,
+    extra_labels: Sequence[str] = (),
+) -> ClassNutrientTable:
+    report: Dict[str, Any] = {"resolved": 0, "fuzzy": [], "unmapped": [], "unresolvable": []}
+    row_ids = np.full(len(class_names), UNRESOLVED, dtype=np.int32)
+    by_label: Dict[str, int] = {}
+
+    def resolve(label: str) -> Optional[int]:
+        target = mapping.get(label)
+        if target is None:
+            report["unmapped"].append(label)
+            target = label.replace("_", " ")
+        row = store.row_id(target)
+        if row is None:
+            hit = store.fuzzy_row_id(target)
+            if hit is not None:
+                row = hit[0]
+                report["fuzzy"].append({"label": label, "target": target, "row": store.names[row], "score": round(hit[1], 1)})
+        if row is None:
+            report["unresolvable"].append({"label": label, "target": target})
+        return row
+
+    for i, label in enumerate(class_names):
+        row = resolve(label)
+        if row is not None:
+            row_ids[i] = row
+            by_label[label] = row
+    for label in extra_labels:
+        if label not in by_label:
+            row = resolve(label)
+            if row is not None:
+                by_label[label] = row
+    report["resolved"] = int((row_ids != UNRESOLVED).sum())
+    return ClassNutrientTable(store, list(class_names), row_ids, by_label, report)
+
+
+if __name__ == "__main__":
+    from backend.config import get_settings
+    from backend.services.food_model_service import FoodMapping
+    from backend.services.food_store import get_food_store
+
+    s = get_settings()
+    names_path = s.food_model_dir / "class_names.txt"
+    mapping = FoodMapping().as_dict()
+    classes = (
+        [line.strip() for line in open(names_path, encoding="utf-8") if line.strip()]
+        if names_path.exists()
+        else sorted(mapping)
+    )
+    table = build_class_nutrient_table(classes, mapping, get_food_store())
+    print(json.dumps({"summary": table.summary(), **table.report}, indent=2, ensure_ascii=False))
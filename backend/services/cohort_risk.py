@@ -0,0 +1,237 @@
+"""
+Batch (cohort) risk scoring.
+
+Builds one feature matrix for many users and runs a single vectorized
+`predict`/`predict_proba` with the NumPy risk scorer, alongside the same
+rule-based safety labels (`SAFETY_LABEL_RULES`) that `/safety/check-safety`
+returns per user.
+
+Input is either Firestore user profiles or a CSV shaped like
+`datasets/processed/User_Daily_Intake.csv`.
+
+CLI:
+  python -m backend.services.cohort_risk --csv datasets/processed/User_Daily_Intake.csv --out risk.csv
+  python -m backend.services.cohort_risk --user-ids USR0001 USR0002 --out risk.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.services.risk_scorer import ACTIVITY_MAP, RISK_MAP, RiskScorer, get_risk_scorer
+from backend.services.safety_rules import SAFETY_LABEL_RULES
+
+# Conditions the risk model was trained for (others get "N/A", as in check_safety)
+ML_CONDITIONS = ["Hypertension", "Diabetes Type 2", "Healthy", "Diabetes"]
+
+# Cohort column -> (Firestore profile key, default)
+PROFILE_FIELDS: Dict[str, tuple] = {
+    "bmi": ("bmi", 22.0),
+    "activity_level": ("activity_level", "Sedentary"),
+    "medical_condition": ("medical_condition", "Healthy"),
+    "calorie_target": ("calorie_target", 2000.0),
+    "calories_consumed": ("calories_consumed", 0.0),
+    "fiber_target": ("fiber_target", 25.0),
+    "fiber_consumed": ("fiber_consumed", 0.0),
+    "sodium_limit": ("sodium_limit", 2300.0),
+    "sodium_consumed": ("sodium_consumed", 0.0),
+    "protein_consumed": ("protein_consumed", 0.0),
+    "carbs_consumed": ("carbs_consumed", 0.0),
+    "fat_consumed": ("fat_consumed", 0.0),
+    "sugar_consumed": ("sugar_consumed", 0.0),
+}
+
+# User_Daily_Intake.csv header -> cohort column
+INTAKE_CSV_COLUMNS: Dict[str, str] = {
+    "User ID": "user_id",
+    "BMI": "bmi",
+    "Activity Level": "activity_level",
+    "Medical Condition": "medical_condition",
+    "Calorie Target kcal": "calorie_target",
+    "Calories Consumed kcal": "calories_consumed",
+    "Fiber Target g": "fiber_target",
+    "Fiber Consumed g": "fiber_consumed",
+    "Sodium Limit mg": "sodium_limit",
+    "Sodium Consumed mg": "sodium_consumed",
+    "Protein Consumed g": "protein_consumed",
+    "Carbs Consumed g": "carbs_consumed",
+    "Fat Consumed g": "fat_consumed",
+    "Sugar Consumed g": "sugar_consumed",
+}
+
+# Cohort column feeding each risk model feature
+RISK_FEATURE_SOURCES: Dict[str, str] = {
+    "BMI": "bmi",
+    "Activity_Level_Encoded": "activity_encoded",
+    "Calorie_Target": "calorie_target",
+    "Calories_Consumed": "calories_consumed",
+    "Protein_Consumed": "protein_consumed",
+    "Carbs_Consumed": "carbs_consumed",
+    "Fat_Consumed": "fat_consumed",
+    "Sugar_Consumed": "sugar_consumed",
+    "Sodium_Consumed": "sodium_consumed",
+    "Sodium_Limit": "sodium_limit",
+}
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill defaults and coerce numeric columns exactly like check_safety does per user."""
+    df = df.copy()
+    for col, (_, default) in PROFILE_FIELDS.items():
+        if col not in df.columns:
+            df[col] = default
+        if isinstance(default, float):
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(default).astype(np.float64)
+        else:
+            df[col] = df[col].fillna(default).astype(str)
+    return df
+
+
+def profiles_to_frame(profiles: Mapping[str, Optional[Mapping[str, Any]]]) -> pd.DataFrame:
+    """{uid: profile or None} -> cohort frame. Missing users keep a `found=False` row."""
+    rows: List[Dict[str, Any]] = []
+    for uid, profile in profiles.items():
+        row: Dict[str, Any] = {"user_id": uid, "found": profile is not None}
+        p = profile or {}
+        for col, (key, _) in PROFILE_FIELDS.items():
+            row[col] = p.get(key)
+        rows.append(row)
+    return _normalize(pd.DataFrame(rows, columns=["user_id", "found", *PROFILE_FIELDS]))
+
+
+def intake_csv_to_frame(source) -> pd.DataFrame:
+    """Path or file-like CSV (User_Daily_Intake.csv layout) -> cohort frame."""
+    raw = pd.read_csv(source)
+    raw.columns = [str(c).strip() for c in raw.columns]
+    df = raw[[c for c in INTAKE_CSV_COLUMNS if c in raw.columns]].rename(columns=INTAKE_CSV_COLUMNS)
+    if "user_id" not in df.columns:
+        df.insert(0, "user_id", [f"row{i}" for i in range(len(df))])
+    df["found"] = True
+    return _normalize(df)
+
+
+def score_cohort(df: pd.DataFrame, scorer: Optional[RiskScorer] = None) -> pd.DataFrame:
+    """
+    Score a normalized cohort frame in one pass.
+
+    Adds: calorie/fiber/sodium_remaining, safety_label, risk_level,
+    risk_confidence, needs_exercise, message.
+    """
+    scorer = scorer if scorer is not None else get_risk_scorer()
+    out = df.copy()
+
+    out["calorie_remaining"] = out["calorie_target"] - out["calories_consumed"]
+    out["fiber_remaining"] = out["fiber_target"] - out["fiber_consumed"]
+    out["sodium_remaining"] = out["sodium_limit"] - out["sodium_consumed"]
+    out["safety_label"] = SAFETY_LABEL_RULES.evaluate_batch(out).labels
+
+    risk_level = np.full(len(out), "N/A", dtype=object)
+    risk_conf = np.full(len(out), np.nan)
+    eligible = out["medical_condition"].isin(ML_CONDITIONS).to_numpy(copy=True)
+    if "found" in out.columns:
+        eligible &= out["found"].to_numpy(dtype=bool)
+
+    if scorer is not None and eligible.any():
+        out["activity_encoded"] = out["activity_level"].map(ACTIVITY_MAP).fillna(0).astype(np.float64)
+        cols = [RISK_FEATURE_SOURCES[f] for f in scorer.feature_names]
+        X = out.loc[eligible, cols].to_numpy(dtype=np.float64)
+        proba = scorer.predict_proba(X)
+        best = proba.argmax(axis=1)
+        labels = np.array([RISK_MAP.get(int(c), "Safe") for c in scorer.classes], dtype=object)
+        risk_level[eligible] = labels[best]
+        risk_conf[eligible] = proba[np.arange(len(best)), best]
+        out = out.drop(columns=["activity_encoded"])
+
+    out["risk_level"] = risk_level
+    out["risk_confidence"] = risk_conf
+    out["needs_exercise"] = out["calorie_remaining"] <= 0
+
+    flagged = np.isin(risk_level, ["Caution", "Danger"])
+    out["message"] = np.select(
+        [
+            out["needs_exercise"].to_numpy(),
+            out["safety_label"].to_numpy() != "Safe",
+            flagged,
+        ],
+        [
+            "You've exceeded your calories. Time for some exercise!",
+            "Watch out: " + out["safety_label"].astype(str) + ".",
+            "ML model flagged your diet as " + pd.Series(risk_level, index=out.index).astype(str) + ". Please review your macros.",
+        ],
+        default="You are on track, keep it up!",
+    )
+    return out
+
+
+RESULT_COLUMNS = [
+    "user_id", "found", "medical_condition", "risk_level", "risk_confidence", "safety_label",
+    "calorie_remaining", "fiber_remaining", "sodium_remaining", "needs_exercise", "message",
+]
+
+
+def to_records(scored: pd.DataFrame) -> List[Dict[str, Any]]:
+    """JSON-safe records (NaN -> None)."""
+    cols = [c for c in RESULT_COLUMNS if c in scored.columns]
+    frame = scored[cols].astype(object).where(scored[cols].notna(), None)
+    return frame.to_dict(orient="records")
+
+
+async def score_user_ids(user_ids: Iterable[str], *, chunk_size: int = 300) -> pd.DataFrame:
+    """Fetch profiles with chunked Firestore `get_all` and score them together."""
+    from backend.utils.firestore_helper import get_user_profiles
+
+    profiles = await get_user_profiles(user_ids, chunk_size=chunk_size)
+    return score_cohort(profiles_to_frame(profiles))
+
+
+def _write(scored: pd.DataFrame, out: Optional[Path]) -> None:
+    cols = [c for c in RESULT_COLUMNS if c in scored.columns]
+    if out is None:
+        scored[cols].to_csv(sys.stdout, index=False)
+    elif out.suffix in (".jsonl", ".ndjson"):
+        scored[cols].to_json(out, orient="records", lines=True, force_ascii=False)
+    else:
+        scored[cols].to_csv(out, index=False)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch risk scoring for a cohort of users")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--csv", type=str, help="CSV in User_Daily_Intake.csv layout")
+    src.add_argument("--user-ids", nargs="+", help="Firestore user ids")
+    src.add_argument("--user-ids-file", type=str, help="File with one user id per line")
+    parser.add_argument("--out", type=str, default=None, help=".csv or .jsonl (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=300, help="Firestore get_all chunk size")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.csv:
+        frame = intake_csv_to_frame(args.csv)
+    else:
+        import asyncio
+
+        from backend.utils.firestore_helper import get_user_profiles
+
+        ids = args.user_ids or [l.strip() for l in open(args.user_ids_file, encoding="utf-8") if l.strip()]
+        frame = profiles_to_frame(asyncio.run(get_user_profiles(ids, chunk_size=args.chunk_size)))
+    t1 = time.perf_counter()
+    scored = score_cohort(frame)
+    t2 = time.perf_counter()
+    _write(scored, Path(args.out) if args.out else None)
+
+    print(
+        f"Scored {len(scored)} users: load {t1 - t0:.3f}s, score {t2 - t1:.3f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Precomputed disease suitability for every food in the catalog.
+
+A food's disease flags depend only on its nutrient vector, so they are computed
+once per dataset/model change instead of per request:
+
+    python -m backend.services.disease_risk_table
+
+runs the disease models (`predict_disease_risk_batch`) over the unified food
+table and the Indian food table and writes a JSON artifact keyed by normalized
+food name. Targets without a usable model fall back to the threshold rules
+(`disease_flags_batch`); those carry only the 0/1 flag (no `*_risk` block,
+since rules have no probability), and `entry["sources"]` records which
+targets came from a model and which from rules.
+
+At request time `NutritionService.disease_flags` looks the food up here and
+only evaluates rules for foods the catalog does not know.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.services.safety_rules import disease_flags_batch
+
+TABLE_VERSION = 3
+
+# Indian food sheet column -> (unified feature, scale)
+INDIAN_FOOD_COLUMNS: Dict[str, Tuple[str, float]] = {
+    "Calories kcal": ("energy_kcal", 1.0),
+    "Protein g": ("protein_g", 1.0),
+    "Carbohydrates g": ("carbohydrates_g", 1.0),
+    "Fat g": ("total_fat_g", 1.0),
+    "Fiber g": ("fiber_g", 1.0),
+    "Sugar g": ("sugars_g", 1.0),
+    "Sodium mg": ("sodium_mg", 1.0),
+    "Cholesterol mg": ("cholesterol_mg", 1.0),
+    "Calcium mg": ("calcium_mg", 1.0),
+    "Iron mg": ("iron_mg", 1.0),
+    "VitaminC mg": ("vitamin_c_mg", 1.0),
+    "VitaminA mcg": ("vitamin_a_iu", 3.33),  # mcg RAE -> IU
+}
+
+# Unified feature -> field used by DISEASE_FLAG_RULES
+RULE_FIELDS = {"sugars_g": "sugar", "sodium_mg": "sodium", "total_fat_g": "fat"}
+
+
+def normalize_name(name: Any) -> str:
+    from ml_model.preprocessing.utils import normalize_food_name
+
+    return normalize_food_name(name) if isinstance(name, str) else ""
+
+
+def risk_key(target: str) -> str:
+    """"suitable_diabetes" -> "diabetes_risk" (the key NutritionQAService reads)."""
+    return target.replace("suitable_", "", 1) + "_risk"
+
+
+# ---------- build ----------
+
+
+def load_indian_foods(path: Optional[Path] = None) -> pd.DataFrame:
+    if path is None:
+        from backend.config import get_settings
+
+        path = get_settings().indian_food_path
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame()
+    raw = pd.read_excel(path)
+    raw.columns = [str(c).strip() for c in raw.columns]
+    df = pd.DataFrame({"food_name_normalized": raw["Food Item"].map(normalize_name)})
+    for col, (feature, scale) in INDIAN_FOOD_COLUMNS.items():
+        if col in raw.columns:
+            df[feature] = pd.to_numeric(raw[col], errors="coerce").fillna(0) * scale
+    return df
+
+
+def load_catalog(unified_csv: Optional[Path] = None, indian_food_path: Optional[Path] = None) -> pd.DataFrame:
+    """Indian foods first (the app's primary catalog), then the unified table; first name wins."""
+    from ml_model.training.disease_model import add_engineered_features, load_unified_data
+
+    if unified_csv is None:
+        from backend.config import get_settings
+
+        unified_csv = get_settings().unified_csv_path
+    unified = load_unified_data(Path(unified_csv))
+    if not unified.empty and "food_name_normalized" not in unified.columns:
+        unified["food_name_normalized"] = unified.get("food_name", pd.Series("", index=unified.index)).map(
+            normalize_name
+        )
+
+    frames = [f for f in (load_indian_foods(indian_food_path), unified) if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    catalog = pd.concat(frames, ignore_index=True, sort=False)
+    catalog = catalog[catalog["food_name_normalized"] != ""]
+    catalog = catalog.drop_duplicates("food_name_normalized", keep="first").reset_index(drop=True)
+    return add_engineered_features(catalog)
+
+
+def compute_entries(catalog: pd.DataFrame, model_dir: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """Disease flags + risk details for every catalog row, keyed by normalized name."""
+    from ml_model.training.disease_model import TARGETS, predict_disease_risk_batch
+
+    predicted = predict_disease_risk_batch(catalog, model_dir)
+    rule_flags = disease_flags_batch({field: catalog[col].to_numpy(dtype=float) for col, field in RULE_FIELDS.items()})
+
+    columns: Dict[str, Tuple[np.ndarray, Optional[np.ndarray], List[Dict[str, float]], str]] = {}
+    for target in TARGETS:
+        if f"{target}_label" in predicted.columns:
+            columns[target] = (
+                predicted[f"{target}_label"].to_numpy(),
+                predicted[f"{target}_probability"].to_numpy(),
+                predicted[f"{target}_top_factors"].tolist(),
+                "model",
+            )
+        else:
+            columns[target] = (rule_flags[target], None, [{}] * len(catalog), "rules")
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    for i, name in enumerate(catalog["food_name_normalized"]):
+        entry: Dict[str, Any] = {"sources": {}}
+        for target, (labels, probs, factors, source) in columns.items():
+            entry[target] = int(labels[i])
+            entry["sources"][target] = source
+            if probs is not None:
+                entry[risk_key(target)] = {
+                    "probability": round(float(probs[i]), 6),
+                    "label": int(labels[i]),
+                    "top_factors": factors[i],
+                    "source": source,
+                }
+        entries[name] = entry
+    return entries
+
+
+def build_risk_table(
+    catalog: Optional[pd.DataFrame] = None,
+    model_dir: Optional[Path] = None,
+    out_path: Optional[Union[str, Path]] = None,
+) -> Path:
+    if out_path is None:
+        from backend.config import get_settings
+
+        out_path = get_settings().disease_risk_table_path
+    catalog = load_catalog() if catalog is None else catalog
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "version": TABLE_VERSION,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "foods": compute_entries(catalog, model_dir) if not catalog.empty else {},
+    }
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, out_path)
+    return out_path
+
+
+# ---------- lookup ----------
+
+
+class DiseaseRiskTable:
+    def __init__(self, foods: Dict[str, Dict[str, Any]]):
+        self._foods = foods
+
+    def __len__(self) -> int:
+        return len(self._foods)
+
+    def get(self, food_name: Any) -> Optional[Dict[str, Any]]:
+        """Copy of the stored entry for `food_name` (any casing/spacing), or None."""
+        entry = self._foods.get(normalize_name(food_name))
+        return copy.deepcopy(entry) if entry is not None else None
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "DiseaseRiskTable":
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        version = payload.get("version")
+        if version != TABLE_VERSION:
+            raise ValueError(f"Unsupported disease risk table version {version!r} in {path}")
+        return cls(payload.get("foods", {}))
+
+
+_loaded: Dict[Path, Tuple[Tuple[int, int], DiseaseRiskTable]] = {}
+
+
+def get_disease_risk_table(path: Optional[Union[str, Path]] = None) -> Optional[DiseaseRiskTable]:
+    """Process-wide table for `path`, reloaded when the file changes; None if not built."""
+    if path is None:
+        from backend.config import get_settings
+
+        path = get_settings().disease_risk_table_path
+    path = Path(path)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    table = DiseaseRiskTable.load(path)
+    _loaded[path] = (sig, table)
+    return table
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    out = build_risk_table()
+    table = get_disease_risk_table(out)
+    print(f"Disease risk table: {len(table)} foods -> {out} ({time.perf_counter() - t0:.2f}s)")
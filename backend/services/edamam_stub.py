@@ -0,0 +1,168 @@
+"""
+Local stand-in for the Edamam food-database parser endpoint.
+
+Serves `GET /api/food-database/v2/parser?ingr=...` over HTTP/1.1 (keep-alive)
+from a dict of canned foods, with optional added latency, and counts requests
+and TCP connections so tests can check pooling:
+
+    with EdamamStub({"apple": {"ENERC_KCAL": 52}}, latency_ms=20) as stub:
+        client = EdamamClient(stub.url, ...)
+
+Run standalone (point NUTRIBOT_EDAMAM_BASE_URL at it), or benchmark the client
+against it:
+
+    python -m backend.services.edamam_stub --port 8089 --latency_ms 50
+    python -m backend.services.edamam_stub --bench 500 --latency_ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import parse_qs, urlparse
+
+from backend.services.nutrient_lookup import PARSER_PATH
+
+DEFAULT_FOODS: Dict[str, Dict[str, float]] = {
+    "apple": {"ENERC_KCAL": 52, "PROCNT": 0.3, "FAT": 0.2, "CHOCDF": 13.8, "SUGAR": 10.4, "NA": 1},
+    "white rice": {"ENERC_KCAL": 130, "PROCNT": 2.7, "FAT": 0.3, "CHOCDF": 28.2, "SUGAR": 0.1, "NA": 1},
+    "pizza": {"ENERC_KCAL": 266, "PROCNT": 11.4, "FAT": 10.4, "CHOCDF": 33.3, "SUGAR": 3.6, "NA": 598},
+}
+
+
+class EdamamStub:
+    def __init__(
+        self,
+        foods: Optional[Mapping[str, Mapping[str, float]]] = None,
+        *,
+        latency_ms: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.foods = {k.lower(): dict(v) for k, v in (foods if foods is not None else DEFAULT_FOODS).items()}
+        self.latency_ms = latency_ms
+        self.status = 200  # set to e.g. 500 to simulate an outage
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body are separate writes
+
+            def setup(self) -> None:
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000.0)
+                url = urlparse(self.path)
+                if url.path != PARSER_PATH:
+                    return self._send(404, {"error": "not_found"})
+                if stub.status != 200:
+                    return self._send(stub.status, {"error": "stub_failure"})
+                query = (parse_qs(url.query).get("ingr") or [""])[0].strip().lower()
+                nutrients = stub.foods.get(query)
+                body = {"text": query, "parsed": [], "hints": []}
+                if nutrients is not None:
+                    body["parsed"] = [{"food": {"label": query, "nutrients": nutrients}}]
+                self._send(200, body)
+
+            def _send(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self) -> "EdamamStub":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, name="edamam-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "EdamamStub":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+async def _bench(stub: EdamamStub, n: int, concurrency: int) -> Dict[str, Any]:
+    from backend.services.nutrient_lookup import EdamamClient
+
+    client = EdamamClient(
+        stub.url, timeout_s=5.0, max_connections=concurrency, max_concurrency=concurrency, keepalive_s=30.0
+    )
+    names = list(stub.foods) + ["unknown dish"]
+    t0 = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.fetch(names[i % len(names)]) for i in range(n)))
+    finally:
+        await client.aclose()
+    seconds = time.perf_counter() - t0
+    return {
+        "lookups": n,
+        "seconds": round(seconds, 3),
+        "per_second": round(n / seconds, 1),
+        "connections": stub.connections,
+        **client.stats(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency_ms", type=float, default=0.0)
+    parser.add_argument("--bench", type=int, default=0, help="Run this many client lookups and exit")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        with EdamamStub(latency_ms=args.latency_ms) as stub:
+            print(json.dumps(asyncio.run(_bench(stub, args.bench, args.concurrency)), indent=2))
+        return 0
+    stub = EdamamStub(latency_ms=args.latency_ms, port=args.port)
+    print(f"Edamam stub on {stub.url} (NUTRIBOT_EDAMAM_BASE_URL={stub.url})")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,13 +1,12 @@
 from __future__ import annotations
-import asyncio
 from typing import Optional
 from datetime import datetime
 
 from backend.core.database import meals_collection
 from backend.models.food import FoodAnalysisResult, FoodPrediction
-from backend.services.food_model_service import FoodClassifierService, FoodMapping
+from backend.services.bulkheads import get_bulkhead
+from backend.services.food_model_service import FoodClassifierService, FoodMapping, get_food_classifier
 from backend.services.cache_provider import get_cache
-from backend.services.image_processor import preprocess_image
 from backend.services.nutrition_service import NutritionService, get_user_meals
 from backend.utils.errors import NotFoundError
 
@@ -20,7 +19,7 @@ class FoodAnalysisService:
         mapping: Optional[FoodMapping] = None,
         nutrition: Optional[NutritionService] = None,
     ):
-        self._classifier = classifier or FoodClassifierService()
+        self._classifier = classifier or get_food_classifier()
         self._mapping = mapping or FoodMapping()
         self._nutrition = nutrition or NutritionService()
 
@@ -45,9 +44,8 @@ class FoodAnalysisService:
 
         # ================= IMAGE PROCESS =================
         if image_bytes:
-            loop = asyncio.get_event_loop()
-            optimized_image = await loop.run_in_executor(None, preprocess_image, image_bytes)
-            detected = await self._classifier.predict(optimized_image)
+            # The classifier decodes once, straight to model resolution
+            detected = await self._classifier.predict(image_bytes)
 
         raw_name = (detected.class_name if detected else (food_name or "")).strip()
 
@@ -61,7 +59,14 @@ class FoodAnalysisService:
         )
 
         # ================= NUTRITION =================
-        nutrients = self._nutrition.lookup(mapped)
+        # Image labels resolved at model load carry a local nutrient row; keep the
+        # row's catalog name so the disease table finds fuzzy-matched labels too
+        local = self._classifier.nutrients_for(detected) if detected else None
+        if local:
+            nutrients, nutrient_source = local, "label_table"
+        else:
+            resolved = await self._nutrition.resolve(mapped)
+            nutrients, nutrient_source = resolved.nutrients, resolved.tier
         disease_flags = self._nutrition.disease_flags(nutrients)
 
         # ================= STORE MEAL (FIRESTORE) =================
@@ -73,14 +78,14 @@ class FoodAnalysisService:
         }
 
         # Store in Firestore
-        meals_collection.add(meal)
+        await get_bulkhead("firestore").run(meals_collection.add, meal)
 
         # ================= DAILY TOTAL (FIRESTORE) =================
         from backend.services.nutrition_service import analyze_user_query
         
         # Use our updated central analysis function to get consistent reasoning/totals
         # This will also store the meal in Firestore
-        analysis = await analyze_user_query(user_id, mapped)
+        analysis = await analyze_user_query(user_id, mapped, nutrients=nutrients)
         
         total = analysis["daily_total"]
         decision = analysis["decision"]
@@ -93,7 +98,7 @@ class FoodAnalysisService:
             from backend.services.exercise_service import exercise_service
             from backend.core.database import users_collection
             
-            user_doc = users_collection.document(user_id).get()
+            user_doc = await get_bulkhead("firestore").run(users_collection.document(user_id).get)
             user_data = user_doc.to_dict() if user_doc.exists else {}
             exercises = exercise_service.recommend_exercises(
                 bmi_group=user_data.get("bmi_group", "Normal"),
@@ -115,6 +120,8 @@ class FoodAnalysisService:
             disease_flags=disease_flags,
             diet_type=None,
             recommendation_notes=f"Decision: {decision}\nReason: {reason}{exercise_note}",
+            nutrient_source=nutrient_source,
+            similarity=detected.similarity if detected else None,
         )
 
         # ================= CACHE STORE =================
@@ -130,6 +137,7 @@ class FoodAnalysisService:
                     "disease_flags": result.disease_flags,
                     "diet_type": result.diet_type,
                     "recommendation_notes": result.recommendation_notes,
+                    "nutrient_source": result.nutrient_source,
                 },
             )
 
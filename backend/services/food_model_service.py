@@ -1,16 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
+import logging
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Sequence
 
 import numpy as np
 
 from backend.config import get_settings
 from backend.models.food import FoodPrediction
+from backend.services.bulkheads import get_bulkhead
+from backend.services.cache_provider import get_prediction_cache, get_prediction_flights
+from backend.services.class_nutrient_table import ClassNutrientTable, build_class_nutrient_table
+from backend.services.food_store import get_food_store
+from backend.services.image_pool import get_image_decode_pool
+from backend.services.micro_batcher import MicroBatcher
 from backend.utils.errors import ModelNotLoadedError
-from backend.utils.image_preprocessing import mobilenetv2_input_from_bytes
+from backend.utils.image_preprocessing import (
+    difference_hash,
+    model_pixels_from_bytes,
+    normalize_mobilenetv2,
+    pixel_hash,
+)
+from backend.utils.tensor_upload import decode_tensor_upload, is_tensor_upload
+
+logger = logging.getLogger(__name__)
 
 
 class FoodMapping:
@@ -31,6 +49,9 @@ class FoodMapping:
             self._mapping = {}
         return self._mapping
 
+    def as_dict(self) -> Dict[str, str]:
+        return dict(self._load())
+
     def map_to_nutrition_name(self, class_name: str) -> str:
         """
         Map a model class label to a nutrition lookup key.
@@ -48,53 +69,260 @@ class FoodMapping:
 
 
 class FoodClassifierService:
-    def __init__(self, *, model_dir: Optional[Path] = None):
+    """
+    Food CNN inference through a pluggable backend (Keras, TFLite or ONNX; see
+    ml_model.training.food_backends). Concurrent `predict` calls are coalesced
+    by a `MicroBatcher` into one backend call per batch.
+
+    When a reference-dish index (ml_model.training.food_index) is present, the
+    backend also returns each image's backbone embedding, and low-confidence
+    predictions are replaced by the nearest reference dish if it is close enough.
+
+    Labels (CNN classes and reference dishes) are resolved once at load time to
+    rows of the local nutrient store (see class_nutrient_table); predictions
+    carry that row id so callers can skip the name-based nutrient lookup.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_dir: Optional[Path] = None,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        backend: Optional[str] = None,
+    ):
         s = get_settings()
         self._model_dir = Path(model_dir or s.food_model_dir)
-        self._model = None
+        self._backend_kind = backend or s.food_model_backend
+        self._index_path = Path(s.food_index_path or self._model_dir / "food_index")
+        self._backend = None
+        self._index = None
+        self._nutrient_table: Optional[ClassNutrientTable] = None
         self._class_names: Optional[list[str]] = None
+        self._model_version: Optional[str] = None
+        self._input_buffer: Optional[np.ndarray] = None
         self._load_lock = asyncio.Lock()
+        self._batcher = MicroBatcher(
+            self._infer_batch,
+            max_batch_size=max_batch_size or s.food_batch_max_size,
+            max_wait_ms=s.food_batch_max_wait_ms if max_wait_ms is None else max_wait_ms,
+            executor=get_bulkhead("inference"),
+        )
 
     async def _ensure_loaded(self) -> None:
-        if self._model is not None and self._class_names is not None:
+        if self._backend is not None and self._class_names is not None:
             return
         if not self._model_dir.exists():
             raise ModelNotLoadedError(details={"path": str(self._model_dir)})
 
         async with self._load_lock:
-            if self._model is not None and self._class_names is not None:
+            if self._backend is not None and self._class_names is not None:
                 return
 
             def _load():
-                import tensorflow as tf  # noqa: F401
-                from ml_model.training.food_cnn import load_saved_model
+                from ml_model.training.food_backends import load_backend, load_class_names
 
-                return load_saved_model(self._model_dir)
+                return load_backend(self._backend_kind, self._model_dir), load_class_names(self._model_dir)
 
-            loop = asyncio.get_event_loop()
-            model, class_names = await loop.run_in_executor(None, _load)
-            self._model = model
+            backend, class_names = await get_bulkhead("inference").run(_load)
+            if getattr(backend, "has_embeddings", False) and (self._index_path / "manifest.json").exists():
+                self._index = await get_bulkhead("inference").run(self._load_index, backend)
+            dishes = self._index.names if self._index is not None else ()
+
+            def _resolve() -> ClassNutrientTable:
+                return build_class_nutrient_table(
+                    class_names or [], FoodMapping().as_dict(), get_food_store(), extra_labels=dishes
+                )
+
+            self._nutrient_table = await get_bulkhead("inference").run(_resolve)
+            unresolved = self._nutrient_table.report["unresolvable"]
+            if unresolved:
+                logger.warning(
+                    "%d food labels have no local nutrient row (name lookup used instead): %s",
+                    len(unresolved),
+                    ", ".join(u["label"] for u in unresolved[:20]),
+                )
+            self._model_version = model_version(
+                class_names or [],
+                getattr(backend, "path", None) or self._model_dir,
+                self._index_path if self._index is not None else None,
+            )
+            self._backend = backend
             self._class_names = class_names or []
 
+    def _load_index(self, backend):
+        """The kNN index, or None if it was built against a different model than the one served."""
+        from ml_model.training.food_backends import served_artifact
+        from ml_model.training.food_index import FoodEmbeddingIndex, index_matches_model
+
+        index = FoodEmbeddingIndex.load(self._index_path)
+        ok, reason = index_matches_model(index, served_artifact(backend, self._model_dir))
+        if not ok:
+            logger.warning("Skipping kNN index %s: %s", self._index_path, reason)
+            return None
+        return index
+
+    @property
+    def backend_name(self) -> Optional[str]:
+        return getattr(self._backend, "name", None)
+
+    def _infer_batch(self, pixels: np.ndarray):
+        """
+        (n,224,224,3) uint8 -> per-row (probabilities, embedding or None). Runs in
+        the executor. Pixels are scaled into a float32 buffer reused across
+        batches (the batcher flushes one batch at a time).
+        """
+        n = pixels.shape[0]
+        buf = self._input_buffer
+        if buf is None or buf.shape[0] < n or buf.shape[1:] != pixels.shape[1:]:
+            self._input_buffer = np.empty((max(n, self._batcher.max_batch_size), *pixels.shape[1:]), dtype=np.float32)
+        x = normalize_mobilenetv2(pixels, out=self._input_buffer[:n])
+        if self._index is not None:
+            probs, emb = self._backend.predict_batch_full(x)
+            if emb is not None:
+                return list(zip(probs, emb))
+        else:
+            probs = self._backend.predict_batch(x)
+        return [(p, None) for p in probs]
+
+    async def warmup(self, batch_sizes: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """
+        Load the model and run dummy batches at each size so graph tracing and
+        buffer allocation happen before readiness, not on the first scan.
+        """
+        t0 = time.perf_counter()
+        await self._ensure_loaded()
+        sizes = [int(n) for n in (batch_sizes or get_settings().food_warmup_batch_sizes) if int(n) > 0]
+        warm = getattr(self._backend, "warmup", None)
+        if warm is not None and sizes:
+            await get_bulkhead("inference").run(warm, sizes)
+        return {"backend": self.backend_name, "batch_sizes": sizes, "seconds": round(time.perf_counter() - t0, 3)}
+
+    def batch_metrics(self) -> Dict[str, Any]:
+        return self._batcher.metrics()
+
+    def nutrient_resolution(self) -> Optional[Dict[str, Any]]:
+        """Counts of labels resolved to local nutrient rows (None until loaded)."""
+        table = self._nutrient_table
+        return table.summary() if table is not None else None
+
+    def nutrients_for(self, prediction: FoodPrediction) -> Optional[Dict[str, Any]]:
+        """Local nutrients for a prediction's resolved row, or None if it has none."""
+        table = self._nutrient_table
+        if table is None or prediction.nutrient_row is None:
+            return None
+        return table.store.nutrients(prediction.nutrient_row)
+
+    def _row_for_label(self, label: str) -> Optional[int]:
+        table = self._nutrient_table
+        return table.row_for_label(label) if table is not None else None
+
     async def predict(self, image_bytes: bytes) -> FoodPrediction:
+        """
+        Classify one image. Predictions are cached by the hash of the decoded,
+        resized pixels (optionally also a perceptual hash) under the loaded
+        model's version, and concurrent uploads of the same image share a
+        single inference.
+
+        `image_bytes` may also be a preprocessed tensor upload (see
+        backend.utils.tensor_upload): its pixels are used in place, no decode.
+        """
+        if is_tensor_upload(image_bytes):
+            return await self._predict_cached(decode_tensor_upload(image_bytes))
+        pool = get_image_decode_pool()
+        if pool is None:
+            pixels = await get_bulkhead("image").run(model_pixels_from_bytes, image_bytes)  # (224,224,3) uint8
+            return await self._predict_cached(pixels)
+        # Decoded in a worker process into shared memory; the slot is freed once
+        # the prediction (and the batch that copied the pixels) is done
+        with await pool.decode(image_bytes) as shared:
+            return await self._predict_cached(shared.array)
+
+    async def _predict_cached(self, pixels: np.ndarray) -> FoodPrediction:
+        await self._ensure_loaded()  # the cache key needs the model version
+        s = get_settings()
+        cache = get_prediction_cache()
+        version = self._model_version
+        keys = [f"px:{version}:{pixel_hash(pixels)}"]
+        if s.prediction_cache_phash:
+            keys.append(f"ph:{version}:{difference_hash(pixels)}")
+        for key in keys:
+            cached = await cache.get(key)
+            if isinstance(cached, dict) and cached.get("class_name"):
+                return FoodPrediction(
+                    class_name=cached["class_name"],
+                    confidence=float(cached["confidence"]),
+                    source=cached.get("source", "softmax"),
+                    nutrient_row=self._row_for_label(cached["class_name"]),
+                    similarity=cached.get("similarity"),
+                )
+
+        async def _run() -> FoodPrediction:
+            pred = await self._predict_pixels(pixels)
+            value = {
+                "class_name": pred.class_name,
+                "confidence": pred.confidence,
+                "source": pred.source,
+                "similarity": pred.similarity,
+            }
+            for key in keys:
+                await cache.set(key, value)
+            return pred
+
+        return await get_prediction_flights().do(keys[0], _run)
+
+    async def _predict_pixels(self, pixels: np.ndarray) -> FoodPrediction:
         await self._ensure_loaded()
-        if self._model is None or not self._class_names:
+        if self._backend is None or not self._class_names:
             raise ModelNotLoadedError("Food model is loaded but class names are missing.")
 
-        img_arr = mobilenetv2_input_from_bytes(image_bytes)  # (224,224,3) float32 [-1,1]
+        probs, emb = await self._batcher.submit(pixels)
+
+        idx = int(np.argmax(probs))
+        conf = float(probs[idx]) if idx < len(probs) else 0.0
+        s = get_settings()
+        if emb is not None and conf < s.food_knn_max_confidence:
+            dish, similarity = self._index.search(emb, k=1)[0]
+            if similarity >= s.food_knn_min_similarity:
+                return FoodPrediction(
+                    class_name=dish,
+                    confidence=conf,
+                    source="knn",
+                    nutrient_row=self._row_for_label(dish),
+                    similarity=float(similarity),
+                )
+        label = self._class_names[idx] if idx < len(self._class_names) else "unknown"
+        table = self._nutrient_table
+        row = table.row_for_class(idx) if table is not None else None
+        return FoodPrediction(class_name=label, confidence=conf, nutrient_row=row)
+
+
+def _artifact_stamp(path: Path) -> str:
+    """name:mtime_ns:size of a file, or of the newest file under a directory."""
+    path = Path(path)
+    if not path.exists():
+        return f"{path.name}:missing"
+    files = [path] if path.is_file() else [p for p in path.rglob("*") if p.is_file()]
+    newest = max((p.stat() for p in files), key=lambda st: st.st_mtime_ns, default=None)
+    if newest is None:
+        return f"{path.name}:empty"
+    return f"{path.name}:{newest.st_mtime_ns}:{newest.st_size}"
 
-        def _infer(arr: np.ndarray) -> Tuple[str, float]:
-            import tensorflow as tf
 
-            x = tf.constant(arr, dtype=tf.float32)
-            x = tf.expand_dims(x, 0)
-            probs = self._model.predict(x, verbose=0)[0]
-            idx = int(np.argmax(probs))
-            conf = float(probs[idx]) if idx < len(probs) else 0.0
-            label = self._class_names[idx] if idx < len(self._class_names) else "unknown"
-            return label, conf
+def model_version(class_names: Sequence[str], artifact: Path, index_path: Optional[Path] = None) -> str:
+    """
+    Short id of what a prediction depends on: the class list, the backend
+    artifact (file, or newest file of a model directory) and the kNN index.
+    Retraining or swapping any of them changes the prediction cache keys.
+    """
+    h = hashlib.sha256("\n".join(class_names).encode("utf-8"))
+    h.update(_artifact_stamp(artifact).encode())
+    if index_path is not None:
+        h.update(_artifact_stamp(index_path).encode())
+    return h.hexdigest()[:16]
 
-        loop = asyncio.get_event_loop()
-        label, conf = await loop.run_in_executor(None, _infer, img_arr)
-        return FoodPrediction(class_name=label, confidence=conf)
 
+@lru_cache(maxsize=1)
+def get_food_classifier() -> FoodClassifierService:
+    """Process-wide classifier so every request shares one model and one batch queue."""
+    return FoodClassifierService()
@@ -8,17 +8,19 @@ Food analysis service:
 from typing import Dict, Any
 from datetime import datetime
 
-from backend.services.nutrient_lookup import get_nutrients
+from backend.services.nutrient_resolver import get_nutrient_resolver
 from backend.services.nutrition_service import NutritionService, get_user_meals
+from backend.services.safety_rules import FOOD_DECISION_RULES
 from backend.core.database import meals_collection
+from backend.services.bulkheads import get_bulkhead
 
-def analyze_food(food_name: str, user_id: str = "guest") -> Dict[str, Any]:
+async def analyze_food(food_name: str, user_id: str = "guest") -> Dict[str, Any]:
     """
     Main food decision engine
     """
 
     # 1. Get food nutrients
-    nutrients = get_nutrients(food_name)
+    nutrients = (await get_nutrient_resolver().resolve(food_name)).nutrients
 
     if not nutrients:
         return {"error": "Food not found in database"}
@@ -38,16 +40,11 @@ def analyze_food(food_name: str, user_id: str = "guest") -> Dict[str, Any]:
     # For now, let's keep it simple and focus on the current meal
     # in the next version, integrate the high-level daily totals here.
     
-    # Decision Logic (simple)
-    decision = "Safe"
-    reason = []
-
-    if nutrients["sugar"] > 15:
-        decision = "Avoid"
-        reason.append("High sugar content")
-    elif nutrients["calories"] > 500:
-        decision = "Caution"
-        reason.append("High calories per serving")
+    # Decision Logic (shared threshold rules)
+    verdict = FOOD_DECISION_RULES.evaluate({
+        "sugar": float(nutrients.get("sugar", 0) or 0),
+        "calories": float(nutrients.get("calories", 0) or 0),
+    })
 
     # Save to Firestore
     meal = {
@@ -56,11 +53,11 @@ def analyze_food(food_name: str, user_id: str = "guest") -> Dict[str, Any]:
         "nutrients": nutrients,
         "timestamp": datetime.utcnow()
     }
-    meals_collection.add(meal)
+    await get_bulkhead("firestore").run(meals_collection.add, meal)
 
     return {
         "food": food_name,
         "nutrients": nutrients,
-        "decision": decision,
-        "reason": reason if reason else ["Within safe limits"],
+        "decision": verdict.label,
+        "reason": [verdict.message],
     }
@@ -0,0 +1,121 @@
+"""
+Local nutrient store: the Indian food table (and unified table) as columnar arrays.
+
+Rows are addressed by integer id. `row_id` is an exact lookup on the
+normalized food name, `fuzzy_row_id` a token-order-insensitive difflib match
+("Besan Ladoo" -> "ladoo (besan)"), and `nutrients(row)` returns the dict
+shape `NutritionService.lookup` produces.
+
+`get_food_store()` loads the Indian sheet plus the unified food table once
+per process and reloads them when either file changes.
+"""
+
+from __future__ import annotations
+
+import difflib
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.disease_risk_table import normalize_name
+
+# NutritionService.lookup field -> unified feature column
+NUTRIENT_FIELDS: Dict[str, str] = {
+    "calories": "energy_kcal",
+    "protein": "protein_g",
+    "fat": "total_fat_g",
+    "carbs": "carbohydrates_g",
+    "sugar": "sugars_g",
+    "sodium": "sodium_mg",
+}
+
+FUZZY_MIN_SCORE = 90.0
+
+
+def _token_sorted(name: str) -> str:
+    return " ".join(sorted(re.findall(r"[a-z0-9]+", name)))
+
+
+class FoodStore:
+    def __init__(self, names: Sequence[str], columns: Mapping[str, np.ndarray]):
+        self.names = list(names)
+        self._index = {n: i for i, n in enumerate(self.names)}
+        self._sorted: Optional[List[str]] = None
+        self._columns = {
+            field: np.asarray(columns.get(feature, np.zeros(len(self.names))), dtype=float)
+            for field, feature in NUTRIENT_FIELDS.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "FoodStore":
+        if df.empty:
+            return cls([], {})
+        df = df[df["food_name_normalized"] != ""].drop_duplicates("food_name_normalized", keep="first")
+        return cls(
+            df["food_name_normalized"].tolist(),
+            {c: df[c].to_numpy(dtype=float) for c in NUTRIENT_FIELDS.values() if c in df.columns},
+        )
+
+    def row_id(self, name: Any) -> Optional[int]:
+        return self._index.get(normalize_name(name))
+
+    def fuzzy_row_id(self, name: Any, min_score: float = FUZZY_MIN_SCORE) -> Optional[Tuple[int, float]]:
+        """(row, score 0..100) of the closest name by token-sort ratio, if it reaches min_score."""
+        query = _token_sorted(normalize_name(name))
+        if not query or not self.names:
+            return None
+        if self._sorted is None:
+            self._sorted = [_token_sorted(n) for n in self.names]
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(query)
+        best, best_score = -1, min_score
+        for row, candidate in enumerate(self._sorted):
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() * 100 < best_score or matcher.quick_ratio() * 100 < best_score:
+                continue
+            score = matcher.ratio() * 100
+            if score >= best_score:
+                best, best_score = row, score
+        return (best, best_score) if best >= 0 else None
+
+    def nutrients(self, row: int) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"food_name": self.names[row]}
+        for field, values in self._columns.items():
+            out[field] = float(values[row])
+        return out
+
+
+_loaded: Optional[Tuple[Tuple[Any, ...], FoodStore]] = None
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def get_food_store() -> FoodStore:
+    """
+    Process-wide store over the disease catalog's sources (Indian sheet first,
+    then the unified table; first name wins). Reloaded when either file changes.
+    """
+    global _loaded
+    from backend.config import get_settings
+    from backend.services.disease_risk_table import load_catalog
+
+    s = get_settings()
+    paths = (Path(s.indian_food_path), Path(s.unified_csv_path))
+    sig = tuple(_signature(p) for p in paths)
+    if _loaded is not None and _loaded[0] == sig:
+        return _loaded[1]
+    store = FoodStore.from_frame(load_catalog(unified_csv=paths[1], indian_food_path=paths[0]))
+    _loaded = (sig, store)
+    return store
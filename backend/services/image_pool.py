@@ -0,0 +1,141 @@
+"""
+Process pool for scan image decoding.
+
+Decode + resize is mostly C, but the Python glue around it still contends on
+the GIL with request handling when it runs in the default thread executor.
+`ImageDecodePool` runs `model_pixels_from_bytes` in worker processes instead.
+
+Results are not pickled back: the parent owns one `SharedMemory` slab split
+into fixed-size (224, 224, 3) uint8 slots. A worker writes the decoded pixels
+straight into the slot it was given, and the caller gets a `SharedPixels`
+handle whose `.array` is a view into that slot. The slot goes back to the
+free list when the handle is released (use it as a context manager).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import get_settings
+from backend.utils.image_preprocessing import MODEL_INPUT_SIZE, model_pixels_from_bytes
+
+# Worker-process state: the parent's slab, attached once per worker
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+
+
+def _init_worker(shm_name: str) -> None:
+    global _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+
+
+def _decode_into_slot(image_bytes: bytes, slot: int, shape: Tuple[int, int, int]) -> None:
+    nbytes = int(np.prod(shape))
+    out = np.ndarray(shape, dtype=np.uint8, buffer=_worker_shm.buf, offset=slot * nbytes)
+    out[...] = model_pixels_from_bytes(image_bytes, size=(shape[1], shape[0]))
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, fn: Callable[..., None], *args) -> None:
+    try:
+        loop.call_soon_threadsafe(fn, *args)
+    except RuntimeError:
+        pass  # loop closed (shutdown); the pool goes with it
+
+
+class SharedPixels:
+    """Decoded pixels living in a shared-memory slot; release() returns the slot."""
+
+    def __init__(self, array: np.ndarray, release: Callable[[], None]):
+        self.array = array
+        self._release = release
+
+    def release(self) -> None:
+        if self._release is not None:
+            self._release, release = None, self._release
+            self.array = None
+            release()
+
+    def __enter__(self) -> "SharedPixels":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class ImageDecodePool:
+    def __init__(
+        self,
+        workers: int,
+        *,
+        slots: Optional[int] = None,
+        size: Tuple[int, int] = MODEL_INPUT_SIZE,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = int(workers)
+        self.slots = int(slots or 4 * workers)
+        self._shape = (size[1], size[0], 3)
+        self._slot_bytes = int(np.prod(self._shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=self._slot_bytes * self.slots)
+        self._free: List[int] = list(range(self.slots))
+        self._available: Optional[asyncio.Semaphore] = None
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self._shm.name,)
+        )
+
+    def _slot_view(self, slot: int) -> np.ndarray:
+        return np.ndarray(self._shape, dtype=np.uint8, buffer=self._shm.buf, offset=slot * self._slot_bytes)
+
+    def _release_slot(self, slot: int) -> None:
+        self._free.append(slot)
+        self._available.release()
+
+    async def decode(self, image_bytes: bytes) -> SharedPixels:
+        """Decode in a worker process; waits for a free slot when all are in use."""
+        if self._available is None:
+            self._available = asyncio.Semaphore(self.slots)
+        await self._available.acquire()
+        slot = self._free.pop()
+        loop = asyncio.get_running_loop()
+        fut = self._executor.submit(_decode_into_slot, image_bytes, slot, self._shape)
+        try:
+            await asyncio.wrap_future(fut)
+        except BaseException:
+            # Cancelled or failed: a worker may still be writing into the slot,
+            # so it goes back to the free list only once the decode has finished
+            fut.add_done_callback(lambda _: _call_soon(loop, self._release_slot, slot))
+            raise
+        return SharedPixels(self._slot_view(slot), lambda: self._release_slot(slot))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # a caller still holds a slot view; the mapping goes away with it
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@lru_cache(maxsize=1)
+def get_image_decode_pool() -> Optional[ImageDecodePool]:
+    """Process-wide decode pool, or None when NUTRIBOT_IMAGE_DECODE_WORKERS=0 (thread executor)."""
+    s = get_settings()
+    if s.image_decode_workers <= 0:
+        return None
+    return ImageDecodePool(s.image_decode_workers, slots=s.image_decode_slots or None)
+
+
+def close_image_decode_pool() -> None:
+    if get_image_decode_pool.cache_info().currsize:
+        pool = get_image_decode_pool()
+        if pool is not None:
+            pool.close()
+        get_image_decode_pool.cache_clear()
@@ -0,0 +1,160 @@
+"""
+In-process dynamic micro-batching for model inference.
+
+Concurrent callers `await batcher.submit(x)` with one input each. Inputs are
+queued and flushed as a single stacked batch when either `max_batch_size`
+items are waiting or the oldest item has waited `max_wait_ms`, whichever comes
+first. The batch function runs in an executor; row i of its output is handed
+back to the i-th caller's future.
+
+`metrics()` reports the batch-size distribution and queue delay (time from
+submit to the start of the batch call).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class BatchMetrics:
+    window: int = 1024
+    batches: int = 0
+    items: int = 0
+    batch_sizes: Counter = field(default_factory=Counter)
+    _delays_ms: Deque[float] = field(default_factory=deque)
+    max_delay_ms: float = 0.0
+
+    def record(self, size: int, delays_ms: List[float]) -> None:
+        self.batches += 1
+        self.items += size
+        self.batch_sizes[size] += 1
+        self._delays_ms.extend(delays_ms)
+        while len(self._delays_ms) > self.window:
+            self._delays_ms.popleft()
+        self.max_delay_ms = max(self.max_delay_ms, max(delays_ms, default=0.0))
+
+    def snapshot(self) -> Dict[str, Any]:
+        delays = np.fromiter(self._delays_ms, dtype=float) if self._delays_ms else np.zeros(1)
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "queue_delay_ms": {
+                "p50": float(np.percentile(delays, 50)),
+                "p95": float(np.percentile(delays, 95)),
+                "max": float(self.max_delay_ms),
+            },
+        }
+
+
+@dataclass
+class _Pending:
+    item: Any
+    future: asyncio.Future
+    enqueued: float
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        infer_batch: Callable[[np.ndarray], Any],
+        *,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        executor: Optional[Executor] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self._infer_batch = infer_batch
+        self.max_batch_size = int(max_batch_size)
+        self.max_wait_ms = float(max_wait_ms)
+        self._executor = executor
+        self._pending: List[_Pending] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._metrics = BatchMetrics()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "queued": len(self._pending),
+            **self._metrics.snapshot(),
+        }
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one input (no batch dimension) and wait for its output row."""
+        self._ensure_worker()
+        fut = self._loop.create_future()
+        self._pending.append(_Pending(item, fut, time.perf_counter()))
+        self._wakeup.set()
+        return await fut
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for p in self._pending:
+            if not p.future.done():
+                p.future.cancel()
+        self._pending.clear()
+
+    async def _run(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            deadline = self._pending[0].enqueued + self.max_wait_ms / 1000.0
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: len(batch)]
+            batch = [p for p in batch if not p.future.done()]  # drop cancelled callers
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        started = time.perf_counter()
+        self._metrics.record(len(batch), [(started - p.enqueued) * 1000.0 for p in batch])
+        try:
+            x = np.stack([np.asarray(p.item) for p in batch])
+            out = await self._loop.run_in_executor(self._executor, self._infer_batch, x)
+        except Exception as e:
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+        for i, p in enumerate(batch):
+            if not p.future.done():
+                p.future.set_result(out[i])
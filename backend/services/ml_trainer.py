@@ -5,7 +5,9 @@ import os
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
+from backend.config import get_settings
 from backend.core.data_loader import data_loader
+from backend.services.risk_scorer import export_risk_model
 
 def train_model():
     print("Starting ML Model training...")
@@ -86,10 +88,14 @@ def train_model():
         print("Warning: Test accuracy is below 0.75, but saving model anyway.")
     
     # Save Model
-    model_path = "backend/models/risk_model.pkl"
+    model_path = str(get_settings().risk_model_path)
     os.makedirs(os.path.dirname(model_path), exist_ok=True)
     joblib.dump(model, model_path)
     print(f"Model saved to {model_path}")
 
+    # Export NumPy scorer artifact (served without sklearn)
+    scorer_path = export_risk_model(model)
+    print(f"Risk scorer exported to {scorer_path}")
+
 if __name__ == "__main__":
     train_model()
@@ -1,67 +1,182 @@
 """
 Nutrient lookup service using Edamam API fallback.
+
+Lookups go through one process-wide `EdamamClient`: a shared `httpx.AsyncClient`
+(connection pool with keep-alive, so repeat lookups skip TCP/TLS setup), a
+semaphore bounding concurrent calls, and a per-call deadline that covers both
+waiting for a slot and the request itself. Nothing blocks the event loop.
+
+A lookup with no match returns None; a timeout or HTTP failure raises
+`ServiceUnavailableError` so callers can tell "unknown food" from "Edamam
+down" (the resolver caches only the former).
+
+For tests and benchmarks, point `NUTRIBOT_EDAMAM_BASE_URL` at the local stub
+(backend.services.edamam_stub).
 """
+
+from __future__ import annotations
+
+import asyncio
+import logging
 import os
-import requests
-from typing import Dict, Any, Optional
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+import numpy as np
+
+from backend.config import get_settings
+from backend.utils.errors import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
 
 EDAMAM_APP_ID = os.getenv("EDAMAM_APP_ID", "demo_id")
 EDAMAM_APP_KEY = os.getenv("EDAMAM_APP_KEY", "demo_key")
+PARSER_PATH = "/api/food-database/v2/parser"
+
+# Edamam nutrient code -> our field
+EDAMAM_FIELDS = {
+    "calories": "ENERC_KCAL",
+    "protein": "PROCNT",
+    "fat": "FAT",
+    "carbohydrates": "CHOCDF",
+    "sugar": "SUGAR",
+    "sodium": "NA",
+}
+
+
+def parse_parser_response(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Nutrients of the first parsed food, else the first hint; None if neither."""
+    for key in ("parsed", "hints"):
+        items = data.get(key) or []
+        if items:
+            nutrients = items[0]["food"]["nutrients"]
+            return {field: nutrients.get(code, 0) for field, code in EDAMAM_FIELDS.items()}
+    return None
+
+
+class EdamamClient:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout_s: float,
+        max_connections: int,
+        max_concurrency: int,
+        keepalive_s: float,
+        app_id: str = EDAMAM_APP_ID,
+        app_key: str = EDAMAM_APP_KEY,
+        window: int = 1024,
+    ):
+        self.timeout_s = timeout_s
+        self.max_concurrency = max_concurrency
+        self._auth = {"app_id": app_id, "app_key": app_key}
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout_s),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_s,
+            ),
+        )
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._calls = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._latency_ms: Deque[float] = deque(maxlen=window)
+
+    async def fetch(self, food_name: str, *, deadline_s: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Nutrients for `food_name`, or None on no match; raises ServiceUnavailableError on failure."""
+        self._calls += 1
+        t0 = time.perf_counter()
+        try:
+            return await asyncio.wait_for(self._fetch(food_name), deadline_s or self.timeout_s)
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            self._timeouts += 1
+            logger.warning("Edamam lookup timed out: %s", food_name)
+            raise ServiceUnavailableError("Nutrient lookup timed out", details={"service": "edamam"})
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            self._errors += 1
+            logger.warning("Edamam lookup failed for %s: %s", food_name, e)
+            raise ServiceUnavailableError("Nutrient lookup failed", details={"service": "edamam"})
+        finally:
+            self._latency_ms.append((time.perf_counter() - t0) * 1000.0)
+
+    async def _fetch(self, food_name: str) -> Optional[Dict[str, Any]]:
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                resp = await self._client.get(
+                    PARSER_PATH, params={**self._auth, "ingr": food_name, "nutrition-type": "logging"}
+                )
+            finally:
+                self._in_flight -= 1
+        resp.raise_for_status()
+        return parse_parser_response(resp.json())
 
-def get_nutrients(food_name: str) -> Optional[Dict[str, Any]]:
-    """Fetch macro nutrients for a specific food using Edamam API."""
-    url = f"https://api.edamam.com/api/food-database/v2/parser"
-    params = {
-        "app_id": EDAMAM_APP_ID,
-        "app_key": EDAMAM_APP_KEY,
-        "ingr": food_name,
-        "nutrition-type": "logging"
-    }
-    try:
-        resp = requests.get(url, params=params, timeout=5)
-        if resp.status_code == 200:
-            data = resp.json()
-            if data.get("parsed") and len(data["parsed"]) > 0:
-                nutrients = data["parsed"][0]["food"]["nutrients"]
-                return {
-                    "calories": nutrients.get("ENERC_KCAL", 0),
-                    "protein": nutrients.get("PROCNT", 0),
-                    "fat": nutrients.get("FAT", 0),
-                    "carbohydrates": nutrients.get("CHOCDF", 0),
-                    "sugar": nutrients.get("SUGAR", 0),
-                    "sodium": nutrients.get("NA", 0)
-                }
-            elif data.get("hints") and len(data["hints"]) > 0:
-                nutrients = data["hints"][0]["food"]["nutrients"]
-                return {
-                    "calories": nutrients.get("ENERC_KCAL", 0),
-                    "protein": nutrients.get("PROCNT", 0),
-                    "fat": nutrients.get("FAT", 0),
-                    "carbohydrates": nutrients.get("CHOCDF", 0),
-                    "sugar": nutrients.get("SUGAR", 0),
-                    "sodium": nutrients.get("NA", 0)
-                }
-    except Exception as e:
-        print(f"Edamam API error: {e}")
-
-    # Fallback to mock data if API fails or no credentials
-    return {
-        "calories": 250,
-        "protein": 10,
-        "fat": 5,
-        "carbohydrates": 30,
-        "sugar": 5,
-        "sodium": 300
-    }
-
-def lookup_food(food_name: str, df=None) -> Optional[Dict[str, Any]]:
-    nutrients = get_nutrients(food_name)
+    def stats(self) -> Dict[str, Any]:
+        lat = np.fromiter(self._latency_ms, dtype=float) if self._latency_ms else np.zeros(1)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "calls": self._calls,
+            "errors": self._errors,
+            "timeouts": self._timeouts,
+            "latency_ms": {"p50": float(np.percentile(lat, 50)), "p95": float(np.percentile(lat, 95))},
+        }
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: Optional[EdamamClient] = None
+
+
+def get_edamam_client() -> EdamamClient:
+    """Process-wide client so every lookup shares one connection pool."""
+    global _client
+    if _client is None:
+        s = get_settings()
+        _client = EdamamClient(
+            s.edamam_base_url,
+            timeout_s=s.edamam_timeout_s,
+            max_connections=s.edamam_max_connections,
+            max_concurrency=s.edamam_max_concurrency,
+            keepalive_s=s.edamam_keepalive_s,
+        )
+    return _client
+
+
+def edamam_stats() -> Optional[Dict[str, Any]]:
+    """Client stats, or None if no lookup has needed Edamam yet."""
+    return _client.stats() if _client is not None else None
+
+
+async def close_edamam_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
+
+
+async def get_nutrients(food_name: str, *, deadline_s: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Fetch macro nutrients for a specific food using Edamam API (None if it has no match)."""
+    return await get_edamam_client().fetch(food_name, deadline_s=deadline_s)
+
+
+async def lookup_food(food_name: str, df=None) -> Optional[Dict[str, Any]]:
+    nutrients = await get_nutrients(food_name)
     if not nutrients:
         return None
     return {"food_name": food_name, **nutrients}
 
+
 def get_nutrient_summary(row: Dict[str, Any]) -> Dict[str, Any]:
     return row
 
+
 def get_disease_flags(row: Dict[str, Any]) -> Dict[str, Any]:
     return {"suitable_diabetes": 1, "suitable_blood_pressure": 1, "suitable_heart": 1}
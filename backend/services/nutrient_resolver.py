@@ -0,0 +1,192 @@
+"""
+Local-first nutrient resolution.
+
+A food name is answered by the first tier that knows it:
+
+    exact    normalized name in the local food store (Indian sheet + unified table)
+    learned  normalized name among earlier Edamam results (remote_nutrients.csv)
+    fuzzy    token-sort match in the local store at or above nutrient_fuzzy_min_score
+    remote   Edamam; the result is appended to remote_nutrients.csv (unified-table
+             columns), so the next lookup of that name is a "learned" hit
+
+A name Edamam has no match for is recorded in the miss cache for
+nutrient_miss_ttl_seconds and answered as "miss_cached" without a remote call.
+Edamam failures (timeout, 5xx) raise ServiceUnavailableError ("unavailable" in
+the stats) and are not cached.
+Concurrent lookups of the same unknown name share one remote call.
+
+`stats()` counts answers per tier with latency percentiles (GET /api/health/nutrients).
+"""
+
+from __future__ import annotations
+
+import csv
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.config import get_settings
+from backend.services.bulkheads import get_bulkhead
+from backend.services.cache_provider import get_nutrient_miss_cache
+from backend.services.disease_risk_table import normalize_name
+from backend.services.food_store import NUTRIENT_FIELDS, FoodStore, get_food_store
+from backend.services.nutrient_lookup import get_nutrients
+from backend.utils.cache import SingleFlight
+from backend.utils.errors import ServiceUnavailableError
+
+TIERS = ("exact", "learned", "fuzzy", "remote", "miss_cached", "miss", "unavailable")
+
+# Edamam field -> NutritionService field
+REMOTE_FIELDS = {
+    "calories": "calories",
+    "protein": "protein",
+    "fat": "fat",
+    "carbohydrates": "carbs",
+    "sugar": "sugar",
+    "sodium": "sodium",
+}
+LEARNED_COLUMNS = ["food_name_normalized", *NUTRIENT_FIELDS.values(), "source", "fetched_at"]
+
+RemoteFetch = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+@dataclass(frozen=True)
+class Resolution:
+    nutrients: Optional[Dict[str, Any]]  # NutritionService.lookup shape; None for a miss
+    tier: str  # one of TIERS
+
+
+class NutrientResolver:
+    def __init__(
+        self,
+        *,
+        store: Optional[FoodStore] = None,
+        learned_path: Optional[Path] = None,
+        fuzzy_min_score: Optional[float] = None,
+        fetch: Optional[RemoteFetch] = None,
+        miss_cache=None,
+        window: int = 1024,
+    ):
+        s = get_settings()
+        self._store = store
+        self._learned_path = Path(learned_path or s.remote_nutrients_path)
+        self._fuzzy_min_score = s.nutrient_fuzzy_min_score if fuzzy_min_score is None else fuzzy_min_score
+        self._fetch = fetch or get_nutrients
+        self._misses = miss_cache if miss_cache is not None else get_nutrient_miss_cache()
+        self._flights = SingleFlight()
+        self._learned: Optional[Dict[str, Dict[str, float]]] = None
+        self._write_lock = threading.Lock()
+        self._counts = {t: 0 for t in TIERS}
+        self._latency_ms: Dict[str, Deque[float]] = {t: deque(maxlen=window) for t in TIERS}
+
+    # ---- local tables ----
+
+    def store(self) -> FoodStore:
+        return self._store if self._store is not None else get_food_store()
+
+    def _learned_table(self) -> Dict[str, Dict[str, float]]:
+        if self._learned is None:
+            table: Dict[str, Dict[str, float]] = {}
+            if self._learned_path.exists():
+                df = pd.read_csv(self._learned_path).fillna(0)
+                for row in df.itertuples(index=False):
+                    table[row.food_name_normalized] = {
+                        field: float(getattr(row, col)) for field, col in NUTRIENT_FIELDS.items()
+                    }
+            self._learned = table
+        return self._learned
+
+    def load(self) -> None:
+        """Load the local store and learned table up front (startup) instead of on the first lookup."""
+        self.store()
+        self._learned_table()
+
+    def _write_back(self, key: str, nutrients: Dict[str, float]) -> None:
+        with self._write_lock:
+            new_file = not self._learned_path.exists()
+            self._learned_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._learned_path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(LEARNED_COLUMNS)
+                writer.writerow([
+                    key,
+                    *(nutrients[field] for field in NUTRIENT_FIELDS),
+                    "edamam",
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                ])
+
+    # ---- resolution ----
+
+    async def resolve(self, name: str) -> Resolution:
+        t0 = time.perf_counter()
+        key = normalize_name(name)
+        try:
+            res = await self._resolve(key) if key else Resolution(None, "miss")
+        except ServiceUnavailableError:
+            self._record("unavailable", t0)
+            raise
+        if res.nutrients is not None:
+            res = Resolution({"food_name": name, **res.nutrients}, res.tier)
+        self._record(res.tier, t0)
+        return res
+
+    def _record(self, tier: str, t0: float) -> None:
+        self._counts[tier] += 1
+        self._latency_ms[tier].append((time.perf_counter() - t0) * 1000.0)
+
+    async def _resolve(self, key: str) -> Resolution:
+        store = self.store()
+        row = store.row_id(key)
+        if row is not None:
+            return Resolution(_without_name(store.nutrients(row)), "exact")
+        learned = self._learned_table().get(key)
+        if learned is not None:
+            return Resolution(dict(learned), "learned")
+        hit = store.fuzzy_row_id(key, self._fuzzy_min_score)
+        if hit is not None:
+            return Resolution(_without_name(store.nutrients(hit[0])), "fuzzy")
+        if await self._misses.get(key):
+            return Resolution(None, "miss_cached")
+        nutrients = await self._flights.do(key, lambda: self._resolve_remote(key))
+        return Resolution(nutrients, "remote" if nutrients is not None else "miss")
+
+    async def _resolve_remote(self, key: str) -> Optional[Dict[str, float]]:
+        raw = await self._fetch(key)  # ServiceUnavailableError propagates, uncached
+        if raw is None:
+            await self._misses.set(key, True)
+            return None
+        nutrients = {REMOTE_FIELDS[k]: float(raw.get(k) or 0) for k in REMOTE_FIELDS}
+        await get_bulkhead("files").run(self._write_back, key, nutrients)
+        self._learned_table()[key] = nutrients
+        return dict(nutrients)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"learned_rows": len(self._learned or {}), "tiers": {}}
+        total = sum(self._counts.values())
+        for tier in TIERS:
+            lat = np.fromiter(self._latency_ms[tier], dtype=float) if self._latency_ms[tier] else np.zeros(1)
+            out["tiers"][tier] = {
+                "count": self._counts[tier],
+                "share": round(self._counts[tier] / total, 4) if total else 0.0,
+                "latency_ms": {"p50": float(np.percentile(lat, 50)), "p95": float(np.percentile(lat, 95))},
+            }
+        return out
+
+
+def _without_name(nutrients: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in nutrients.items() if k != "food_name"}
+
+
+@lru_cache(maxsize=1)
+def get_nutrient_resolver() -> NutrientResolver:
+    """Process-wide resolver so tier stats and the learned table are shared."""
+    return NutrientResolver()
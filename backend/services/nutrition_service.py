@@ -1,67 +1,62 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from backend.core.database import meals_collection
-from backend.services.nutrient_lookup import get_nutrients
+from backend.services.bulkheads import get_bulkhead
+from backend.services.disease_risk_table import get_disease_risk_table
+from backend.services.nutrient_resolver import Resolution, get_nutrient_resolver
+from backend.services.safety_rules import MEAL_DECISION_RULES, disease_flags
 from backend.utils.errors import NotFoundError
 
 
 class NutritionService:
-    def lookup(self, name: str) -> Dict[str, Any]:
-        nutrients = get_nutrients(name)
+    async def resolve(self, name: str) -> Resolution:
+        """Nutrients plus the tier that answered (local store, learned, fuzzy or remote)."""
+        res = await get_nutrient_resolver().resolve(name)
 
-        if not nutrients:
+        if res.nutrients is None:
             raise NotFoundError("Food not found.", details={"query": name})
 
-        return {
-            "food_name": name,
-            "calories": nutrients.get("calories", 0),
-            "protein": nutrients.get("protein", 0),
-            "fat": nutrients.get("fat", 0),
-            "carbs": nutrients.get("carbohydrates", 0),
-            "sugar": nutrients.get("sugar", 0),
-            "sodium": nutrients.get("sodium", 0),
-        }
+        return res
 
-    def disease_flags(self, nutrients: Dict[str, Any]) -> Dict[str, int]:
-        flags = {
-            "suitable_diabetes": 1,
-            "suitable_blood_pressure": 1,
-            "suitable_heart": 1,
-        }
+    async def lookup(self, name: str) -> Dict[str, Any]:
+        return (await self.resolve(name)).nutrients
 
-        if nutrients["sugar"] > 25:
-            flags["suitable_diabetes"] = 0
-
-        if nutrients["sodium"] > 500:
-            flags["suitable_blood_pressure"] = 0
-
-        if nutrients["fat"] > 30:
-            flags["suitable_heart"] = 0
-
-        return flags
+    def disease_flags(self, nutrients: Dict[str, Any]) -> Dict[str, Any]:
+        # Known foods: precomputed model output; otherwise threshold rules
+        table = get_disease_risk_table()
+        entry = table.get(nutrients.get("food_name")) if table is not None else None
+        return entry if entry is not None else disease_flags(nutrients)
 
 
 async def get_user_meals(user_id: str) -> List[Dict[str, Any]]:
     """
     Fetch user's meals history from Firestore using stream().
     """
+    return await get_bulkhead("firestore").run(_get_user_meals, user_id)
+
+
+def _get_user_meals(user_id: str) -> List[Dict[str, Any]]:
     meals_query = meals_collection.where("user_id", "==", user_id).order_by("timestamp").stream()
-    
+
     return [m.to_dict() for m in meals_query]
 
 
 from backend.core.database import meals_collection, users_collection
 
-async def analyze_user_query(user_id: str, food_name: str) -> Dict[str, Any]:
+async def analyze_user_query(
+    user_id: str, food_name: str, nutrients: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
     Main entry for food decision and storage (Firestore).
+    `nutrients` skips the lookup when the caller already resolved them.
     """
     service = NutritionService()
 
     # 🔍 Step 1: Get nutrients
-    nutrients = service.lookup(food_name)
+    if nutrients is None:
+        nutrients = await service.lookup(food_name)
 
     # 🧠 Step 2: Disease check
     flags = service.disease_flags(nutrients)
@@ -73,7 +68,8 @@ async def analyze_user_query(user_id: str, food_name: str) -> Dict[str, Any]:
         "nutrients": nutrients,
         "timestamp": datetime.utcnow()
     }
-    meals_collection.add(meal)
+    firestore = get_bulkhead("firestore")
+    await firestore.run(meals_collection.add, meal)
 
     # 📊 Step 4: Calculate total daily intake (Firestore history)
     all_meals = await get_user_meals(user_id)
@@ -95,32 +91,28 @@ async def analyze_user_query(user_id: str, food_name: str) -> Dict[str, Any]:
         total["carbs"] += n.get("carbs", 0)
 
     # ⚖️ Step 5: Decision logic + Detailed Reasoning
-    decision = "Eat"
-    reason = "This food fits well within your daily nutritional goals."
-    
     # Fetch user profile for context
-    user_doc = users_collection.document(user_id).get()
+    user_ref = users_collection.document(user_id)
+    user_doc = await firestore.run(user_ref.get)
     user_data = user_doc.to_dict() if user_doc.exists else {}
     diseases = [d.lower() for d in user_data.get("diseases", [])]
     calorie_limit = user_data.get("calorie_limit", 2000)
 
     # Update Calorie Remaining in Firestore
     calorie_remaining = calorie_limit - total["calories"]
-    users_collection.document(user_id).set({"calorie_remaining": calorie_remaining}, merge=True)
-
-    # Decision logic
-    if total["calories"] > calorie_limit:
-        decision = "Avoid"
-        reason = f"You've exceeded your daily calorie goal of {calorie_limit} kcal. Consider exercise to burn extra!"
-    elif "diabetes" in diseases and total["sugar"] > 40:
-        decision = "Avoid"
-        reason = f"Your daily sugar intake ({round(total['sugar'], 1)}g) is high for your diabetes management plan."
-    elif total["sodium"] > 2300:
-        decision = "Avoid"
-        reason = "Your sodium intake has exceeded the recommended daily limit of 2300mg."
-    elif nutrients.get("sugar", 0) > 15 and "diabetes" in diseases:
-        decision = "Caution"
-        reason = "This food is high in sugar. Since you have diabetes, consider a smaller portion."
+    await firestore.run(lambda: user_ref.set({"calorie_remaining": calorie_remaining}, merge=True))
+
+    # Decision logic (shared threshold rules)
+    verdict = MEAL_DECISION_RULES.evaluate({
+        "total_calories": total["calories"],
+        "calorie_limit": calorie_limit,
+        "total_sugar": total["sugar"],
+        "total_sodium": total["sodium"],
+        "food_sugar": nutrients.get("sugar", 0),
+        "has_diabetes": "diabetes" in diseases,
+    })
+    decision = verdict.label
+    reason = verdict.message
 
     return {
         "user_id": user_id,
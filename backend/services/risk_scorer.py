@@ -0,0 +1,231 @@
+"""
+Pure-NumPy scorer for the logistic-regression risk model.
+
+`ml_trainer.train_model` fits a scikit-learn `LogisticRegression`. For serving we
+export its coefficients, intercepts, class labels and feature order to a small
+JSON artifact and score with plain NumPy, so the API process never imports sklearn.
+
+Export an existing pickle:
+  python -m backend.services.risk_scorer
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+ARTIFACT_VERSION = 1
+
+# Feature order used by ml_trainer.train_model (and expected by the artifact)
+RISK_FEATURES: List[str] = [
+    "BMI", "Activity_Level_Encoded", "Calorie_Target", "Calories_Consumed",
+    "Protein_Consumed", "Carbs_Consumed", "Fat_Consumed", "Sugar_Consumed",
+    "Sodium_Consumed", "Sodium_Limit",
+]
+
+# Activity level -> Activity_Level_Encoded
+ACTIVITY_MAP: Dict[str, int] = {
+    "Sedentary": 0,
+    "Lightly Active": 0,
+    "Low": 0,
+    "Moderately Active": 1,
+    "Moderate": 1,
+    "Very Active": 2,
+    "High": 2,
+}
+
+# Model class -> risk level shown to users
+RISK_MAP: Dict[int, str] = {
+    0: "Safe",
+    1: "Caution",
+    2: "Danger",
+}
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    z /= z.sum(axis=1, keepdims=True)
+    return z
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class RiskScorer:
+    """
+    Reproduces `LogisticRegression.decision_function/predict/predict_proba`.
+
+    - Binary: sigmoid of a single decision column.
+    - "multinomial": softmax over classes (sklearn default for lbfgs with >2 classes).
+    - "ovr": per-class sigmoid normalized to sum to 1.
+    """
+
+    def __init__(
+        self,
+        *,
+        coef: np.ndarray,
+        intercept: np.ndarray,
+        classes: Sequence[Any],
+        feature_names: Sequence[str],
+        multi_class: str = "multinomial",
+    ):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = np.ascontiguousarray(intercept, dtype=np.float64).reshape(-1)
+        self.classes = np.asarray(classes)
+        self.feature_names = list(feature_names)
+        self.multi_class = multi_class
+        if self.coef.ndim != 2 or self.coef.shape[1] != len(self.feature_names):
+            raise ValueError(f"coef shape {self.coef.shape} does not match {len(self.feature_names)} features")
+        if self.coef.shape[0] != self.intercept.shape[0]:
+            raise ValueError("coef and intercept disagree on number of outputs")
+        # coef.T is reused on every call; keep a contiguous copy
+        self._coef_t = np.ascontiguousarray(self.coef.T)
+
+    # ---------- construction / persistence ----------
+
+    @classmethod
+    def from_model(cls, model, feature_names: Optional[Sequence[str]] = None) -> "RiskScorer":
+        """Build from a fitted sklearn LogisticRegression."""
+        names = feature_names
+        if names is None:
+            fitted = getattr(model, "feature_names_in_", None)
+            names = list(fitted) if fitted is not None else RISK_FEATURES
+        n_classes = len(model.classes_)
+        mode = getattr(model, "multi_class", "auto")
+        if mode in (None, "auto", "deprecated"):
+            mode = "ovr" if (n_classes <= 2 or getattr(model, "solver", "lbfgs") == "liblinear") else "multinomial"
+        return cls(
+            coef=model.coef_,
+            intercept=model.intercept_,
+            classes=model.classes_,
+            feature_names=names,
+            multi_class=mode,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": ARTIFACT_VERSION,
+            "model": "LogisticRegression",
+            "multi_class": self.multi_class,
+            "feature_names": self.feature_names,
+            "classes": self.classes.tolist(),
+            # float -> JSON uses repr, which round-trips float64 exactly
+            "coef": self.coef.tolist(),
+            "intercept": self.intercept.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, d: Mapping[str, Any]) -> "RiskScorer":
+        if int(d.get("version", 0)) != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported risk scorer artifact version: {d.get('version')}")
+        return cls(
+            coef=np.array(d["coef"], dtype=np.float64),
+            intercept=np.array(d["intercept"], dtype=np.float64),
+            classes=d["classes"],
+            feature_names=d["feature_names"],
+            multi_class=d.get("multi_class", "multinomial"),
+        )
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "RiskScorer":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    # ---------- inference ----------
+
+    def _as_matrix(self, X) -> np.ndarray:
+        if hasattr(X, "columns"):
+            X = X[self.feature_names].to_numpy(dtype=np.float64, copy=False)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected {len(self.feature_names)} features, got {X.shape[1]}")
+        return X
+
+    def rows_from_dicts(self, records: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Build an (n, n_features) matrix from dicts keyed by feature name (missing -> 0)."""
+        X = np.zeros((len(records), len(self.feature_names)), dtype=np.float64)
+        for i, r in enumerate(records):
+            for j, name in enumerate(self.feature_names):
+                X[i, j] = float(r.get(name, 0) or 0)
+        return X
+
+    def decision_function(self, X) -> np.ndarray:
+        scores = self._as_matrix(X) @ self._coef_t + self.intercept
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X) -> np.ndarray:
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            p = _sigmoid(scores)
+            return np.column_stack([1.0 - p, p])
+        if self.multi_class == "multinomial":
+            return _softmax(scores)
+        p = _sigmoid(scores)
+        p /= p.sum(axis=1, keepdims=True)
+        return p
+
+    def predict(self, X) -> np.ndarray:
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            return self.classes[(scores > 0).astype(int)]
+        return self.classes[scores.argmax(axis=1)]
+
+
+def export_risk_model(model, path: Optional[Union[str, Path]] = None) -> Path:
+    """Write the scorer artifact for a fitted LogisticRegression."""
+    if path is None:
+        from backend.config import get_settings
+
+        path = get_settings().risk_scorer_path
+    return RiskScorer.from_model(model).save(path)
+
+
+_loaded: Dict[Path, tuple] = {}
+
+
+def get_risk_scorer(path: Optional[Union[str, Path]] = None) -> Optional[RiskScorer]:
+    """
+    Return the process-wide scorer for `path`, reloading when the file changes.
+    Returns None if no artifact has been exported yet.
+    """
+    if path is None:
+        from backend.config import get_settings
+
+        path = get_settings().risk_scorer_path
+    path = Path(path)
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _loaded.get(path)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+    scorer = RiskScorer.load(path)
+    _loaded[path] = (sig, scorer)
+    return scorer
+
+
+if __name__ == "__main__":
+    import joblib
+
+    from backend.config import get_settings
+
+    s = get_settings()
+    out = export_risk_model(joblib.load(s.risk_model_path), s.risk_scorer_path)
+    print(f"Risk scorer exported to {out}")
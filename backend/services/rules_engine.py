@@ -0,0 +1,190 @@
+"""
+Declarative threshold rules evaluated over single records or whole batches.
+
+A rule is data: a label, a priority, a message (optionally a `str.format`
+template over the record's fields) and a list of conditions that must all hold.
+A condition compares a named field with a literal or with another field:
+
+    Rule("Avoid", priority=20, message="Sodium over {sodium_limit} mg",
+         when=[("total_sodium", ">", Field("sodium_limit"))])
+
+`RuleSet.evaluate` is the scalar fast path (plain Python, first match wins).
+`RuleSet.evaluate_batch` compiles the same rules to NumPy comparisons and labels
+every row of a DataFrame / dict of arrays in one pass.
+"""
+
+from __future__ import annotations
+
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Field:
+    """Reference to another field, for field-vs-field conditions."""
+
+    name: str
+
+
+# op -> (scalar operator, numpy ufunc)
+_OPS: Dict[str, Tuple[Callable[[Any, Any], bool], Callable[..., np.ndarray]]] = {
+    "<": (operator.lt, np.less),
+    "<=": (operator.le, np.less_equal),
+    ">": (operator.gt, np.greater),
+    ">=": (operator.ge, np.greater_equal),
+    "==": (operator.eq, np.equal),
+    "!=": (operator.ne, np.not_equal),
+    "in": (lambda a, b: a in b, lambda a, b: np.isin(a, list(b))),
+    "not in": (lambda a, b: a not in b, lambda a, b: ~np.isin(a, list(b))),
+}
+
+Condition = Tuple[str, str, Any]
+
+
+@dataclass(frozen=True)
+class Rule:
+    label: Any
+    when: Sequence[Condition]
+    priority: int = 0
+    message: str = ""
+
+    def __post_init__(self):
+        for cond in self.when:
+            if len(cond) != 3 or cond[1] not in _OPS:
+                raise ValueError(f"Invalid condition {cond!r} in rule {self.label!r}")
+
+    @property
+    def fields(self) -> List[str]:
+        out = []
+        for name, _, value in self.when:
+            out.append(name)
+            if isinstance(value, Field):
+                out.append(value.name)
+        return out
+
+
+@dataclass(frozen=True)
+class RuleResult:
+    label: Any
+    message: str
+    rule: Optional[Rule] = None
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    labels: np.ndarray
+    messages: np.ndarray
+    # index into RuleSet.rules (priority order) of the winning rule, -1 for default
+    rule_index: np.ndarray
+
+
+def _render(template: str, record: Mapping[str, Any]) -> str:
+    if "{" not in template:
+        return template
+    try:
+        return template.format(**record)
+    except (KeyError, IndexError, ValueError):
+        return template
+
+
+@dataclass
+class RuleSet:
+    """Ordered rules; the highest-priority matching rule wins (ties keep declaration order)."""
+
+    name: str
+    rules: Sequence[Rule]
+    default_label: Any = None
+    default_message: str = ""
+    _scalar: List[Callable[[Mapping[str, Any]], bool]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # stable sort: declaration order breaks priority ties
+        self.rules = sorted(self.rules, key=lambda r: -r.priority)
+        self._scalar = [self._compile_scalar(r) for r in self.rules]
+
+    @property
+    def fields(self) -> List[str]:
+        return sorted({f for r in self.rules for f in r.fields})
+
+    # ---------- scalar path ----------
+
+    @staticmethod
+    def _compile_scalar(rule: Rule) -> Callable[[Mapping[str, Any]], bool]:
+        checks = []
+        for name, op, value in rule.when:
+            fn = _OPS[op][0]
+            if isinstance(value, Field):
+                ref = value.name
+                checks.append(lambda r, n=name, f=fn, ref=ref: f(r[n], r[ref]))
+            else:
+                checks.append(lambda r, n=name, f=fn, v=value: f(r[n], v))
+        return lambda record: all(c(record) for c in checks)
+
+    def evaluate(self, record: Mapping[str, Any]) -> RuleResult:
+        """First matching rule for one record (no NumPy overhead)."""
+        for rule, check in zip(self.rules, self._scalar):
+            if check(record):
+                return RuleResult(rule.label, _render(rule.message, record), rule)
+        return RuleResult(self.default_label, _render(self.default_message, record), None)
+
+    def matching(self, record: Mapping[str, Any]) -> List[Rule]:
+        """Every rule that matches (for independent flags rather than a single label)."""
+        return [rule for rule, check in zip(self.rules, self._scalar) if check(record)]
+
+    # ---------- vectorized path ----------
+
+    def match_matrix(self, columns) -> np.ndarray:
+        """(n_rows, n_rules) boolean matrix of rule matches, rules in priority order."""
+        arrays: Dict[str, np.ndarray] = {}
+
+        def col(name: str) -> np.ndarray:
+            if name not in arrays:
+                arrays[name] = np.asarray(columns[name])
+            return arrays[name]
+
+        if not self.fields:
+            raise ValueError(f"RuleSet {self.name!r} has no conditions to evaluate")
+        n = len(col(self.fields[0]))
+        out = np.ones((n, len(self.rules)), dtype=bool)
+        for j, rule in enumerate(self.rules):
+            for name, op, value in rule.when:
+                rhs = col(value.name) if isinstance(value, Field) else value
+                out[:, j] &= _OPS[op][1](col(name), rhs)
+        return out
+
+    def evaluate_batch(self, columns) -> BatchResult:
+        """
+        Label every row of `columns` (DataFrame or mapping of equal-length arrays).
+        Message templates are rendered only for rows whose rule uses one.
+        """
+        matches = self.match_matrix(columns)
+        n = matches.shape[0]
+        any_match = matches.any(axis=1)
+        rule_index = np.where(any_match, matches.argmax(axis=1), -1)
+
+        labels = np.empty(n, dtype=object)
+        labels[:] = self.default_label
+        messages = np.empty(n, dtype=object)
+        messages[:] = self.default_message
+
+        for j, rule in enumerate(self.rules):
+            rows = np.flatnonzero(rule_index == j)
+            if rows.size == 0:
+                continue
+            labels[rows] = rule.label
+            messages[rows] = rule.message
+            if "{" in rule.message:
+                messages[rows] = [_render(rule.message, _row(columns, i)) for i in rows]
+        if "{" in self.default_message:
+            rows = np.flatnonzero(rule_index == -1)
+            messages[rows] = [_render(self.default_message, _row(columns, i)) for i in rows]
+        return BatchResult(labels=labels, messages=messages, rule_index=rule_index)
+
+
+def _row(columns, i: int) -> Dict[str, Any]:
+    if hasattr(columns, "iloc"):
+        return columns.iloc[i].to_dict()
+    return {k: v[i] for k, v in columns.items()}
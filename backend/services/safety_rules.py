@@ -0,0 +1,104 @@
+"""
+All nutrient threshold rules in one place.
+
+Used by:
+- SAFETY_LABEL_RULES: `/safety/check-safety` and batch cohort scoring
+- MEAL_DECISION_RULES: `nutrition_service.analyze_user_query` (Eat / Caution / Avoid)
+- FOOD_DECISION_RULES: `food_service.analyze_food` (Safe / Caution / Avoid)
+- DISEASE_FLAG_RULES: `NutritionService.disease_flags` (each match clears one flag)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Mapping
+
+import numpy as np
+
+from backend.services.rules_engine import Field, Rule, RuleSet
+
+# Fields: calorie_remaining, sodium_remaining, fiber_remaining
+SAFETY_LABEL_RULES = RuleSet(
+    "safety_label",
+    [
+        Rule("Calorie limit exceeded", [("calorie_remaining", "<", 0)], priority=50),
+        Rule("Sodium limit exceeded", [("sodium_remaining", "<", 0)], priority=40),
+        Rule("Fiber limit reached", [("fiber_remaining", "==", 0)], priority=30),
+        Rule("Restricted – fiber limit critical", [("fiber_remaining", "<", 2)], priority=20),
+        Rule("Caution – low fiber budget", [("fiber_remaining", "<", 5)], priority=10),
+    ],
+    default_label="Safe",
+)
+
+# Fields: total_calories, calorie_limit, total_sugar, total_sodium, food_sugar, has_diabetes
+MEAL_DECISION_RULES = RuleSet(
+    "meal_decision",
+    [
+        Rule(
+            "Avoid",
+            [("total_calories", ">", Field("calorie_limit"))],
+            priority=40,
+            message="You've exceeded your daily calorie goal of {calorie_limit} kcal. Consider exercise to burn extra!",
+        ),
+        Rule(
+            "Avoid",
+            [("has_diabetes", "==", True), ("total_sugar", ">", 40)],
+            priority=30,
+            message="Your daily sugar intake ({total_sugar:.1f}g) is high for your diabetes management plan.",
+        ),
+        Rule(
+            "Avoid",
+            [("total_sodium", ">", 2300)],
+            priority=20,
+            message="Your sodium intake has exceeded the recommended daily limit of 2300mg.",
+        ),
+        Rule(
+            "Caution",
+            [("food_sugar", ">", 15), ("has_diabetes", "==", True)],
+            priority=10,
+            message="This food is high in sugar. Since you have diabetes, consider a smaller portion.",
+        ),
+    ],
+    default_label="Eat",
+    default_message="This food fits well within your daily nutritional goals.",
+)
+
+# Fields: sugar, calories (per serving)
+FOOD_DECISION_RULES = RuleSet(
+    "food_decision",
+    [
+        Rule("Avoid", [("sugar", ">", 15)], priority=20, message="High sugar content"),
+        Rule("Caution", [("calories", ">", 500)], priority=10, message="High calories per serving"),
+    ],
+    default_label="Safe",
+    default_message="Within safe limits",
+)
+
+# Fields: sugar, sodium, fat. Label = flag that becomes 0 when the rule matches.
+DISEASE_FLAG_RULES = RuleSet(
+    "disease_flags",
+    [
+        Rule("suitable_diabetes", [("sugar", ">", 25)], message="High sugar"),
+        Rule("suitable_blood_pressure", [("sodium", ">", 500)], message="High sodium"),
+        Rule("suitable_heart", [("fat", ">", 30)], message="High fat"),
+    ],
+)
+
+DISEASE_FLAGS = ["suitable_diabetes", "suitable_blood_pressure", "suitable_heart"]
+
+
+def disease_flags(nutrients: Mapping[str, Any]) -> Dict[str, int]:
+    """1 = suitable, 0 = a threshold rule fired."""
+    flags = {f: 1 for f in DISEASE_FLAGS}
+    record = {k: float(nutrients.get(k, 0) or 0) for k in DISEASE_FLAG_RULES.fields}
+    for rule in DISEASE_FLAG_RULES.matching(record):
+        flags[rule.label] = 0
+    return flags
+
+
+def disease_flags_batch(columns) -> Dict[str, np.ndarray]:
+    """Vectorized `disease_flags` over a DataFrame / mapping of arrays with sugar, sodium, fat."""
+    matches = DISEASE_FLAG_RULES.match_matrix(columns)
+    flags = {f: np.ones(matches.shape[0], dtype=int) for f in DISEASE_FLAGS}
+    for j, rule in enumerate(DISEASE_FLAG_RULES.rules):
+        flags[rule.label][matches[:, j]] = 0
+    return flags
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+import pytest
+
+from backend.services.bulkheads import Bulkhead, bulkhead_stats, close_bulkheads, get_bulkhead
+from backend.utils.errors import ServiceUnavailableError
+
+
+def test_saturated_pool_rejects_immediately_and_recovers():
+    gate = threading.Event()
+    pool = Bulkhead("test", workers=1, max_queue=1)
+    running = pool.submit(gate.wait, 5)
+    queued = pool.submit(lambda: "queued")
+
+    with pytest.raises(ServiceUnavailableError) as exc:
+        pool.submit(lambda: "rejected")
+    assert exc.value.status_code == 503
+    assert exc.value.details["pool"] == "test"
+
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["queued"] + stats["running"] == 2
+
+    gate.set()
+    running.result(timeout=5)
+    assert queued.result(timeout=5) == "queued"
+    assert pool.submit(lambda: 42).result(timeout=5) == 42
+
+    stats = pool.stats()
+    assert stats["completed"] == 3
+    assert stats["queued"] == 0 and stats["running"] == 0
+    assert stats["wait_ms"]["max"] > 0
+    pool.shutdown()
+
+
+def test_run_awaits_on_pool_threads():
+    pool = Bulkhead("names", workers=2, max_queue=0)
+
+    async def main():
+        return await asyncio.gather(*(pool.run(lambda: threading.current_thread().name) for _ in range(2)))
+
+    names = asyncio.run(main())
+    assert all(n.startswith("bulkhead-names") for n in names)
+    pool.shutdown()
+
+
+def test_pools_are_isolated_per_subsystem():
+    close_bulkheads()
+    try:
+        image, password = get_bulkhead("image"), get_bulkhead("password")
+        assert image is get_bulkhead("image")
+        assert image is not password
+
+        gate = threading.Event()
+        blocked = [image.submit(gate.wait, 5) for _ in range(image.capacity)]
+        with pytest.raises(ServiceUnavailableError):
+            image.submit(lambda: None)
+        # A saturated image pool does not affect password hashing
+        assert password.submit(lambda: "ok").result(timeout=5) == "ok"
+
+        assert set(bulkhead_stats()) == {"image", "password"}
+        gate.set()
+        for f in blocked:
+            f.result(timeout=5)
+        with pytest.raises(ValueError):
+            get_bulkhead("nope")
+    finally:
+        close_bulkheads()
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from backend.utils.cache import SingleFlight
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "roti"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flights.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        results = await asyncio.gather(*followers)
+        return results, flights.inflight
+
+    results, inflight = asyncio.run(main())
+    assert results == ["roti"] * 3
+    assert calls == [1] and inflight == 0
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    flights = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("down")
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", boom) for _ in range(2)), return_exceptions=True)
+
+    out = asyncio.run(main())
+    assert all(isinstance(e, ValueError) for e in out) and flights.inflight == 0
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services.class_nutrient_table import UNRESOLVED, build_class_nutrient_table
+from backend.services.food_store import FoodStore
+
+
+def _store():
+    return FoodStore(
+        ["dal tadka", "ladoo (besan)", "roti"],
+        {
+            "energy_kcal": np.array([180.0, 450.0, 120.0]),
+            "protein_g": np.array([9.0, 8.0, 3.5]),
+            "sugars_g": np.array([2.0, 30.0, 0.5]),
+        },
+    )
+
+
+def test_store_exact_fuzzy_and_nutrient_shape():
+    store = _store()
+    assert store.row_id("  Dal   TADKA ") == 0
+    assert store.row_id("Besan Ladoo") is None
+    row, score = store.fuzzy_row_id("Besan Ladoo")
+    assert row == 1 and score == pytest.approx(100.0)
+    assert store.fuzzy_row_id("Paneer Tikka") is None
+    assert store.nutrients(2) == {
+        "food_name": "roti",
+        "calories": 120.0,
+        "protein": 3.5,
+        "fat": 0.0,  # missing columns read as zero
+        "carbs": 0.0,
+        "sugar": 0.5,
+        "sodium": 0.0,
+    }
+
+
+def test_store_from_frame_drops_blank_and_duplicate_names():
+    df = pd.DataFrame({
+        "food_name_normalized": ["roti", "", "roti", "dal"],
+        "energy_kcal": [120.0, 1.0, 999.0, 180.0],
+    })
+    store = FoodStore.from_frame(df)
+    assert store.names == ["roti", "dal"]
+    assert store.nutrients(store.row_id("roti"))["calories"] == 120.0
+
+
+def test_class_table_resolves_through_mapping_and_reports_gaps():
+    mapping = {"dal": "Dal Tadka", "ladoo": "Besan Ladoo", "sushi": "Veg Sushi Roll"}
+    table = build_class_nutrient_table(
+        ["dal", "ladoo", "roti", "sushi", "waffles"], mapping, _store(), extra_labels=["Roti", "Kheer"]
+    )
+    assert table.row_ids.dtype == np.int32
+    assert table.row_ids.tolist() == [0, 1, 2, UNRESOLVED, UNRESOLVED]
+    assert table.row_for_class(3) is None and table.row_for_class(99) is None
+    assert table.row_for_label("Roti") == 2 and table.row_for_label("Kheer") is None
+    assert table.report["unmapped"] == ["roti", "waffles", "Roti", "Kheer"]
+    assert [f["label"] for f in table.report["fuzzy"]] == ["ladoo"]
+    assert {u["label"] for u in table.report["unresolvable"]} == {"sushi", "waffles", "Kheer"}
+    assert table.summary() == {"classes": 5, "resolved": 3, "fuzzy": 1, "unmapped": 4, "unresolvable": 3}
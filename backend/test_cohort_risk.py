@@ -0,0 +1,39 @@
+import io
+
+import numpy as np
+
+from backend.services.cohort_risk import intake_csv_to_frame, profiles_to_frame, score_cohort
+from backend.services.risk_scorer import RISK_FEATURES, RiskScorer
+
+CSV = """User ID,BMI,Medical Condition,Activity Level,Calorie Target kcal,Fiber Target g,Sodium Limit mg,Calories Consumed kcal,Fiber Consumed g,Protein Consumed g,Carbs Consumed g,Fat Consumed g,Sodium Consumed mg,Sugar Consumed g
+U1,24.0,Healthy,Sedentary,2000,25,2300,2100,10,50,200,60,1500,30
+U2,31.0,Diabetes Type 2,Very Active,2500,30,2300,1800,29,80,220,70,2400,40
+U3,22.0,Kidney Disease,Moderate,2000,25,1500,1500,21,60,180,50,1000,20
+"""
+
+
+def _scorer():
+    coef = np.zeros((3, len(RISK_FEATURES)))
+    coef[1, RISK_FEATURES.index("Sodium_Consumed")] = 0.01
+    return RiskScorer(coef=coef, intercept=np.array([0.0, -20.0, -5.0]), classes=[0, 1, 2], feature_names=RISK_FEATURES)
+
+
+def test_csv_cohort_labels_and_risk():
+    scored = score_cohort(intake_csv_to_frame(io.StringIO(CSV)), scorer=_scorer()).set_index("user_id")
+
+    assert scored.loc["U1", "safety_label"] == "Calorie limit exceeded"
+    assert bool(scored.loc["U1", "needs_exercise"]) is True
+    assert scored.loc["U2", "safety_label"] == "Sodium limit exceeded"
+    assert scored.loc["U3", "safety_label"] == "Caution – low fiber budget"
+
+    assert scored.loc["U1", "risk_level"] == "Safe"
+    assert scored.loc["U2", "risk_level"] == "Caution"  # 0.01 * 2400 - 20 > 0
+    assert scored.loc["U3", "risk_level"] == "N/A"  # condition not covered by the model
+
+
+def test_missing_profiles_are_not_scored():
+    frame = profiles_to_frame({"a": {"calories_consumed": 100, "medical_condition": "Healthy"}, "b": None})
+    scored = score_cohort(frame, scorer=_scorer()).set_index("user_id")
+    assert scored.loc["a", "risk_level"] == "Safe"
+    assert scored.loc["b", "risk_level"] == "N/A"
+    assert scored.loc["b", "calorie_remaining"] == 2000.0
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services.disease_risk_table import build_risk_table, compute_entries, get_disease_risk_table
+
+
+def _catalog(n=200, seed=0):
+    from ml_model.training.disease_model import NUTRIENT_FEATURES, add_engineered_features
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.uniform(0, 100, size=(n, len(NUTRIENT_FEATURES))), columns=NUTRIENT_FEATURES)
+    df["sodium_mg"] *= 10
+    df["food_name_normalized"] = [f"food {i}" for i in range(n)]
+    return add_engineered_features(df)
+
+
+def test_rules_fallback_and_lookup(tmp_path):
+    catalog = _catalog(3)
+    catalog.loc[0, ["sugars_g", "sodium_mg", "total_fat_g"]] = [30, 100, 10]
+    path = build_risk_table(catalog, model_dir=tmp_path / "no_models", out_path=tmp_path / "table.json")
+
+    table = get_disease_risk_table(path)
+    assert len(table) == 3
+    entry = table.get("  FOOD   0 ")
+    assert (entry["suitable_diabetes"], entry["suitable_blood_pressure"], entry["suitable_heart"]) == (0, 1, 1)
+    assert entry["sources"]["suitable_diabetes"] == "rules"
+    assert "diabetes_risk" not in entry  # rules have no probability
+    assert table.get("unknown food") is None
+
+    entry["suitable_diabetes"] = 1
+    assert table.get("food 0")["suitable_diabetes"] == 0
+
+
+def test_model_entries_match_batch_prediction(tmp_path):
+    pytest.importorskip("sklearn")
+    from ml_model.training.disease_model import predict_disease_risk, train_disease_models
+
+    catalog = _catalog()
+    catalog["suitable_diabetes"] = (catalog["sugars_g"] < 40).astype(int)
+    catalog["suitable_blood_pressure"] = (catalog["sodium_mg"] < 600).astype(int)
+    catalog["suitable_heart"] = (catalog["saturated_fat_g"] < 50).astype(int)
+    train_disease_models(catalog, tmp_path)
+
+    entries = compute_entries(catalog.head(5), tmp_path)
+    single = predict_disease_risk(catalog.iloc[2].to_dict(), tmp_path)
+    entry = entries["food 2"]
+    assert entry["heart_risk"]["source"] == "model"
+    assert entry["suitable_heart"] == single["suitable_heart"]["label"]
+    assert entry["heart_risk"]["probability"] == pytest.approx(single["suitable_heart"]["probability"], abs=1e-6)
+
+
+def test_table_entries_validate_as_response_schema(tmp_path):
+    from backend.schemas.food import PredictFoodResponse
+
+    path = build_risk_table(_catalog(3), model_dir=tmp_path / "no_models", out_path=tmp_path / "table.json")
+    entry = get_disease_risk_table(path).get("food 1")
+    resp = PredictFoodResponse(food_name="food 1", disease_suitability=entry)
+    assert resp.disease_suitability.suitable_heart == entry["suitable_heart"]
+    assert resp.disease_suitability.heart_risk is None
+
+
+def test_shipped_table_holds_model_probabilities():
+    table = get_disease_risk_table()
+    if table is None:
+        pytest.skip("no shipped disease risk table")
+    entry = table.get("roti (wheat)")
+    assert entry["sources"]["suitable_diabetes"] == "model"
+    assert 0.0 <= entry["diabetes_risk"]["probability"] <= 1.0
@@ -0,0 +1,224 @@
+import asyncio
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from backend.services.food_store import FoodStore
+from backend.services.nutrient_resolver import NutrientResolver
+from backend.utils.cache import TTLCache
+
+
+class FakeDoc:
+    def __init__(self, data):
+        self._data = data
+        self.exists = data is not None
+        self.id = None
+
+    def to_dict(self):
+        return dict(self._data or {})
+
+
+class FakeDocRef:
+    def __init__(self, store, doc_id):
+        self._store, self._id = store, doc_id
+
+    def get(self):
+        return FakeDoc(self._store.get(self._id))
+
+    def set(self, data, merge=False):
+        base = self._store.get(self._id, {}) if merge else {}
+        self._store[self._id] = {**base, **data}
+
+
+class FakeCollection:
+    """The few Firestore collection calls the food analysis path makes."""
+
+    def __init__(self):
+        self.docs = {}
+        self.added = []
+        self._filters = []
+
+    def add(self, data):
+        self.added.append(dict(data))
+
+    def document(self, doc_id):
+        return FakeDocRef(self.docs, doc_id)
+
+    def where(self, field, op, value):
+        q = FakeCollection()
+        q.added = [d for d in self.added if d.get(field) == value]
+        return q
+
+    def order_by(self, field):
+        q = FakeCollection()
+        q.added = sorted(self.added, key=lambda d: d[field])
+        return q
+
+    def stream(self):
+        return [FakeDoc(d) for d in self.added]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = types.ModuleType("backend.core.database")
+    db.db = None
+    db.meals_collection = FakeCollection()
+    db.users_collection = FakeCollection()
+    monkeypatch.setitem(sys.modules, "backend.core.database", db)
+    for name in ("backend.services.nutrition_service", "backend.services.food_analysis_service"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    return db
+
+
+def _response(result):
+    """Same construction as the /predict_food route."""
+    from backend.schemas.food import PredictFoodResponse
+
+    return PredictFoodResponse(
+        food_name=result.food_name,
+        detected_from_image=result.detected_from_image,
+        mapped_food_name=result.mapped_food_name,
+        model_confidence=result.model_confidence,
+        similarity=result.similarity,
+        nutrient_source=result.nutrient_source,
+        nutrients=result.nutrients,
+        disease_suitability=result.disease_flags,
+        diet_type=result.diet_type,
+        recommendation_notes=result.recommendation_notes,
+    )
+
+
+def test_local_store_food_resolves_through_to_response(fake_db, tmp_path, monkeypatch):
+    from backend.services import cache_provider, nutrition_service
+    from backend.services.food_analysis_service import FoodAnalysisService
+
+    async def no_remote(name):
+        raise AssertionError(f"unexpected remote lookup for {name}")
+
+    store = FoodStore(
+        ["roti (wheat)"],
+        {"energy_kcal": np.array([120.0]), "sugars_g": np.array([0.5]), "sodium_mg": np.array([200.0])},
+    )
+    resolver = NutrientResolver(
+        store=store, learned_path=tmp_path / "remote.csv", fetch=no_remote, miss_cache=TTLCache(ttl_seconds=60)
+    )
+    monkeypatch.setattr(nutrition_service, "get_nutrient_resolver", lambda: resolver)
+    cache_provider.get_cache.cache_clear()
+    fake_db.users_collection.document("u1").set({"calorie_limit": 2000})
+
+    svc = FoodAnalysisService(classifier=object(), nutrition=nutrition_service.NutritionService())
+    try:
+        result = asyncio.run(svc.analyze(user_id="u1", food_name="Roti (Wheat)"))
+    finally:
+        cache_provider.get_cache.cache_clear()
+
+    resp = _response(result)
+    assert resp.nutrient_source == "exact"
+    assert result.nutrients["calories"] == 120.0
+    # Catalog food: flags come from the shipped disease risk table, and validate
+    assert resp.disease_suitability.suitable_diabetes in (0, 1)
+    assert fake_db.users_collection.docs["u1"]["calorie_remaining"] < 2000
+
+
+class RedIsRotiBackend:
+    name = "fake"
+
+    def predict_batch(self, x):
+        probs = np.zeros((len(x), 2), dtype=np.float32)
+        probs[np.arange(len(x)), (x[:, 0, 0, 0] > 0).astype(int)] = 1.0
+        return probs
+
+
+def _png(rgb):
+    import io
+
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), rgb).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _analyze_red_image(tmp_path, monkeypatch, mapped_label):
+    import json
+
+    from backend.config import get_settings
+    from backend.services import cache_provider, food_model_service
+    from backend.services.food_analysis_service import FoodAnalysisService
+    from backend.services.nutrition_service import NutritionService
+    from ml_model.training import food_backends
+
+    mapping_path = tmp_path / "food_mapping.json"
+    mapping_path.write_text(json.dumps({"roti": mapped_label}), encoding="utf-8")
+    monkeypatch.setattr(get_settings(), "food_mapping_path", mapping_path)
+    (tmp_path / "class_names.txt").write_text("dal\nroti\n", encoding="utf-8")
+    store = FoodStore(["roti (wheat)"], {"energy_kcal": np.array([120.0])})
+    monkeypatch.setattr(food_model_service, "get_food_store", lambda: store)
+    monkeypatch.setattr(food_backends, "load_backend", lambda kind, model_dir: RedIsRotiBackend())
+    cache_provider.get_prediction_cache.cache_clear()
+    cache_provider.get_cache.cache_clear()
+
+    classifier = food_model_service.FoodClassifierService(model_dir=tmp_path, max_batch_size=2, max_wait_ms=1)
+    svc = FoodAnalysisService(classifier=classifier, nutrition=NutritionService())
+    try:
+        result = asyncio.run(svc.analyze(user_id="u1", image_bytes=_png((255, 0, 0))))
+    finally:
+        cache_provider.get_prediction_cache.cache_clear()
+        cache_provider.get_cache.cache_clear()
+
+    return result
+
+
+def test_image_label_resolved_to_local_row_reaches_response(fake_db, tmp_path, monkeypatch):
+    result = _analyze_red_image(tmp_path, monkeypatch, "Roti (Wheat)")
+    resp = _response(result)
+    assert resp.detected_from_image and resp.mapped_food_name == "Roti (Wheat)"
+    assert resp.nutrient_source == "label_table"
+    assert resp.model_confidence == 1.0 and resp.similarity is None  # softmax, not kNN
+    assert result.nutrients["calories"] == 120.0
+    assert resp.disease_suitability.suitable_heart in (0, 1)
+
+
+def test_fuzzy_resolved_label_uses_disease_table_row(fake_db, tmp_path, monkeypatch):
+    from backend.services.disease_risk_table import get_disease_risk_table
+
+    # "Wheat Roti" is not a catalog name; load-time fuzzy match resolves it to "roti (wheat)"
+    result = _analyze_red_image(tmp_path, monkeypatch, "Wheat Roti")
+    resp = _response(result)
+    assert resp.mapped_food_name == "Wheat Roti" and resp.nutrient_source == "label_table"
+    entry = get_disease_risk_table().get("roti (wheat)")
+    assert entry is not None and get_disease_risk_table().get("wheat roti") is None
+    assert result.disease_flags == entry  # table entry, not the threshold-rule fallback
+
+
+def test_saturated_firestore_pool_fails_fast_on_scan_path(fake_db, monkeypatch):
+    import threading
+    import time
+
+    from backend.config import get_settings
+    from backend.services import cache_provider
+    from backend.services.bulkheads import close_bulkheads, get_bulkhead
+    from backend.services.food_analysis_service import FoodAnalysisService
+    from backend.services.nutrition_service import NutritionService
+    from backend.utils.errors import ServiceUnavailableError
+
+    close_bulkheads()
+    monkeypatch.setattr(get_settings(), "firestore_pool_workers", 1)
+    monkeypatch.setattr(get_settings(), "firestore_pool_queue", 0)
+    gate = threading.Event()
+    cache_provider.get_cache.cache_clear()
+    try:
+        get_bulkhead("firestore").submit(gate.wait, 10)  # the only slot, held by a stuck call
+        svc = FoodAnalysisService(classifier=object(), nutrition=NutritionService())
+        t0 = time.perf_counter()
+        with pytest.raises(ServiceUnavailableError) as exc:
+            asyncio.run(svc.analyze(user_id="u1", food_name="Roti (Wheat)"))
+        assert time.perf_counter() - t0 < 5
+        assert exc.value.status_code == 503 and exc.value.details["pool"] == "firestore"
+        assert fake_db.meals_collection.added == []
+    finally:
+        gate.set()
+        close_bulkheads()
+        cache_provider.get_cache.cache_clear()
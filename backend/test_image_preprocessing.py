@@ -0,0 +1,88 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from backend.utils.image_preprocessing import model_pixels_from_bytes, normalize_mobilenetv2
+
+
+def _jpeg(size=(2400, 1800)):
+    rng = np.random.default_rng(0)
+    small = (rng.normal(size=(18, 24, 3)) * 60 + 128).clip(0, 255).astype(np.uint8)
+    img = Image.fromarray(small).resize(size, Image.Resampling.BICUBIC)
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=92)
+    return img, buf.getvalue()
+
+
+def test_single_decode_matches_full_resolution_resize():
+    img, data = _jpeg()
+    pixels = model_pixels_from_bytes(data)
+    assert pixels.shape == (224, 224, 3) and pixels.dtype == np.uint8
+
+    exact = np.asarray(img.resize((224, 224), Image.Resampling.LANCZOS), dtype=np.float32)
+    assert np.abs(pixels.astype(np.float32) - exact).mean() < 1.0
+
+
+def test_normalize_writes_into_preallocated_buffer():
+    pixels = np.array([[[0, 127, 255]]], dtype=np.uint8)
+    buf = np.full((2, 1, 1, 3), 9.0, dtype=np.float32)
+    out = normalize_mobilenetv2(pixels, out=buf[0])
+    assert np.shares_memory(out, buf)
+    np.testing.assert_allclose(buf[0, 0, 0], [-1.0, 127 / 127.5 - 1.0, 1.0], atol=1e-6)
+    assert buf[1, 0, 0, 0] == 9.0
+
+
+def test_process_pool_decodes_into_shared_memory():
+    import asyncio
+
+    from backend.services.image_pool import ImageDecodePool
+
+    _, data = _jpeg((640, 480))
+    expected = model_pixels_from_bytes(data)
+    pool = ImageDecodePool(workers=2, slots=2)
+    try:
+
+        async def main():
+            handles = await asyncio.gather(*(pool.decode(data) for _ in range(2)))
+            assert not pool._free  # both slots held
+            for h in handles:
+                np.testing.assert_array_equal(h.array, expected)
+                h.release()
+            with await pool.decode(data) as again:  # reuses a released slot
+                np.testing.assert_array_equal(again.array, expected)
+
+        asyncio.run(main())
+        assert sorted(pool._free) == [0, 1]
+    finally:
+        pool.close()
+
+
+def test_cancelled_decode_keeps_slot_until_worker_finishes(monkeypatch):
+    import asyncio
+    from concurrent.futures import Future
+
+    import pytest
+
+    from backend.services.image_pool import ImageDecodePool
+
+    pool = ImageDecodePool(workers=1, slots=1)
+    running = Future()  # stands in for a decode still writing into the slot
+    running.set_running_or_notify_cancel()  # started, so it can no longer be cancelled
+    monkeypatch.setattr(pool._executor, "submit", lambda *a: running)
+    try:
+
+        async def main():
+            task = asyncio.ensure_future(pool.decode(b"img"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert pool._free == []  # worker not done: slot still reserved
+            running.set_result(None)
+            await asyncio.sleep(0.01)
+            assert pool._free == [0]
+
+        asyncio.run(main())
+    finally:
+        pool.close()
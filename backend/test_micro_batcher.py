@@ -0,0 +1,256 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.services.micro_batcher import MicroBatcher
+
+
+def test_concurrent_submits_are_batched_and_routed_back():
+    calls = []
+
+    def infer(x):
+        calls.append(len(x))
+        return x.sum(axis=1)
+
+    async def main():
+        batcher = MicroBatcher(infer, max_batch_size=8, max_wait_ms=50)
+        outs = await asyncio.gather(*(batcher.submit(np.full(3, i, dtype=float)) for i in range(20)))
+        metrics = batcher.metrics()
+        await batcher.close()
+        return outs, metrics
+
+    outs, metrics = asyncio.run(main())
+    assert [float(o) for o in outs] == [3.0 * i for i in range(20)]
+    assert calls == [8, 8, 4]
+    assert metrics["batch_size_histogram"] == {4: 1, 8: 2}
+    assert metrics["items"] == 20
+
+
+def test_partial_batch_flushes_after_max_wait():
+    async def main():
+        batcher = MicroBatcher(lambda x: x * 2, max_batch_size=64, max_wait_ms=5)
+        out = await asyncio.wait_for(batcher.submit(np.array([1.0])), timeout=1.0)
+        metrics = batcher.metrics()
+        await batcher.close()
+        return out, metrics
+
+    out, metrics = asyncio.run(main())
+    assert out.tolist() == [2.0]
+    assert metrics["batch_size_histogram"] == {1: 1}
+    assert metrics["queue_delay_ms"]["max"] >= 4.0
+
+
+def test_batch_errors_reach_every_caller():
+    def infer(x):
+        raise RuntimeError("boom")
+
+    async def main():
+        batcher = MicroBatcher(infer, max_batch_size=4, max_wait_ms=1)
+        results = await asyncio.gather(*(batcher.submit(np.zeros(2)) for _ in range(3)), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+class FakeBackend:
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_batch(self, x):
+        self.calls.append(x.shape)
+        probs = np.zeros((len(x), 2), dtype=np.float32)
+        probs[np.arange(len(x)), (x[:, 0, 0, 0] > 0).astype(int)] = 1.0  # red channel decides the class
+        return probs
+
+    def warmup(self, sizes):
+        for n in sizes:
+            self.predict_batch(np.zeros((n, 224, 224, 3), dtype=np.float32))
+
+
+def _png(rgb):
+    import io
+
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (32, 32), rgb).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def classifier(tmp_path, monkeypatch):
+    from backend.services import cache_provider
+    from backend.services.food_model_service import FoodClassifierService
+    from ml_model.training import food_backends
+
+    cache_provider.get_prediction_cache.cache_clear()
+    backend = FakeBackend()
+    (tmp_path / "class_names.txt").write_text("dal\nroti\n", encoding="utf-8")
+    monkeypatch.setattr(food_backends, "load_backend", lambda kind, model_dir: backend)
+    svc = FoodClassifierService(model_dir=tmp_path, max_batch_size=4, max_wait_ms=20, backend="tflite")
+    yield svc, backend
+    cache_provider.get_prediction_cache.cache_clear()
+
+
+def test_food_classifier_batches_through_pluggable_backend(classifier):
+    svc, backend = classifier
+
+    async def main():
+        warm = await svc.warmup([1, 4])
+        assert warm["batch_sizes"] == [1, 4]
+        backend.calls.clear()
+        return await asyncio.gather(*(svc.predict(_png((255 - i, 0, 0))) for i in range(4)))
+
+    preds = asyncio.run(main())
+    assert {p.class_name for p in preds} == {"roti"}
+    assert backend.calls == [(4, 224, 224, 3)]
+    assert svc.backend_name == "fake"
+
+
+def test_identical_uploads_share_one_inference_and_hit_cache(classifier):
+    svc, backend = classifier
+    img = _png((0, 0, 255))
+
+    async def main():
+        first = await asyncio.gather(*(svc.predict(img) for _ in range(5)))
+        again = await svc.predict(img)
+        return first, again
+
+    first, again = asyncio.run(main())
+    assert backend.calls == [(1, 224, 224, 3)]
+    assert {p.class_name for p in first} == {"dal"} and again.class_name == "dal"
+
+
+def test_retrained_model_does_not_reuse_cached_predictions(classifier, tmp_path):
+    import os
+
+    from backend.services.food_model_service import FoodClassifierService
+
+    svc, backend = classifier
+    img = _png((255, 0, 0))
+    assert asyncio.run(svc.predict(img)).class_name == "roti"
+
+    # Same image, new artifacts: the class list changed and the file is newer
+    names = tmp_path / "class_names.txt"
+    names.write_text("dal\nidli\n", encoding="utf-8")
+    st = names.stat()
+    os.utime(names, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    retrained = FoodClassifierService(model_dir=tmp_path, max_batch_size=4, max_wait_ms=1, backend="tflite")
+    assert asyncio.run(retrained.predict(img)).class_name == "idli"
+    assert len(backend.calls) == 2
+
+
+def test_predictions_carry_local_nutrient_row(classifier, monkeypatch):
+    from backend.services import food_model_service
+    from backend.services.food_store import FoodStore
+
+    store = FoodStore(["roti"], {"energy_kcal": np.array([120.0])})
+    monkeypatch.setattr(food_model_service, "get_food_store", lambda: store)
+    monkeypatch.setattr(food_model_service.FoodMapping, "as_dict", lambda self: {})
+    svc, _ = classifier
+    img = _png((255, 0, 0))
+
+    async def main():
+        return await svc.predict(img), await svc.predict(img), await svc.predict(_png((0, 0, 255)))
+
+    first, cached, dal = asyncio.run(main())
+    assert first.nutrient_row == cached.nutrient_row == 0
+    assert svc.nutrients_for(cached)["calories"] == 120.0
+    assert dal.nutrient_row is None and svc.nutrients_for(dal) is None
+    assert svc.nutrient_resolution()["resolved"] == 1
+
+
+def test_tensor_upload_skips_decode_and_matches_image_prediction(classifier, monkeypatch):
+    from backend.services import food_model_service
+    from backend.utils.tensor_upload import encode_tensor_upload
+
+    svc, backend = classifier
+    img = _png((200, 10, 10))
+    pixels = food_model_service.model_pixels_from_bytes(img)
+
+    def no_decode(*args):
+        raise AssertionError("tensor uploads must not be decoded")
+
+    async def main():
+        from_image = await svc.predict(img)
+        monkeypatch.setattr(food_model_service, "model_pixels_from_bytes", no_decode)
+        from_tensor = await svc.predict(encode_tensor_upload(pixels))
+        return from_image, from_tensor
+
+    from_image, from_tensor = asyncio.run(main())
+    assert from_tensor == from_image and from_image.class_name == "roti"
+
+
+class EmbeddingBackend(FakeBackend):
+    """Low confidence unless the image is bright red; embedding is the mean colour."""
+
+    has_embeddings = True
+
+    def predict_batch_full(self, x):
+        self.calls.append(x.shape)
+        red = x[:, 0, 0, 0] > 0.9
+        probs = np.where(red[:, None], [[0.0, 1.0]], [[0.45, 0.4]]).astype(np.float32)
+        return probs, x.mean(axis=(1, 2))
+
+
+def test_low_confidence_predictions_fall_back_to_nearest_reference_dish(tmp_path, monkeypatch):
+    from backend.services import cache_provider
+    from backend.services.food_model_service import FoodClassifierService
+    from ml_model.training import food_backends
+    from ml_model.training.food_index import FoodEmbeddingIndex
+
+    cache_provider.get_prediction_cache.cache_clear()
+    (tmp_path / "class_names.txt").write_text("dal\nroti\n", encoding="utf-8")
+    # Embeddings of the scaled mean colours of two reference dishes
+    blue, green = np.array([[-1.0, -1.0, 1.0]]), np.array([[-1.0, 1.0, -1.0]])
+    FoodEmbeddingIndex.build([("Blueberry Halwa", blue), ("Palak Paneer", green)]).save(tmp_path / "food_index")
+    monkeypatch.setattr(food_backends, "load_backend", lambda kind, model_dir: EmbeddingBackend())
+    svc = FoodClassifierService(model_dir=tmp_path, max_batch_size=4, max_wait_ms=1)
+
+    async def main():
+        return (
+            await svc.predict(_png((0, 255, 0))),
+            await svc.predict(_png((255, 0, 0))),
+            await svc.predict(_png((128, 128, 128))),
+        )
+
+    try:
+        green_pred, red_pred, grey_pred = asyncio.run(main())
+    finally:
+        cache_provider.get_prediction_cache.cache_clear()
+    assert (green_pred.class_name, green_pred.source) == ("Palak Paneer", "knn")
+    assert green_pred.similarity == pytest.approx(1.0, abs=1e-3)
+    assert green_pred.confidence == pytest.approx(0.45)  # the CNN's own (low) top-class score
+    assert red_pred.similarity is None
+    assert (red_pred.class_name, red_pred.source) == ("roti", "softmax")  # confident softmax wins
+    assert (grey_pred.class_name, grey_pred.source) == ("dal", "softmax")  # nothing similar enough
+
+
+def test_stale_reference_index_is_skipped(tmp_path, monkeypatch):
+    from backend.services import cache_provider
+    from backend.services.food_model_service import FoodClassifierService
+    from ml_model.training import food_backends
+    from ml_model.training.food_index import FoodEmbeddingIndex
+
+    cache_provider.get_prediction_cache.cache_clear()
+    (tmp_path / "class_names.txt").write_text("dal\nroti\n", encoding="utf-8")
+    (tmp_path / "model.tflite").write_bytes(b"old model")
+    green = np.array([[-1.0, 1.0, -1.0]])
+    digests = food_backends.model_digests(tmp_path)
+    FoodEmbeddingIndex.build([("Palak Paneer", green)], model_digests=digests).save(tmp_path / "food_index")
+    (tmp_path / "model.tflite").write_bytes(b"retrained model")  # index now describes another backbone
+
+    backend = EmbeddingBackend()
+    backend.path = tmp_path / "model.tflite"
+    monkeypatch.setattr(food_backends, "load_backend", lambda kind, model_dir: backend)
+    svc = FoodClassifierService(model_dir=tmp_path, max_batch_size=4, max_wait_ms=1)
+    try:
+        pred = asyncio.run(svc.predict(_png((0, 255, 0))))
+    finally:
+        cache_provider.get_prediction_cache.cache_clear()
+    assert (pred.class_name, pred.source) == ("dal", "softmax")
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from backend.services.edamam_stub import EdamamStub
+from backend.services.nutrient_lookup import EdamamClient
+from backend.utils.errors import ServiceUnavailableError
+
+
+def _client(stub, **kw):
+    opts = dict(timeout_s=2.0, max_connections=4, max_concurrency=4, keepalive_s=30.0)
+    opts.update(kw)
+    return EdamamClient(stub.url, **opts)
+
+
+def test_lookups_parse_nutrients_and_reuse_pooled_connections():
+    with EdamamStub() as stub:
+        async def main():
+            client = _client(stub)
+            try:
+                out = [await client.fetch(name) for name in ("apple", "Pizza", "apple", "unknown dish")]
+                return out, client.stats()
+            finally:
+                await client.aclose()
+
+        (apple, pizza, again, missing), stats = asyncio.run(main())
+    assert apple == again and apple["calories"] == 52 and apple["carbohydrates"] == 13.8
+    assert pizza["sodium"] == 598
+    assert missing is None
+    assert stub.requests == 4 and stub.connections == 1  # keep-alive
+    assert stats["calls"] == 4 and stats["errors"] == stats["timeouts"] == 0
+
+
+def test_concurrency_is_bounded_and_lookups_overlap():
+    with EdamamStub(latency_ms=50) as stub:
+        async def main():
+            client = _client(stub, max_connections=8, max_concurrency=2)
+            try:
+                t0 = asyncio.get_running_loop().time()
+                await asyncio.gather(*(client.fetch("apple") for _ in range(6)))
+                return asyncio.get_running_loop().time() - t0
+            finally:
+                await client.aclose()
+
+        seconds = asyncio.run(main())
+    assert stub.requests == 6 and stub.connections <= 2
+    assert 0.14 <= seconds < 0.3  # three waves of two, not six serial calls
+
+
+def test_deadline_and_server_errors_raise_service_unavailable():
+    with EdamamStub(latency_ms=300) as stub:
+        async def main():
+            client = _client(stub)
+            try:
+                with pytest.raises(ServiceUnavailableError):
+                    await client.fetch("apple", deadline_s=0.05)
+                stub.latency_ms, stub.status = 0, 500
+                with pytest.raises(ServiceUnavailableError) as failed:
+                    await client.fetch("apple")
+                return failed.value, client.stats()
+            finally:
+                await client.aclose()
+
+        failed, stats = asyncio.run(main())
+    assert failed.status_code == 503 and failed.details == {"service": "edamam"}
+    assert stats["timeouts"] == 1 and stats["errors"] == 1
+
+
+def test_get_nutrients_uses_configured_client_without_mock_fallback(monkeypatch):
+    from backend.services import nutrient_lookup
+
+    with EdamamStub() as stub:
+        async def main():
+            monkeypatch.setattr(nutrient_lookup, "_client", _client(stub))
+            try:
+                return await nutrient_lookup.get_nutrients("white rice"), await nutrient_lookup.get_nutrients("xyz")
+            finally:
+                await nutrient_lookup.close_edamam_client()
+
+        rice, unknown = asyncio.run(main())
+    assert rice["calories"] == 130
+    assert unknown is None
+    assert nutrient_lookup._client is None
@@ -0,0 +1,107 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.services.food_store import FoodStore
+from backend.services.nutrient_resolver import NutrientResolver
+from backend.utils.cache import TTLCache
+from backend.utils.errors import ServiceUnavailableError
+
+
+class FakeEdamam:
+    def __init__(self, foods):
+        self.foods = foods
+        self.calls = []
+        self.down = False
+
+    async def __call__(self, name):
+        self.calls.append(name)
+        await asyncio.sleep(0.01)
+        if self.down:
+            raise ServiceUnavailableError("Nutrient lookup failed", details={"service": "edamam"})
+        return self.foods.get(name)
+
+
+def _resolver(tmp_path, remote, **kw):
+    store = FoodStore(
+        ["dal tadka", "ladoo (besan)"],
+        {"energy_kcal": np.array([180.0, 450.0]), "sugars_g": np.array([2.0, 30.0])},
+    )
+    return NutrientResolver(
+        store=store,
+        learned_path=tmp_path / "remote_nutrients.csv",
+        fuzzy_min_score=90,
+        fetch=remote,
+        miss_cache=TTLCache(ttl_seconds=60),
+        **kw,
+    )
+
+
+def test_local_tiers_answer_without_remote_calls(tmp_path):
+    remote = FakeEdamam({})
+    resolver = _resolver(tmp_path, remote)
+
+    async def main():
+        return await resolver.resolve("Dal  Tadka"), await resolver.resolve("Besan Ladoo")
+
+    exact, fuzzy = asyncio.run(main())
+    assert exact.tier == "exact" and exact.nutrients["calories"] == 180.0
+    assert exact.nutrients["food_name"] == "Dal  Tadka"
+    assert fuzzy.tier == "fuzzy" and fuzzy.nutrients["sugar"] == 30.0
+    assert remote.calls == []
+
+
+def test_remote_results_are_written_back_and_served_locally(tmp_path):
+    from backend.services.bulkheads import close_bulkheads, get_bulkhead
+
+    close_bulkheads()
+    remote = FakeEdamam({"quinoa": {"calories": 120, "protein": 4.4, "carbohydrates": 21.3, "sugar": 0.9}})
+    resolver = _resolver(tmp_path, remote)
+
+    async def main():
+        first = await asyncio.gather(*(resolver.resolve("Quinoa") for _ in range(3)))
+        return first, await resolver.resolve("quinoa")
+
+    first, again = asyncio.run(main())
+    assert [r.tier for r in first] == ["remote"] * 3  # one shared remote call
+    assert first[0].nutrients["carbs"] == 21.3 and first[0].nutrients["fat"] == 0.0
+    assert again.tier == "learned" and remote.calls == ["quinoa"]
+    assert get_bulkhead("files").stats()["completed"] == 1  # the CSV append ran on the bounded pool
+    close_bulkheads()
+
+    # Persisted: a fresh resolver (new process) answers from the learned table
+    restarted = _resolver(tmp_path, FakeEdamam({}))
+    res = asyncio.run(restarted.resolve("QUINOA"))
+    assert res.tier == "learned" and res.nutrients["calories"] == 120.0
+    header = (tmp_path / "remote_nutrients.csv").read_text(encoding="utf-8").splitlines()[0]
+    assert header.startswith("food_name_normalized,energy_kcal,protein_g")
+
+
+def test_misses_are_negative_cached_but_outages_are_not(tmp_path):
+    remote = FakeEdamam({})
+    resolver = _resolver(tmp_path, remote)
+
+    async def main():
+        miss = await resolver.resolve("mystery stew")
+        cached = await resolver.resolve("Mystery Stew")
+        remote.down = True
+        with pytest.raises(ServiceUnavailableError):
+            await resolver.resolve("pho")
+        remote.down = False
+        remote.foods["pho"] = {"calories": 45}
+        return miss, cached, await resolver.resolve("pho")
+
+    miss, cached, pho = asyncio.run(main())
+    assert (miss.tier, miss.nutrients) == ("miss", None)
+    assert (cached.tier, cached.nutrients) == ("miss_cached", None)
+    assert pho.tier == "remote" and pho.nutrients["calories"] == 45.0
+    assert remote.calls == ["mystery stew", "pho", "pho"]
+
+    stats = resolver.stats()["tiers"]
+    assert {t: v["count"] for t, v in stats.items() if v["count"]} == {
+        "miss": 1,
+        "miss_cached": 1,
+        "remote": 1,
+        "unavailable": 1,
+    }
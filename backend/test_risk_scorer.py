@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+sklearn = pytest.importorskip("sklearn")
+from sklearn.linear_model import LogisticRegression
+
+from backend.services.risk_scorer import RISK_FEATURES, RiskScorer
+
+
+def _fit(n_classes):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, len(RISK_FEATURES))) * rng.uniform(1, 500, size=len(RISK_FEATURES))
+    y = (X[:, 3] - X[:, 2] + rng.normal(scale=50, size=400) > 0).astype(int)
+    if n_classes == 3:
+        y = y + (X[:, 8] > X[:, 9]).astype(int)
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+    return model, X
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+def test_numpy_scorer_matches_sklearn(n_classes, tmp_path):
+    model, X = _fit(n_classes)
+    scorer = RiskScorer.from_model(model, feature_names=RISK_FEATURES)
+    scorer = RiskScorer.load(scorer.save(tmp_path / "risk_model.json"))
+
+    np.testing.assert_allclose(scorer.decision_function(X), model.decision_function(X), rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(scorer.predict_proba(X), model.predict_proba(X), rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(scorer.predict(X), model.predict(X))
+
+
+def test_rows_from_dicts_uses_feature_order():
+    model, X = _fit(3)
+    scorer = RiskScorer.from_model(model, feature_names=RISK_FEATURES)
+    records = [dict(zip(RISK_FEATURES, row)) for row in X[:5]]
+    np.testing.assert_array_equal(scorer.rows_from_dicts(records), X[:5])
+    np.testing.assert_array_equal(scorer.predict(scorer.rows_from_dicts(records)), model.predict(X[:5]))
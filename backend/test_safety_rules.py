@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.services.cohort_risk import intake_csv_to_frame
+from backend.services.rules_engine import Field, Rule, RuleSet
+from backend.services.safety_rules import (
+    FOOD_DECISION_RULES,
+    MEAL_DECISION_RULES,
+    SAFETY_LABEL_RULES,
+    disease_flags,
+    disease_flags_batch,
+)
+
+INTAKE_CSV = Path(__file__).resolve().parents[1] / "datasets" / "processed" / "User_Daily_Intake.csv"
+
+
+def test_priority_and_field_references():
+    rules = RuleSet(
+        "t",
+        [
+            Rule("low", [("x", ">", 1)], priority=1),
+            Rule("high", [("x", ">", Field("limit"))], priority=5, message="{x} over {limit}"),
+        ],
+        default_label="ok",
+    )
+    assert rules.evaluate({"x": 0, "limit": 3}).label == "ok"
+    assert rules.evaluate({"x": 2, "limit": 3}).label == "low"
+    r = rules.evaluate({"x": 4, "limit": 3})
+    assert (r.label, r.message) == ("high", "4 over 3")
+
+    batch = rules.evaluate_batch({"x": np.array([0, 2, 4]), "limit": np.array([3, 3, 3])})
+    assert batch.labels.tolist() == ["ok", "low", "high"]
+    assert batch.messages[2] == "4 over 3"
+
+
+def test_safety_labels_follow_check_safety_order():
+    label = lambda c, s, f: SAFETY_LABEL_RULES.evaluate(
+        {"calorie_remaining": c, "sodium_remaining": s, "fiber_remaining": f}
+    ).label
+    assert label(-1, -1, 0) == "Calorie limit exceeded"
+    assert label(10, -1, 0) == "Sodium limit exceeded"
+    assert label(10, 10, 0) == "Fiber limit reached"
+    assert label(10, 10, 1.5) == "Restricted – fiber limit critical"
+    assert label(10, 10, 4) == "Caution – low fiber budget"
+    assert label(10, 10, 5) == "Safe"
+
+
+@pytest.mark.skipif(not INTAKE_CSV.exists(), reason="User_Daily_Intake.csv not present")
+def test_batch_matches_scalar_on_user_daily_intake():
+    df = intake_csv_to_frame(INTAKE_CSV)
+    df["calorie_remaining"] = df["calorie_target"] - df["calories_consumed"]
+    df["fiber_remaining"] = df["fiber_target"] - df["fiber_consumed"]
+    df["sodium_remaining"] = df["sodium_limit"] - df["sodium_consumed"]
+
+    batch = SAFETY_LABEL_RULES.evaluate_batch(df).labels
+    scalar = [SAFETY_LABEL_RULES.evaluate(r).label for r in df.to_dict(orient="records")]
+    assert len(batch) == 1000
+    assert batch.tolist() == scalar
+
+
+def test_meal_and_food_decisions():
+    base = {"total_calories": 1500, "calorie_limit": 2000, "total_sugar": 45.25,
+            "total_sodium": 1000, "food_sugar": 20, "has_diabetes": False}
+    assert MEAL_DECISION_RULES.evaluate(base).label == "Eat"
+    r = MEAL_DECISION_RULES.evaluate({**base, "has_diabetes": True})
+    assert r.label == "Avoid" and "45.2g" in r.message
+    assert MEAL_DECISION_RULES.evaluate({**base, "total_calories": 2100}).message.startswith(
+        "You've exceeded your daily calorie goal of 2000 kcal"
+    )
+
+    assert FOOD_DECISION_RULES.evaluate({"sugar": 20, "calories": 600}).label == "Avoid"
+    assert FOOD_DECISION_RULES.evaluate({"sugar": 5, "calories": 600}).label == "Caution"
+    assert FOOD_DECISION_RULES.evaluate({"sugar": 5, "calories": 100}).message == "Within safe limits"
+
+
+def test_disease_flags_scalar_and_batch():
+    assert disease_flags({"sugar": 30, "sodium": 100, "fat": 40}) == {
+        "suitable_diabetes": 0, "suitable_blood_pressure": 1, "suitable_heart": 0,
+    }
+    foods = pd.DataFrame({"sugar": [30, 1], "sodium": [100, 900], "fat": [40, 1]})
+    flags = disease_flags_batch(foods)
+    assert flags["suitable_diabetes"].tolist() == [0, 1]
+    assert flags["suitable_blood_pressure"].tolist() == [1, 0]
+    assert flags["suitable_heart"].tolist() == [0, 1]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from backend.utils.errors import InvalidUploadError
+from backend.utils.tensor_upload import HEADER_SIZE, decode_tensor_upload, encode_tensor_upload, is_tensor_upload
+
+
+def _pixels():
+    return np.random.default_rng(0).integers(0, 256, size=(224, 224, 3), dtype=np.uint8)
+
+
+def test_roundtrip_is_a_zero_copy_view():
+    pixels = _pixels()
+    data = encode_tensor_upload(pixels)
+    assert is_tensor_upload(data) and len(data) == HEADER_SIZE + pixels.size
+
+    out = decode_tensor_upload(data)
+    assert out.shape == (224, 224, 3) and out.dtype == np.uint8
+    np.testing.assert_array_equal(out, pixels)
+    assert not out.flags.owndata and not out.flags.writeable
+
+
+def test_bytearray_upload_decodes_read_only():
+    out = decode_tensor_upload(bytearray(encode_tensor_upload(_pixels())))
+    assert not out.flags.writeable
+    with pytest.raises(ValueError):
+        out[0, 0, 0] = 1
+
+
+@pytest.mark.parametrize(
+    "mutate",
+    [
+        lambda d: d[:-1],  # truncated payload
+        lambda d: d[:-1] + bytes([d[-1] ^ 1]),  # flipped bit -> checksum mismatch
+        lambda d: b"JUNK" + d[4:],  # wrong magic
+    ],
+)
+def test_corrupt_uploads_are_rejected(mutate):
+    with pytest.raises(InvalidUploadError):
+        decode_tensor_upload(mutate(encode_tensor_upload(_pixels())))
+
+
+def test_wrong_shape_is_rejected():
+    with pytest.raises(InvalidUploadError) as exc:
+        decode_tensor_upload(encode_tensor_upload(np.zeros((100, 100, 3), dtype=np.uint8)))
+    assert exc.value.status_code == 400
+    assert exc.value.details["shape"] == [100, 100, 3]
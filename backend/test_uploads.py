@@ -0,0 +1,134 @@
+import asyncio
+import io
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+from starlette.datastructures import UploadFile
+
+from backend.utils.errors import InvalidUploadError, UnsupportedMediaTypeError, UploadTooLargeError
+from backend.utils.tensor_upload import encode_tensor_upload
+from backend.utils.uploads import UploadLimitMiddleware, read_image_upload, sniff_format
+
+
+class CountingFile(io.BytesIO):
+    """BytesIO that records how many bytes were read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        out = super().read(size)
+        self.bytes_read += len(out)
+        return out
+
+
+def _jpeg(size=(64, 48)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, (10, 200, 30)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _read(data, **kw):
+    f = CountingFile(data)
+    upload = UploadFile(f, filename="scan.jpg")
+    opts = {"max_bytes": 1 << 20, "max_pixels": 10_000, "chunk_size": 1024, **kw}
+    return f, asyncio.run(read_image_upload(upload, **opts))
+
+
+def test_valid_image_and_tensor_uploads_are_read_whole():
+    data = _jpeg()
+    _, out = _read(data)
+    assert bytes(out) == data and sniff_format(out) == "jpeg"
+
+    tensor = encode_tensor_upload(np.zeros((224, 224, 3), dtype=np.uint8))
+    _, out = _read(tensor, max_pixels=1)  # pixel limit applies to encoded images only
+    assert bytes(out) == tensor
+
+
+def test_unknown_format_is_rejected_after_first_chunk():
+    f = CountingFile(b"GIF89a" + b"\0" * 10_000)
+    with pytest.raises(UnsupportedMediaTypeError):
+        asyncio.run(read_image_upload(UploadFile(f), max_bytes=1 << 20, max_pixels=10_000, chunk_size=1024))
+    assert f.bytes_read == 1024
+
+
+def test_oversized_upload_stops_reading_at_the_limit():
+    f = CountingFile(_jpeg() + b"\0" * 50_000)
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(read_image_upload(UploadFile(f), max_bytes=8192, max_pixels=10_000, chunk_size=1024))
+    assert f.bytes_read <= 8192 + 1024
+
+    with pytest.raises(UploadTooLargeError):  # declared size is checked before any read
+        asyncio.run(read_image_upload(UploadFile(CountingFile(b""), size=10_000), max_bytes=8192, max_pixels=1))
+
+
+def test_dimensions_are_checked_from_the_header():
+    with pytest.raises(UploadTooLargeError) as exc:
+        _read(_jpeg((200, 100)))
+    assert exc.value.details["width"] == 200 and exc.value.details["height"] == 100
+
+    with pytest.raises(InvalidUploadError):
+        _read(b"\xff\xd8\xff" + b"\0" * 100)  # JPEG magic, unreadable header
+
+
+def test_middleware_rejects_on_content_length():
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, max_bytes=1024)
+
+    @app.post("/echo")
+    async def echo():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.post("/echo", content=b"x" * 100).status_code == 200
+    resp = client.post("/echo", content=b"x" * (1024 + 65 * 1024))
+    assert resp.status_code == 413 and resp.json()["error"]["code"] == "upload_too_large"
+
+
+def test_middleware_only_limits_given_paths():
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, max_bytes=1024, paths=["/api/food/predict_food"])
+
+    @app.post("/api/food/predict_food")
+    async def scan():
+        return {"ok": True}
+
+    @app.post("/api/safety/check-safety-batch/csv")
+    async def csv_batch():
+        return {"ok": True}
+
+    client = TestClient(app)
+    big = b"x" * (1024 + 65 * 1024)
+    assert client.post("/api/food/predict_food", content=big).status_code == 413
+    assert client.post("/api/food/predict_food/", content=big).status_code == 413
+    assert client.post("/api/safety/check-safety-batch/csv", content=big).status_code == 200
+
+
+def test_middleware_counts_chunked_bodies_without_content_length():
+    from fastapi import File, UploadFile as FastAPIUploadFile
+
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, max_bytes=1024, paths=["/scan"])
+
+    @app.post("/scan")
+    async def scan(file: FastAPIUploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    def chunks(n):
+        # a generator body is sent with Transfer-Encoding: chunked, no Content-Length
+        head = b'--b\r\nContent-Disposition: form-data; name="file"; filename="x.jpg"\r\n\r\n'
+        yield head
+        for _ in range(n):
+            yield b"x" * 8192
+        yield b"\r\n--b--\r\n"
+
+    client = TestClient(app)
+    headers = {"content-type": "multipart/form-data; boundary=b"}
+    ok = client.post("/scan", content=chunks(1), headers=headers)
+    assert ok.status_code == 200 and ok.json()["size"] == 8192
+    big = client.post("/scan", content=chunks(20), headers=headers)
+    assert big.status_code == 413 and big.json()["error"]["code"] == "upload_too_large"
@@ -4,7 +4,7 @@ import asyncio
 import json
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 
 @dataclass
@@ -77,3 +77,33 @@ class RedisJsonCache:
         client = await self._get_client()
         await client.set(self._k(key), json.dumps(value, ensure_ascii=False), ex=self._ttl)
 
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls by key: the first caller starts `fn` as its own
+    task, and every caller (that one included) awaits it through
+    `asyncio.shield`, so one caller being cancelled (client disconnect) does
+    not cancel the work or the result the others are waiting for.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller had gone
@@ -26,3 +26,18 @@ class ModelNotLoadedError(AppError):
     def __init__(self, message: str = "Model not available", *, details: Optional[Any] = None):
         super().__init__(message=message, code="model_not_available", status_code=503, details=details)
 
+
+
+class InvalidUploadError(AppError):
+    def __init__(self, message: str = "Invalid upload", *, details: Optional[Any] = None):
+        super().__init__(message=message, code="invalid_upload", status_code=400, details=details)
+
+
+class UploadTooLargeError(AppError):
+    def __init__(self, message: str = "Upload too large", *, details: Optional[Any] = None):
+        super().__init__(message=message, code="upload_too_large", status_code=413, details=details)
+
+
+class UnsupportedMediaTypeError(AppError):
+    def __init__(self, message: str = "Unsupported media type", *, details: Optional[Any] = None):
+        super().__init__(message=message, code="unsupported_media_type", status_code=415, details=details)
@@ -1,11 +1,17 @@
-from backend.core.database import users_collection
+from backend.core.database import db, users_collection
 from datetime import datetime
+from typing import Dict, Iterable, Optional
 import logging
 
+from backend.services.bulkheads import get_bulkhead
+
 logger = logging.getLogger(__name__)
 
 async def get_user_profile(uid: str):
     """Fetch user profile from Firestore."""
+    return await get_bulkhead("firestore").run(_get_user_profile, uid)
+
+def _get_user_profile(uid: str):
     try:
         doc = users_collection.document(uid).get()
         if doc.exists:
@@ -15,11 +21,34 @@ async def get_user_profile(uid: str):
         logger.error(f"Error fetching user profile for {uid}: {e}")
         return None
 
+async def get_user_profiles(uids: Iterable[str], chunk_size: int = 300) -> Dict[str, Optional[dict]]:
+    """
+    Fetch many user profiles with batched `get_all` reads (one RPC per chunk).
+    Returns {uid: profile or None}, preserving the input order.
+    """
+    return await get_bulkhead("firestore").run(_get_user_profiles, list(uids), chunk_size)
+
+def _get_user_profiles(uids: Iterable[str], chunk_size: int) -> Dict[str, Optional[dict]]:
+    ordered = list(dict.fromkeys(u for u in uids if u))
+    out: Dict[str, Optional[dict]] = {u: None for u in ordered}
+    for start in range(0, len(ordered), chunk_size):
+        chunk = ordered[start:start + chunk_size]
+        try:
+            refs = [users_collection.document(u) for u in chunk]
+            for snap in db.get_all(refs):
+                out[snap.id] = snap.to_dict() if snap.exists else None
+        except Exception as e:
+            logger.error(f"Error fetching {len(chunk)} user profiles: {e}")
+    return out
+
 async def update_daily_intake(uid: str, meal_data: dict):
     """
     Update daily intake in Firestore and recalculate remaining targets.
     meal_data should contain: calories, protein, carbs, fat, sugar, sodium, fiber
     """
+    return await get_bulkhead("firestore").run(_update_daily_intake, uid, meal_data)
+
+def _update_daily_intake(uid: str, meal_data: dict) -> bool:
     try:
         user_ref = users_collection.document(uid)
         user_doc = user_ref.get()
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import hashlib
 import io
-from typing import Tuple
+from typing import Optional, Tuple
 
 import numpy as np
 from PIL import Image
@@ -25,14 +26,55 @@ def to_numpy_uint8(img: Image.Image) -> np.ndarray:
     return np.asarray(img, dtype=np.uint8)
 
 
+def model_pixels_from_bytes(image_bytes: bytes, size: Tuple[int, int] = MODEL_INPUT_SIZE) -> np.ndarray:
+    """
+    Decoded, resized (H,W,3) uint8 pixels: what the model sees, before scaling.
+
+    Single decode: for JPEGs `draft()` lets libjpeg downscale in the DCT domain
+    (1/2..1/8) while decoding, to the smallest scale still >= `size`; the
+    remaining resize uses `reduce()` box steps (reducing_gap) before the final
+    LANCZOS pass on an image at most ~2x the target.
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+    if img.format == "JPEG":
+        img.draft("RGB", size)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != size:
+        img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return to_numpy_uint8(img)
+
+
+def normalize_mobilenetv2(pixels: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    uint8 0..255 -> float32 [-1, 1] (MobileNetV2 preprocess_input).
+    Writes into `out` (e.g. a preallocated batch buffer) when given.
+    """
+    if out is None:
+        out = np.empty(pixels.shape, dtype=np.float32)
+    np.multiply(pixels, np.float32(1 / 127.5), out=out, casting="unsafe")
+    np.subtract(out, np.float32(1.0), out=out)
+    return out
+
+
 def mobilenetv2_input_from_bytes(image_bytes: bytes, size: Tuple[int, int] = MODEL_INPUT_SIZE) -> np.ndarray:
     """
     Produce a MobileNetV2-compatible input tensor (H,W,3) float32 in [-1, 1].
     Equivalent to `tf.keras.applications.mobilenet_v2.preprocess_input` on uint8 0..255.
     """
-    img = resize_to_model(load_rgb(image_bytes), size=size)
-    arr = np.asarray(img, dtype=np.float32)
-    # MobileNetV2 preprocess: scale to [-1, 1]
-    arr = (arr / 127.5) - 1.0
-    return arr
+    return normalize_mobilenetv2(model_pixels_from_bytes(image_bytes, size=size))
+
+
+def pixel_hash(pixels: np.ndarray) -> str:
+    """Exact content key: identical decoded pixels -> identical key, whatever the file bytes."""
+    h = hashlib.sha256(str(pixels.shape).encode())
+    h.update(np.ascontiguousarray(pixels).tobytes())
+    return h.hexdigest()
+
 
+def difference_hash(pixels: np.ndarray, hash_size: int = 8) -> str:
+    """64-bit dHash (perceptual): robust to re-encoding and small resizes."""
+    gray = Image.fromarray(pixels).convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    g = np.asarray(gray, dtype=np.int16)
+    bits = (g[:, 1:] > g[:, :-1]).ravel()
+    return f"{int(np.packbits(bits).view('>u8')[0]):016x}"
@@ -0,0 +1,75 @@
+"""
+Preprocessed tensor upload format for /predict_food.
+
+Clients that can decode and resize on-device send the model-resolution pixels
+instead of an encoded image, so the server skips decode/resize entirely:
+
+    offset  size  field
+    0       4     magic b"NBT1"
+    4       2     height   (uint16, little-endian)
+    6       2     width    (uint16)
+    8       2     channels (uint16, must be 3)
+    10      2     reserved (0)
+    12      4     CRC-32 of the payload (uint32)
+    16      h*w*c payload: uint8 RGB pixels, row-major (H, W, C)
+
+`decode_tensor_upload` validates the header and checksum and returns an
+(H, W, 3) uint8 view over the upload buffer (`np.frombuffer`, no copy).
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Tuple
+
+import numpy as np
+
+from backend.utils.errors import InvalidUploadError
+from backend.utils.image_preprocessing import MODEL_INPUT_SIZE
+
+TENSOR_MAGIC = b"NBT1"
+TENSOR_CONTENT_TYPE = "application/x-nutribot-tensor"
+_HEADER = struct.Struct("<4sHHHHI")
+HEADER_SIZE = _HEADER.size
+
+
+def is_tensor_upload(data: bytes) -> bool:
+    return data[:4] == TENSOR_MAGIC
+
+
+def encode_tensor_upload(pixels: np.ndarray) -> bytes:
+    """(H, W, 3) uint8 pixels -> header + payload (what a client sends)."""
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    if pixels.ndim != 3:
+        raise ValueError("pixels must be (H, W, C)")
+    h, w, c = pixels.shape
+    payload = pixels.tobytes()
+    return _HEADER.pack(TENSOR_MAGIC, h, w, c, 0, zlib.crc32(payload)) + payload
+
+
+def decode_tensor_upload(
+    data: bytes,
+    *,
+    expected_size: Tuple[int, int] = MODEL_INPUT_SIZE,
+) -> np.ndarray:
+    """Validate a tensor upload and return a read-only (H, W, 3) uint8 view of its payload."""
+    if len(data) < HEADER_SIZE or not is_tensor_upload(data):
+        raise InvalidUploadError("Not a tensor upload (missing NBT1 header).")
+    _, h, w, c, _, crc = _HEADER.unpack_from(data)
+    if (w, h) != tuple(expected_size) or c != 3:
+        raise InvalidUploadError(
+            f"Tensor upload must be {expected_size[1]}x{expected_size[0]}x3 uint8.",
+            details={"shape": [h, w, c]},
+        )
+    payload = memoryview(data)[HEADER_SIZE:]
+    if len(payload) != h * w * c:
+        raise InvalidUploadError(
+            "Tensor upload payload length does not match its header.",
+            details={"expected_bytes": h * w * c, "got_bytes": len(payload)},
+        )
+    if zlib.crc32(payload) != crc:
+        raise InvalidUploadError("Tensor upload checksum mismatch.")
+    arr = np.frombuffer(data, dtype=np.uint8, count=h * w * c, offset=HEADER_SIZE).reshape(h, w, c)
+    arr.setflags(write=False)  # a bytearray buffer would otherwise give a writable view
+    return arr
@@ -0,0 +1,176 @@
+"""
+Bounded reading and early validation of scan uploads.
+
+`read_image_upload` reads an `UploadFile` in fixed-size chunks into one
+buffer and stops as soon as the configured byte limit is crossed, so the
+validated image buffer never exceeds `max_bytes`:
+
+1. the declared size (when the client sent one) is checked before reading;
+2. the first chunk is sniffed for magic bytes (JPEG, PNG, WebP or an NBT1
+   tensor upload) and anything else is rejected with 415;
+3. for encoded images, PIL parses only the header (first 256 KiB) to check
+   the dimensions against `max_pixels`, so a decompression bomb is refused
+   before the rest is read and before the classifier decodes anything.
+
+By the time the route runs, Starlette has already received and spooled the
+whole multipart body, so the bound on what a request can make the server take
+in comes from `UploadLimitMiddleware`, at the ASGI layer: it answers 413 from
+Content-Length alone when that is already over the limit, and otherwise counts
+body bytes as they are received (chunked uploads carry no Content-Length) and
+answers 413 as soon as the count passes it. It applies only to the paths it is
+given (SCAN_UPLOAD_PATHS in main), so other uploads such as the safety CSV
+batch are not held to the image limit.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Iterable, Optional, Tuple
+
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.utils.errors import InvalidUploadError, UnsupportedMediaTypeError, UploadTooLargeError
+from backend.utils.tensor_upload import TENSOR_MAGIC
+
+# Extra allowance for multipart boundaries and the other form fields
+FORM_OVERHEAD_BYTES = 64 * 1024
+# Enough for the JPEG SOF marker after large EXIF/ICC segments
+HEADER_PROBE_BYTES = 256 * 1024
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """Identify the upload from its first bytes; None when unsupported."""
+    if head[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[:4] == TENSOR_MAGIC:
+        return "tensor"
+    return None
+
+
+def image_dimensions(data: bytes) -> Tuple[int, int]:
+    """(width, height) from the image header only; no pixel data is decoded."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            return img.size
+    except Exception as e:
+        raise InvalidUploadError("Could not read the image header.", details={"reason": str(e)})
+
+
+def _check_dimensions(buf: bytearray, max_pixels: int) -> None:
+    width, height = image_dimensions(bytes(buf[:HEADER_PROBE_BYTES]))
+    if width * height > max_pixels:
+        raise UploadTooLargeError(
+            "Image dimensions too large.",
+            details={"width": width, "height": height, "max_pixels": max_pixels},
+        )
+
+
+async def read_image_upload(
+    file: UploadFile,
+    *,
+    max_bytes: int,
+    max_pixels: int,
+    chunk_size: int = 64 * 1024,
+) -> bytearray:
+    """Read and validate one scan upload; raises 413/415/400 AppErrors early."""
+    limit = {"max_bytes": max_bytes}
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(details={**limit, "size": file.size})
+
+    buf = bytearray()
+    fmt: Optional[str] = None
+    header_checked = False
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        if fmt is None:
+            fmt = sniff_format(chunk)
+            if fmt is None:
+                raise UnsupportedMediaTypeError(
+                    "Upload must be a JPEG, PNG or WebP image, or a preprocessed tensor.",
+                    details={"content_type": file.content_type},
+                )
+            header_checked = fmt == "tensor"
+        if len(buf) + len(chunk) > max_bytes:
+            raise UploadTooLargeError(details=limit)
+        buf += chunk
+        if not header_checked and len(buf) >= HEADER_PROBE_BYTES:
+            _check_dimensions(buf, max_pixels)
+            header_checked = True
+
+    if not buf:
+        raise InvalidUploadError("Empty upload.")
+    if not header_checked:
+        _check_dimensions(buf, max_pixels)
+    return buf
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """
+    413 for request bodies over the limit (only on `paths`, if given): from
+    Content-Length before anything is read, else as soon as the received bytes
+    pass it. Pure ASGI so it sees the body stream itself.
+    """
+
+    def __init__(self, app: ASGIApp, *, max_bytes: int, paths: Optional[Iterable[str]] = None):
+        self.app = app
+        self._max = int(max_bytes) + FORM_OVERHEAD_BYTES
+        self._paths = frozenset(p.rstrip("/") for p in paths) if paths is not None else None
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse(
+            status_code=413,
+            content={"error": {"code": "upload_too_large", "message": "Upload too large"}},
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (
+            self._paths is not None and scope["path"].rstrip("/") not in self._paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        length = Headers(scope=scope).get("content-length")
+        if length and length.isdigit() and int(length) > self._max:
+            await self._too_large()(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self._max:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            if exceeded:
+                return  # whatever the app made of the aborted body (e.g. a 400) is replaced by the 413
+            started = started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not started:
+            await self._too_large()(scope, receive, send)
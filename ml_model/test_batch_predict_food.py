@@ -0,0 +1,39 @@
+import csv
+import json
+
+import numpy as np
+
+from ml_model.training.batch_predict_food import ResultWriter, collect_paths, top_k_rows
+
+
+def test_collect_paths_from_directory_and_manifests(tmp_path):
+    for rel in ("a/1.jpg", "a/2.PNG", "b/3.jpeg", "b/notes.txt"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_bytes(b"")
+    found = collect_paths(images_dir=tmp_path)
+    assert [p.split("/")[-1] for p in found] == ["1.jpg", "2.PNG", "3.jpeg"]
+
+    (tmp_path / "list.txt").write_text("# scans\na/1.jpg\n/abs/x.jpg\n\n", encoding="utf-8")
+    assert collect_paths(manifest=tmp_path / "list.txt") == [str(tmp_path / "a/1.jpg"), "/abs/x.jpg"]
+
+    (tmp_path / "list.csv").write_text("path,user\nb/3.jpeg,u1\n", encoding="utf-8")
+    assert collect_paths(manifest=tmp_path / "list.csv") == [str(tmp_path / "b/3.jpeg")]
+
+
+def test_top_k_rows_are_sorted_by_confidence():
+    probs = np.array([[0.1, 0.6, 0.3], [0.5, 0.2, 0.3]])
+    rows = list(top_k_rows(["x", "y"], probs, ["dal", "roti", "idli"], 2))
+    assert rows == [("x", [("roti", 0.6), ("idli", 0.3)]), ("y", [("dal", 0.5), ("idli", 0.3)])]
+
+
+def test_writer_streams_csv_and_jsonl(tmp_path):
+    top = [("roti", 0.6), ("idli", 0.3)]
+    for name in ("out.csv", "out.jsonl"):
+        w = ResultWriter(tmp_path / name, top_k=2)
+        w.write("x.jpg", top)
+        w.close()
+
+    rows = list(csv.DictReader(open(tmp_path / "out.csv", encoding="utf-8")))
+    assert rows == [{"path": "x.jpg", "label_1": "roti", "confidence_1": "0.600000", "label_2": "idli", "confidence_2": "0.300000"}]
+    rec = json.loads((tmp_path / "out.jsonl").read_text(encoding="utf-8"))
+    assert rec == {"path": "x.jpg", "top_k": [{"label": "roti", "confidence": 0.6}, {"label": "idli", "confidence": 0.3}]}
@@ -0,0 +1,124 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+
+from ml_model.training import disease_registry
+from ml_model.training.disease_model import (
+    NUTRIENT_FEATURES,
+    TARGETS,
+    add_engineered_features,
+    predict_disease,
+    predict_disease_risk,
+    predict_disease_risk_batch,
+    train_disease_models,
+)
+
+
+def _frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.uniform(0, 100, size=(n, len(NUTRIENT_FEATURES))), columns=NUTRIENT_FEATURES)
+    df["suitable_diabetes"] = (df["sugars_g"] < 40).astype(int)
+    df["suitable_blood_pressure"] = (df["sodium_mg"] < 60).astype(int)
+    df["suitable_heart"] = ((df["saturated_fat_g"] + df["cholesterol_mg"]) < 90).astype(int)
+    return add_engineered_features(df)
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    out = tmp_path_factory.mktemp("disease_model")
+    train_disease_models(_frame(), out)
+    return out
+
+
+def test_registry_loads_once_and_reloads_on_change(model_dir, monkeypatch):
+    registry = disease_registry.DiseaseModelRegistry(check_interval=0.0)
+    loads = []
+    real_load = disease_registry._load
+    monkeypatch.setattr(disease_registry, "_load", lambda *a: loads.append(a) or real_load(*a))
+
+    first = registry.get(model_dir)
+    assert set(first.models) == set(TARGETS)
+    assert registry.get(model_dir) is first
+    assert len(loads) == 1
+
+    meta = model_dir / "metadata.json"
+    st = meta.stat()
+    os.utime(meta, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert registry.get(model_dir) is not first
+    assert len(loads) == 2
+
+
+def test_predict_functions_use_registry(model_dir):
+    row = _frame(1, seed=1).iloc[0].to_dict()
+    labels = predict_disease(row, model_dir)
+    risk = predict_disease_risk(row, model_dir, top_k=3)
+    assert set(labels) == set(TARGETS)
+    for target in TARGETS:
+        assert risk[target]["label"] == labels[target]
+        assert 0.0 <= risk[target]["probability"] <= 1.0
+        assert len(risk[target]["top_factors"]) <= 3
+
+
+def test_batch_matches_single_row_predictions(model_dir):
+    foods = _frame(25, seed=2)
+    batch = predict_disease_risk_batch(foods, model_dir, top_k=4)
+    assert list(batch.index) == list(foods.index)
+    for i, row in enumerate(foods.to_dict(orient="records")):
+        single = predict_disease_risk(row, model_dir, top_k=4)
+        for target in TARGETS:
+            assert batch[f"{target}_probability"].iloc[i] == pytest.approx(single[target]["probability"])
+            assert batch[f"{target}_label"].iloc[i] == single[target]["label"]
+            assert batch[f"{target}_top_factors"].iloc[i] == pytest.approx(single[target]["top_factors"])
+
+
+def test_parallel_training_matches_sequential(tmp_path):
+    df = _frame(400, seed=3)
+    seq = train_disease_models(df, tmp_path / "seq")
+    par = train_disease_models(df, tmp_path / "par", n_jobs=3, cv_folds=3)
+    for target in TARGETS:
+        assert par[target]["accuracy"] == seq[target]["accuracy"]
+        assert par[target]["f1"] == seq[target]["f1"]
+        assert par[target]["cv"]["folds"] == 3
+    meta = disease_registry._load_metadata(tmp_path / "par")
+    assert meta["timings"]["workers"] == 3
+    foods = _frame(20, seed=4)
+    np.testing.assert_allclose(
+        predict_disease_risk_batch(foods, tmp_path / "seq")["suitable_heart_probability"],
+        predict_disease_risk_batch(foods, tmp_path / "par")["suitable_heart_probability"],
+    )
+
+
+def test_shipped_models_load_and_predict():
+    from ml_model.training.disease_model import SAVED_MODEL_DIR
+
+    if not SAVED_MODEL_DIR.exists():
+        pytest.skip("no shipped disease models")
+    registry = disease_registry.DiseaseModelRegistry(check_interval=0)
+    loaded = registry.get(SAVED_MODEL_DIR)
+    assert loaded is not None and loaded.models  # not all skipped over a feature mismatch
+    risk = predict_disease_risk({"energy_kcal": 350, "sugars_g": 30, "sodium_mg": 800})
+    assert risk and all(0.0 <= r["probability"] <= 1.0 for r in risk.values())
+
+
+def test_status_reports_skipped_models(model_dir, tmp_path, caplog):
+    import pickle
+    import shutil
+
+    from sklearn.ensemble import RandomForestClassifier
+
+    shutil.copytree(model_dir, tmp_path / "m")
+    shutil.rmtree(tmp_path / "m" / "suitable_heart.forest", ignore_errors=True)
+    wrong = RandomForestClassifier(n_estimators=2, random_state=0).fit(np.eye(3), [0, 1, 1])
+    with open(tmp_path / "m" / "suitable_heart.pkl", "wb") as f:
+        pickle.dump(wrong, f)
+
+    registry = disease_registry.DiseaseModelRegistry(check_interval=0.0)
+    with caplog.at_level("WARNING", logger=disease_registry.__name__):
+        status = registry.status(tmp_path / "m")
+    assert (status["loaded"], status["skipped"]) == (len(TARGETS) - 1, 1)
+    assert "suitable_heart" in status["skipped_reasons"]
+    assert any("Skipping suitable_heart" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,63 @@
+import numpy as np
+
+from ml_model.training.food_embeddings import (
+    build_embedding_cache,
+    class_image_paths,
+    is_val_path,
+    load_embedding_cache,
+)
+
+
+def _dataset(root, classes):
+    for c in classes:
+        (root / c).mkdir(parents=True, exist_ok=True)
+        for i in range(10):
+            (root / c / f"{i}.jpg").write_bytes(b"")
+
+
+class FakeEmbed:
+    """Embeds each path as a vector of its class index; records which classes were embedded."""
+
+    def __init__(self, classes):
+        self.classes = classes
+        self.calls = []
+
+    def __call__(self, paths):
+        cls = paths[0].split("/")[-2]
+        self.calls.append(cls)
+        kept = [p for p in paths if not p.endswith("9.jpg")]  # one unreadable image per class
+        return kept, np.full((len(kept), 4), self.classes.index(cls), dtype=np.float32)
+
+
+def test_cache_reembeds_only_new_or_changed_classes(tmp_path):
+    data, cache = tmp_path / "images", tmp_path / "emb"
+    _dataset(data, ["dal", "roti"])
+    embed = FakeEmbed(["dal", "idli", "roti"])
+
+    stats = build_embedding_cache(data, cache, embed, backbone_hash="b1")
+    assert stats["embedded"] == {"dal": 10, "roti": 10}
+
+    _dataset(data, ["idli"])  # new class
+    stats = build_embedding_cache(data, cache, embed, backbone_hash="b1")
+    assert stats["embedded"] == {"idli": 10} and sorted(stats["reused"]) == ["dal", "roti"]
+
+    stats = build_embedding_cache(data, cache, embed, backbone_hash="b2")  # new backbone weights
+    assert sorted(stats["embedded"]) == ["dal", "idli", "roti"]
+    assert embed.calls == ["dal", "roti", "idli", "dal", "idli", "roti"]
+
+
+def test_load_cache_labels_and_stable_split(tmp_path):
+    data, cache = tmp_path / "images", tmp_path / "emb"
+    classes = ["dal", "idli", "roti"]
+    _dataset(data, classes)
+    build_embedding_cache(data, cache, FakeEmbed(classes), backbone_hash="b")
+
+    (x_tr, y_tr), (x_val, y_val) = load_embedding_cache(cache, classes)
+    assert len(y_tr) + len(y_val) == 27 and x_tr.dtype == np.float32
+    np.testing.assert_array_equal(x_tr[:, 0], y_tr)  # rows line up with their labels
+    np.testing.assert_array_equal(x_val[:, 0], y_val)
+
+    paths = class_image_paths(data / "dal")
+    expected_val = sum(is_val_path(p) for p in paths[:9])
+    assert int((y_val == 0).sum()) == expected_val
+    assert is_val_path("/a/dal/1.jpg") == is_val_path("/elsewhere/dal/1.jpg")
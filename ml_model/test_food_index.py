@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from ml_model.training.food_backends import _split_outputs
+from ml_model.training.food_index import FoodEmbeddingIndex, index_matches_model
+
+
+def _refs(rng, dishes, per_dish=5, dim=32):
+    centers = rng.normal(size=(len(dishes), dim))
+    return centers, [(d, c + 0.1 * rng.normal(size=(per_dish, dim))) for d, c in zip(dishes, centers)]
+
+
+def test_search_matches_brute_force_cosine():
+    rng = np.random.default_rng(0)
+    centers, refs = _refs(rng, ["Gulab Jamun", "Masala Dosa", "Idli", "Poha"])
+    refs.insert(2, ("Empty", np.zeros((0, 32))))  # dishes without references are dropped
+    index = FoodEmbeddingIndex.build(refs, backbone_hash="b")
+    assert index.names == ["Gulab Jamun", "Masala Dosa", "Idli", "Poha"] and len(index) == 20
+
+    queries = centers + 0.2 * rng.normal(size=centers.shape)
+    results = index.search_batch(queries, k=2)
+    for q, res in zip(queries, results):
+        sims = {}
+        for name, emb in refs:
+            if len(emb):
+                s = emb @ q / (np.linalg.norm(emb, axis=1) * np.linalg.norm(q))
+                sims[name] = s.max()
+        expected = sorted(sims, key=sims.get, reverse=True)[:2]
+        assert [n for n, _ in res] == expected
+        assert res[0][1] == pytest.approx(sims[expected[0]], rel=1e-5)
+    assert [r[0][0] for r in results] == index.names
+
+
+def test_index_roundtrip_is_memory_mapped(tmp_path):
+    rng = np.random.default_rng(1)
+    _, refs = _refs(rng, ["Dal", "Roti"])
+    index = FoodEmbeddingIndex.build(refs, backbone_hash="abc")
+    index.save(tmp_path / "food_index")
+
+    loaded = FoodEmbeddingIndex.load(tmp_path / "food_index")
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.names == ["Dal", "Roti"] and loaded.backbone_hash == "abc"
+    q = refs[1][1][0]
+    assert loaded.search(q, k=1)[0][0] == "Roti"
+
+
+def test_index_is_checked_against_the_served_model(tmp_path):
+    from ml_model.training.food_backends import model_digests
+
+    model = tmp_path / "model.tflite"
+    model.write_bytes(b"v1")
+    _, refs = _refs(np.random.default_rng(0), ["Idli", "Poha"])
+    FoodEmbeddingIndex.build(refs, model_digests=model_digests(tmp_path)).save(tmp_path / "food_index")
+    index = FoodEmbeddingIndex.load(tmp_path / "food_index")
+    assert index.model_digests.keys() == {"model.tflite"}
+
+    assert index_matches_model(index, model)[0]
+    model.write_bytes(b"v2")  # retrained in place
+    assert not index_matches_model(index, model)[0]
+    assert not index_matches_model(index, tmp_path / "model.onnx")[0]  # not what the index was built with
+    assert not index_matches_model(FoodEmbeddingIndex.build(refs), model)[0]  # no digests recorded
+
+
+def test_two_output_models_split_probs_from_embeddings():
+    probs, emb = np.zeros((2, 101)), np.zeros((2, 1280))
+    assert _split_outputs([emb, probs])[0] is probs
+    p, e = _split_outputs([probs])
+    assert p is probs and e is None
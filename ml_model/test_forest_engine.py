@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from sklearn.ensemble import RandomForestClassifier
+
+from ml_model.training.forest_engine import FlatForest
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 18)) * rng.uniform(1, 500, size=18)
+    y = ((X[:, 0] > 0) ^ (X[:, 3] > 50)).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize("max_depth", [3, 10, None])
+def test_predict_proba_matches_sklearn(data, max_depth):
+    X, y = data
+    clf = RandomForestClassifier(n_estimators=50, max_depth=max_depth, random_state=0).fit(X[:1500], y[:1500])
+    flat = FlatForest.from_sklearn(clf)
+    np.testing.assert_allclose(flat.predict_proba(X[1500:]), clf.predict_proba(X[1500:]), atol=1e-12)
+    np.testing.assert_array_equal(flat.predict(X[1500:]), clf.predict(X[1500:]))
+
+
+def test_save_load_roundtrip(data, tmp_path):
+    X, y = data
+    clf = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(clf)
+    loaded = FlatForest.load(flat.save(tmp_path / "m.forest", feature_names=[f"f{i}" for i in range(18)]), verify=True)
+    assert isinstance(loaded.value, np.memmap)
+    assert loaded.artifact.manifest["feature_names"][0] == "f0"
+    assert loaded.n_features_in_ == clf.n_features_in_
+    np.testing.assert_array_equal(loaded.classes_, clf.classes_)
+    np.testing.assert_allclose(loaded.predict_proba(X), clf.predict_proba(X), atol=1e-12)
+
+
+def test_artifact_checksum_detects_tampering(tmp_path):
+    from ml_model.training.artifacts import load_artifact, save_artifact
+
+    path = save_artifact(tmp_path / "a", {"w": np.arange(8, dtype=np.float64)}, kind="test", train_data_hash="abc")
+    art = load_artifact(path, verify=True)
+    assert art.manifest["train_data_hash"] == "abc" and art.mapped_bytes == 64
+
+    w = np.load(path / "w.npy")
+    w[0] = 42
+    np.save(path / "w.npy", w)
+    assert load_artifact(path).arrays["w"][0] == 42
+    with pytest.raises(ValueError, match="Checksum"):
+        load_artifact(path, verify=True)
@@ -0,0 +1,48 @@
+import numpy as np
+from PIL import Image
+
+from ml_model.training.image_shards import (
+    iter_shard,
+    read_shards_manifest,
+    split_image_paths,
+    write_shards,
+)
+
+
+def _dataset(root):
+    for c, color in (("dal", (200, 150, 0)), ("roti", (230, 210, 170))):
+        (root / c).mkdir(parents=True)
+        for i in range(5):
+            ext = "png" if i % 2 else "jpg"
+            Image.new("RGB", (64 + i, 48), color).save(root / c / f"{i}.{ext}")
+    (root / "dal" / "broken.jpg").write_bytes(b"not an image")
+    return root
+
+
+def test_shards_hold_resized_pixels_labels_and_split(tmp_path):
+    data = _dataset(tmp_path / "images")
+    manifest = write_shards(data, tmp_path / "shards", shard_size=3)
+
+    assert manifest == read_shards_manifest(tmp_path / "shards")
+    assert manifest["class_names"] == ["dal", "roti"]
+    train, val = split_image_paths(data, manifest["class_names"])
+    counts = {s: sum(x["count"] for x in manifest["splits"][s]) for s in ("train", "val")}
+    assert counts["train"] + counts["val"] + sum(manifest["skipped"].values()) == len(train) + len(val) == 11
+    assert sum(manifest["skipped"].values()) == 1
+    assert all(x["count"] <= 3 for s in manifest["splits"].values() for x in s)
+
+    seen = []
+    for shard in manifest["splits"]["train"]:
+        for images, labels in iter_shard(str(tmp_path / "shards" / shard["path"]), block=2):
+            assert images.dtype == np.uint8 and images.shape[1:] == (224, 224, 3)
+            seen.extend(zip(labels.tolist(), images[:, 0, 0, 0].tolist()))
+    # red channel identifies the class; PNG and JPEG both decoded
+    assert seen and all(abs(red - (200, 230)[lbl]) <= 2 for lbl, red in seen)
+    assert len(seen) == counts["train"]
+
+
+def test_iter_shard_accepts_tf_bytes_paths(tmp_path):
+    manifest = write_shards(_dataset(tmp_path / "images"), tmp_path / "shards", shard_size=100)
+    path = str(tmp_path / "shards" / manifest["splits"]["val"][0]["path"]).encode()
+    (images, labels), = list(iter_shard(path))
+    assert len(images) == len(labels) == manifest["splits"]["val"][0]["count"]
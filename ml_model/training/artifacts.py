@@ -0,0 +1,210 @@
+"""
+Versioned, memory-mappable model artifacts.
+
+An artifact is a directory of raw `.npy` arrays plus a `manifest.json`:
+
+    suitable_heart.forest/
+      manifest.json      format, version, kind, feature order, metrics,
+                         training-data hash, per-array sha256/shape/dtype,
+                         overall checksum
+      feature.npy
+      threshold.npy
+      ...
+
+`load_artifact(..., mmap=True)` opens every array with `np.load(mmap_mode="r")`,
+so loading is a few `open`/`mmap` calls regardless of model size, and worker
+processes serving the same files share the pages through the OS page cache
+instead of each unpickling a private copy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+ARTIFACT_FORMAT = "nutribot-arrays"
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+@dataclass
+class Artifact:
+    path: Path
+    manifest: Dict[str, Any]
+    arrays: Dict[str, np.ndarray]
+    load_seconds: float
+
+    @property
+    def mapped_bytes(self) -> int:
+        return int(sum(a.nbytes for a in self.arrays.values()))
+
+    def resident_bytes(self) -> Optional[int]:
+        """Bytes of this artifact's files currently resident in this process (Linux only)."""
+        return resident_bytes(self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.manifest.get("kind"),
+            "load_seconds": round(self.load_seconds, 6),
+            "mapped_bytes": self.mapped_bytes,
+            "resident_bytes": self.resident_bytes(),
+        }
+
+
+def _sha256(arr: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(arr).tobytes()).hexdigest()
+
+
+def _checksum(entries: Mapping[str, Mapping[str, Any]]) -> str:
+    h = hashlib.sha256()
+    for name in sorted(entries):
+        h.update(name.encode())
+        h.update(entries[name]["sha256"].encode())
+    return h.hexdigest()
+
+
+def data_hash(*arrays: Any) -> str:
+    """Stable hash of training inputs (e.g. X, y) for the manifest."""
+    h = hashlib.sha256()
+    for a in arrays:
+        a = np.ascontiguousarray(np.asarray(a))
+        h.update(str(a.dtype).encode())
+        h.update(str(a.shape).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def save_artifact(
+    path: Union[str, Path],
+    arrays: Mapping[str, np.ndarray],
+    *,
+    kind: str,
+    feature_names: Optional[Sequence[str]] = None,
+    metrics: Optional[Mapping[str, Any]] = None,
+    train_data_hash: Optional[str] = None,
+    extra: Optional[Mapping[str, Any]] = None,
+) -> Path:
+    """Write arrays + manifest to a temp dir, then swap it into place."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        if arr.dtype == object:
+            raise TypeError(f"Array {name!r} has dtype=object and cannot be memory-mapped")
+        np.save(tmp / f"{name}.npy", arr, allow_pickle=False)
+        entries[name] = {"file": f"{name}.npy", "dtype": str(arr.dtype), "shape": list(arr.shape), "sha256": _sha256(arr)}
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": FORMAT_VERSION,
+        "kind": kind,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "feature_names": list(feature_names) if feature_names is not None else None,
+        "metrics": dict(metrics or {}),
+        "train_data_hash": train_data_hash,
+        "arrays": entries,
+        "checksum": _checksum(entries),
+        **dict(extra or {}),
+    }
+    with open(tmp / MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    if path.exists():
+        old = path.with_name(path.name + ".old")
+        if old.exists():
+            shutil.rmtree(old)
+        path.rename(old)
+        tmp.rename(path)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        tmp.rename(path)
+    return path
+
+
+def read_manifest(path: Union[str, Path]) -> Dict[str, Any]:
+    with open(Path(path) / MANIFEST, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != ARTIFACT_FORMAT or manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact {path}: format={manifest.get('format')!r} version={manifest.get('version')!r}"
+        )
+    return manifest
+
+
+def load_artifact(path: Union[str, Path], *, mmap: bool = True, verify: bool = False) -> Artifact:
+    """
+    Open an artifact directory. With mmap=True arrays are read-only memory maps.
+    verify=True re-hashes every array against the manifest (reads all pages).
+    """
+    t0 = time.perf_counter()
+    path = Path(path)
+    manifest = read_manifest(path)
+    arrays: Dict[str, np.ndarray] = {}
+    for name, entry in manifest["arrays"].items():
+        arr = np.load(path / entry["file"], mmap_mode="r" if mmap else None, allow_pickle=False)
+        if list(arr.shape) != entry["shape"] or str(arr.dtype) != entry["dtype"]:
+            raise ValueError(f"Array {name!r} in {path} does not match its manifest entry")
+        if verify and _sha256(arr) != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch for array {name!r} in {path}")
+        arrays[name] = arr
+    if verify and _checksum(manifest["arrays"]) != manifest.get("checksum"):
+        raise ValueError(f"Manifest checksum mismatch in {path}")
+    return Artifact(path=path, manifest=manifest, arrays=arrays, load_seconds=time.perf_counter() - t0)
+
+
+def resident_bytes(path: Union[str, Path]) -> Optional[int]:
+    """Sum of Rss over this process's mappings of files under `path`; None where unsupported."""
+    smaps = Path("/proc/self/smaps")
+    if not smaps.exists():
+        return None
+    prefix = str(Path(path).resolve()) + "/"
+    total = 0
+    current = False
+    try:
+        with open(smaps, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                head = line.split(None, 1)[0]
+                if not head.endswith(":"):
+                    # mapping header: "addr perms offset dev inode [path]"
+                    parts = line.split(None, 5)
+                    current = len(parts) == 6 and parts[5].strip().startswith(prefix)
+                elif current and head == "Rss:":
+                    total += int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return total
+
+
+def is_artifact(path: Union[str, Path]) -> bool:
+    return (Path(path) / MANIFEST).exists()
+
+
+def describe(paths: List[Union[str, Path]]) -> List[Dict[str, Any]]:
+    """Load each artifact and report load time / mapped / resident size."""
+    out = []
+    for p in paths:
+        art = load_artifact(p, verify=True)
+        out.append({"path": str(p), **art.stats()})
+    return out
+
+
+if __name__ == "__main__":
+    for row in describe(sys.argv[1:]):
+        print(json.dumps(row))
@@ -0,0 +1,186 @@
+"""
+Batch food classification over a directory or manifest of images.
+
+Usage:
+  python -m ml_model.training.batch_predict_food --images scans/ --output labels.csv
+  python -m ml_model.training.batch_predict_food --manifest scans.txt --output labels.jsonl --top_k 5
+
+The model is loaded once (any backend from food_backends: auto, keras,
+tflite, onnx). Images are read and decoded in parallel by a tf.data pipeline,
+batched and prefetched so decoding overlaps inference. Decoding and the
+224x224 resize are the serving path's (PIL, model_pixels_from_bytes), so
+batch labels and embeddings match what /predict_food sees for the same
+photo. Results are written per batch, so memory stays flat on large archives:
+
+  .csv    path, label_1, confidence_1, ..., label_k, confidence_k
+  .jsonl  {"path": ..., "top_k": [{"label": ..., "confidence": ...}, ...]}
+
+Unreadable images are skipped and counted. Throughput (images/sec) is
+printed at the end together with the totals.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+from ml_model.training.food_backends import BACKENDS, INPUT_SHAPE, load_backend, load_class_names
+
+SAVED_MODELS_DIR = PROJECT_ROOT / "ml_model" / "saved_models" / "food_cnn"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+
+
+def collect_paths(images_dir: Path = None, manifest: Path = None) -> List[str]:
+    """Image paths from a directory (recursive) or a manifest (one path per line, or CSV with a `path` column)."""
+    if manifest is not None:
+        manifest = Path(manifest)
+        text = manifest.read_text(encoding="utf-8")
+        if manifest.suffix == ".csv":
+            rows = csv.DictReader(text.splitlines())
+            paths = [r["path"] for r in rows if r.get("path")]
+        else:
+            paths = [line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")]
+        base = manifest.parent
+        return [p if Path(p).is_absolute() else str(base / p) for p in paths]
+    return sorted(str(p) for p in Path(images_dir).rglob("*") if p.suffix.lower() in IMAGE_EXTS)
+
+
+def make_dataset(paths: Sequence[str], batch_size: int):
+    """(path, float32 image) batches; decode/resize run in parallel and are prefetched."""
+    import tensorflow as tf
+
+    from backend.utils.image_preprocessing import model_pixels_from_bytes
+
+    size = (INPUT_SHAPE[1], INPUT_SHAPE[0])
+
+    def load(path):
+        # Same decode + resize as serving (not tf.image.resize), so results agree with the API
+        img = tf.numpy_function(lambda b: model_pixels_from_bytes(b, size=size), [tf.io.read_file(path)], tf.uint8)
+        img = tf.ensure_shape(img, INPUT_SHAPE)
+        return path, tf.keras.applications.mobilenet_v2.preprocess_input(tf.cast(img, tf.float32))
+
+    ds = tf.data.Dataset.from_tensor_slices(list(paths))
+    ds = ds.map(load, num_parallel_calls=tf.data.AUTOTUNE, deterministic=True)
+    ds = ds.ignore_errors()  # the path travels with each image, so rows stay aligned
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def top_k_rows(
+    paths: Sequence[str], probs: np.ndarray, class_names: Sequence[str], k: int
+) -> Iterator[Tuple[str, List[Tuple[str, float]]]]:
+    k = min(k, probs.shape[1])
+    idx = np.argpartition(-probs, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(probs, idx, axis=1).argsort(axis=1)[:, ::-1]
+    idx = np.take_along_axis(idx, order, axis=1)
+    for path, row, p in zip(paths, idx, probs):
+        yield path, [(class_names[i] if i < len(class_names) else "unknown", float(p[i])) for i in row]
+
+
+class ResultWriter:
+    """Streams rows to CSV or JSONL depending on the output suffix."""
+
+    def __init__(self, path: Path, top_k: int):
+        self.path = Path(path)
+        self.jsonl = self.path.suffix == ".jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "w", encoding="utf-8", newline="")
+        if not self.jsonl:
+            self._csv = csv.writer(self._f)
+            header = ["path"]
+            for i in range(1, top_k + 1):
+                header += [f"label_{i}", f"confidence_{i}"]
+            self._csv.writerow(header)
+
+    def write(self, path: str, top: List[Tuple[str, float]]) -> None:
+        if self.jsonl:
+            rec = {"path": path, "top_k": [{"label": l, "confidence": round(c, 6)} for l, c in top]}
+            self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        else:
+            self._csv.writerow([path] + [v for l, c in top for v in (l, f"{c:.6f}")])
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def predict_paths(
+    paths: Sequence[str],
+    output: Path,
+    *,
+    model_dir: Path = SAVED_MODELS_DIR,
+    backend: str = "auto",
+    batch_size: int = 64,
+    top_k: int = 3,
+) -> Dict[str, float]:
+    model_dir = Path(model_dir)
+    class_names = load_class_names(model_dir)
+    if not class_names:
+        raise SystemExit(f"No class_names.txt in {model_dir}")
+    model = load_backend(backend, model_dir)
+    if hasattr(model, "warmup"):
+        model.warmup([batch_size])
+
+    writer = ResultWriter(output, top_k)
+    written = 0
+    t0 = time.perf_counter()
+    try:
+        for batch_paths, images in make_dataset(paths, batch_size):
+            probs = model.predict_batch(images.numpy())
+            names = [p.decode("utf-8") for p in batch_paths.numpy()]
+            for path, top in top_k_rows(names, probs, class_names, top_k):
+                writer.write(path, top)
+            written += len(names)
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - t0
+    return {
+        "backend": getattr(model, "name", backend),
+        "images": len(paths),
+        "predicted": written,
+        "skipped": len(paths) - written,
+        "seconds": round(seconds, 2),
+        "images_per_sec": round(written / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--images", type=str, help="Directory of images (searched recursively)")
+    src.add_argument("--manifest", type=str, help="Text file of paths, or CSV with a `path` column")
+    parser.add_argument("--output", type=str, required=True, help="Results file (.csv or .jsonl)")
+    parser.add_argument("--model_dir", type=str, default=str(SAVED_MODELS_DIR))
+    parser.add_argument("--backend", choices=BACKENDS, default="auto")
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--top_k", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    paths = collect_paths(
+        Path(args.images) if args.images else None,
+        Path(args.manifest) if args.manifest else None,
+    )
+    if not paths:
+        print("No images found.")
+        return 1
+    summary = predict_paths(
+        paths,
+        Path(args.output),
+        model_dir=Path(args.model_dir),
+        backend=args.backend,
+        batch_size=args.batch_size,
+        top_k=args.top_k,
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,10 +8,11 @@ for diabetes, blood pressure, and heart suitability (binary).
 from __future__ import annotations
 
 import json
-import pickle
+import os
 import sys
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
@@ -75,20 +76,90 @@ def load_unified_data(csv_path: Optional[Path] = None) -> pd.DataFrame:
     return df
 
 
+def _fit_target(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    n_jobs: int = 1,
+    cv_folds: int = 0,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Fit one target's forest and score it. Module-level so process pools can pickle it."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+
+    t0 = time.perf_counter()
+    clf = RandomForestClassifier(n_estimators=50, max_depth=10, random_state=42, n_jobs=n_jobs)
+    clf.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - t0
+    y_pred = clf.predict(X_test)
+    metrics: Dict[str, Any] = {
+        "accuracy": float(accuracy_score(y_test, y_pred)),
+        "precision": float(precision_score(y_test, y_pred, zero_division=0)),
+        "recall": float(recall_score(y_test, y_pred, zero_division=0)),
+        "f1": float(f1_score(y_test, y_pred, zero_division=0)),
+        "n_train": int(len(X_train)),
+        "n_test": int(len(X_test)),
+        "fit_seconds": round(fit_seconds, 4),
+    }
+
+    if cv_folds and cv_folds > 1:
+        from sklearn.base import clone
+        from sklearn.model_selection import StratifiedKFold, cross_validate
+
+        t0 = time.perf_counter()
+        X_all = np.concatenate([X_train, X_test])
+        y_all = np.concatenate([y_train, y_test])
+        folds = min(int(cv_folds), int(np.bincount(y_all).min()))
+        if folds > 1:
+            cv = cross_validate(
+                clone(clf).set_params(n_jobs=1),
+                X_all,
+                y_all,
+                cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=42),
+                scoring=("accuracy", "f1"),
+                n_jobs=n_jobs,
+            )
+            metrics["cv"] = {
+                "folds": folds,
+                "accuracy_mean": float(cv["test_accuracy"].mean()),
+                "accuracy_std": float(cv["test_accuracy"].std()),
+                "f1_mean": float(cv["test_f1"].mean()),
+                "f1_std": float(cv["test_f1"].std()),
+                "seconds": round(time.perf_counter() - t0, 4),
+            }
+    return clf, metrics
+
+
 def train_disease_models(
     df: Optional[pd.DataFrame] = None,
     output_dir: Optional[Path] = None,
+    *,
+    n_jobs: int = 1,
+    cv_folds: int = 0,
 ) -> Dict[str, Any]:
     """
     Train binary classifiers for each disease target.
-    Uses RandomForest; persists models and metadata (features + normalization stats).
+    Uses RandomForest; persists each model as a memory-mappable `<target>.forest`
+    artifact (see artifacts.py) and metadata (features + normalization stats +
+    per-stage timings).
+
+    The feature matrix and train/test split are computed once and shared by
+    all targets. With n_jobs != 1 the targets train in parallel worker
+    processes (n_jobs=-1: all cores), and any remaining cores go to each
+    forest / cross-validation. cv_folds > 1 adds stratified k-fold scores.
     """
+    from concurrent.futures import ProcessPoolExecutor
+
     try:
-        from sklearn.ensemble import RandomForestClassifier
-        from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
         from sklearn.model_selection import train_test_split
     except ImportError:
         raise ImportError("Install scikit-learn: pip install scikit-learn")
+    from ml_model.training.artifacts import data_hash
+    from ml_model.training.forest_engine import FlatForest, forest_path
+
+    t_start = time.perf_counter()
+    timings: Dict[str, Any] = {}
 
     df = df if df is not None else load_unified_data()
     if df.empty:
@@ -97,35 +168,59 @@ def train_disease_models(
     output_dir = Path(output_dir or SAVED_MODEL_DIR)
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # ---- shared preprocessing ----
+    t0 = time.perf_counter()
     feature_cols = [c for c in (NUTRIENT_FEATURES + ENGINEERED_FEATURES) if c in df.columns]
-    X = df[feature_cols].copy()
-    X = X.fillna(0)
-    feature_names = list(X.columns)
-    means = X.mean(axis=0).to_dict()
-    stds = X.std(axis=0).replace(0, 1.0).to_dict()
-    results = {}
-
+    X_df = df[feature_cols].fillna(0)
+    feature_names = list(X_df.columns)
+    means = X_df.mean(axis=0).to_dict()
+    stds = X_df.std(axis=0).replace(0, 1.0).to_dict()
+    X = X_df.to_numpy(dtype=float)
+    train_idx, test_idx = train_test_split(np.arange(len(X)), test_size=0.2, random_state=42)
+    X_train, X_test = X[train_idx], X[test_idx]
+
+    labels: Dict[str, np.ndarray] = {}
     for target in TARGETS:
         if target not in df.columns:
             continue
-        y = pd.to_numeric(df[target], errors="coerce")
-        y = y.fillna(0).astype(int).clip(0, 1)
-        if y.nunique() < 2:
+        y = pd.to_numeric(df[target], errors="coerce").fillna(0).astype(int).clip(0, 1).to_numpy()
+        if len(np.unique(y)) < 2:
             continue
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        clf = RandomForestClassifier(n_estimators=50, max_depth=10, random_state=42)
-        clf.fit(X_train, y_train)
-        y_pred = clf.predict(X_test)
-        results[target] = {
-            "accuracy": float(accuracy_score(y_test, y_pred)),
-            "precision": float(precision_score(y_test, y_pred, zero_division=0)),
-            "recall": float(recall_score(y_test, y_pred, zero_division=0)),
-            "f1": float(f1_score(y_test, y_pred, zero_division=0)),
-            "n_train": int(len(X_train)),
-            "n_test": int(len(X_test)),
-        }
-        with open(output_dir / f"{target}.pkl", "wb") as f:
-            pickle.dump(clf, f)
+        labels[target] = y
+    timings["prepare_seconds"] = round(time.perf_counter() - t0, 4)
+
+    # ---- fit (parallel across targets) ----
+    t0 = time.perf_counter()
+    cores = os.cpu_count() or 1
+    budget = cores if n_jobs is None or n_jobs < 0 else max(1, int(n_jobs))
+    workers = min(len(labels), budget)
+    inner_jobs = max(1, budget // max(1, workers))
+    jobs = {
+        t: (X_train, y[train_idx], X_test, y[test_idx], inner_jobs, cv_folds) for t, y in labels.items()
+    }
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {t: pool.submit(_fit_target, *args) for t, args in jobs.items()}
+            fitted = {t: f.result() for t, f in futures.items()}
+    else:
+        fitted = {t: _fit_target(*args) for t, args in jobs.items()}
+    timings["fit_seconds"] = round(time.perf_counter() - t0, 4)
+    timings["workers"] = workers
+    timings["inner_jobs"] = inner_jobs
+
+    # ---- save ----
+    t0 = time.perf_counter()
+    results = {}
+    for target, (clf, metrics) in fitted.items():
+        results[target] = metrics
+        FlatForest.from_sklearn(clf).save(
+            forest_path(output_dir, target),
+            feature_names=feature_names,
+            metrics=metrics,
+            train_data_hash=data_hash(X, labels[target]),
+        )
+    timings["save_seconds"] = round(time.perf_counter() - t0, 4)
+    timings["total_seconds"] = round(time.perf_counter() - t_start, 4)
 
     with open(output_dir / "metadata.json", "w", encoding="utf-8") as f:
         json.dump(
@@ -134,6 +229,7 @@ def train_disease_models(
                 "means": means,
                 "stds": stds,
                 "metrics": results,
+                "timings": timings,
             },
             f,
             ensure_ascii=False,
@@ -155,6 +251,13 @@ def _load_metadata(model_dir: Path) -> Optional[Dict[str, Any]]:
         return json.load(f)
 
 
+def _loaded_models(model_dir: Optional[Path]):
+    # Imported lazily: the registry module imports from this one
+    from ml_model.training.disease_registry import get_registry
+
+    return get_registry().get(model_dir)
+
+
 def predict_disease(
     nutrient_dict: Dict[str, float],
     model_dir: Optional[Path] = None,
@@ -162,25 +265,74 @@ def predict_disease(
     """
     Predict disease suitability from a dict of nutrient values (per 100g or serving).
     Returns e.g. {"suitable_diabetes": 1, "suitable_blood_pressure": 1, "suitable_heart": 0}.
+
+    Models come from the process-wide registry (loaded once per model_dir).
     """
-    model_dir = Path(model_dir or SAVED_MODEL_DIR)
-    meta = _load_metadata(model_dir)
-    if not meta:
+    loaded = _loaded_models(model_dir)
+    if loaded is None:
         return {t: -1 for t in TARGETS}
-    feature_names = meta.get("feature_names", [])
-    X = np.array([[float(nutrient_dict.get(c, 0)) for c in feature_names]], dtype=float)
+    X = np.array([[float(nutrient_dict.get(c, 0)) for c in loaded.feature_names]], dtype=float)
     out = {}
     for target in TARGETS:
-        pkl_path = model_dir / f"{target}.pkl"
-        if not pkl_path.exists():
-            out[target] = -1
+        clf = loaded.models.get(target)
+        out[target] = int(clf.predict(X)[0]) if clf is not None else -1
+    return out
+
+
+def _positive_proba(clf, X: np.ndarray) -> np.ndarray:
+    """P(label == 1) for every row."""
+    if not hasattr(clf, "predict_proba"):
+        return clf.predict(X).astype(float)
+    proba = clf.predict_proba(X)
+    classes = list(getattr(clf, "classes_", [0, 1]))
+    return proba[:, classes.index(1)] if 1 in classes else np.zeros(len(X))
+
+
+def _top_factor_arrays(
+    X: np.ndarray,
+    means: np.ndarray,
+    stds: np.ndarray,
+    importances: np.ndarray,
+    top_k: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Explanation proxy abs(zscore) * feature_importance for all rows at once.
+    Returns (indices, scores), each (n_rows, k), sorted by descending score.
+    """
+    scores = np.abs((X - means) / stds) * importances
+    k = min(max(1, int(top_k)), scores.shape[1])
+    if k < scores.shape[1]:
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+    part = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-part, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(part, order, axis=1)
+
+
+def _risk_arrays(loaded, X: np.ndarray, top_k: int) -> Dict[str, Dict[str, np.ndarray]]:
+    """target -> {"probability", "label", "factor_idx", "factor_score"} arrays for every row."""
+    out: Dict[str, Dict[str, np.ndarray]] = {}
+    n_features = len(loaded.feature_names)
+    for target in TARGETS:
+        clf = loaded.models.get(target)
+        if clf is None:
             continue
-        with open(pkl_path, "rb") as f:
-            clf = pickle.load(f)
-        out[target] = int(clf.predict(X)[0])
+        prob = _positive_proba(clf, X)
+        res = {"probability": prob, "label": (prob >= 0.5).astype(int)}
+        importances = getattr(clf, "feature_importances_", None)
+        if importances is not None and len(importances) == n_features:
+            res["factor_idx"], res["factor_score"] = _top_factor_arrays(
+                X, loaded.means, loaded.stds, np.asarray(importances, dtype=float), top_k
+            )
+        out[target] = res
     return out
 
 
+def _factors_dict(feature_names: List[str], idx: np.ndarray, score: np.ndarray) -> Dict[str, float]:
+    return {feature_names[i]: float(v) for i, v in zip(idx, score) if v > 0}
+
+
 def predict_disease_risk(
     nutrient_dict: Dict[str, float],
     model_dir: Optional[Path] = None,
@@ -196,47 +348,66 @@ def predict_disease_risk(
         ...
       }
     """
-    model_dir = Path(model_dir or SAVED_MODEL_DIR)
-    meta = _load_metadata(model_dir)
-    if not meta:
+    loaded = _loaded_models(model_dir)
+    if loaded is None:
         return {}
-    feature_names: List[str] = meta.get("feature_names", [])
-    means: Dict[str, float] = meta.get("means", {}) or {}
-    stds: Dict[str, float] = meta.get("stds", {}) or {}
-
-    x = np.array([float(nutrient_dict.get(c, 0)) for c in feature_names], dtype=float)
-    X = x.reshape(1, -1)
+    feature_names = loaded.feature_names
+    X = np.array([[float(nutrient_dict.get(c, 0)) for c in feature_names]], dtype=float)
 
     out: Dict[str, Dict[str, Any]] = {}
-    for target in TARGETS:
-        pkl_path = model_dir / f"{target}.pkl"
-        if not pkl_path.exists():
-            continue
-        with open(pkl_path, "rb") as f:
-            clf = pickle.load(f)
+    for target, res in _risk_arrays(loaded, X, top_k).items():
+        top = (
+            _factors_dict(feature_names, res["factor_idx"][0], res["factor_score"][0])
+            if "factor_idx" in res
+            else {}
+        )
+        out[target] = {"probability": float(res["probability"][0]), "label": int(res["label"][0]), "top_factors": top}
+    return out
 
-        if hasattr(clf, "predict_proba"):
-            prob = float(clf.predict_proba(X)[0][1])
-        else:
-            prob = float(clf.predict(X)[0])
-        label = int(prob >= 0.5)
 
-        # Explanation proxy: abs(zscore) * feature_importance
-        importances = getattr(clf, "feature_importances_", None)
-        if importances is None or len(importances) != len(feature_names):
-            top = {}
-        else:
-            z = np.array(
-                [
-                    (x[i] - float(means.get(feature_names[i], 0.0))) / float(stds.get(feature_names[i], 1.0) or 1.0)
-                    for i in range(len(feature_names))
-                ],
-                dtype=float,
-            )
-            scores = np.abs(z) * np.array(importances, dtype=float)
-            idxs = np.argsort(scores)[::-1][: max(1, int(top_k))]
-            top = {feature_names[i]: float(scores[i]) for i in idxs if scores[i] > 0}
-
-        out[target] = {"probability": prob, "label": label, "top_factors": top}
+def predict_disease_risk_batch(
+    foods: Union[pd.DataFrame, np.ndarray],
+    model_dir: Optional[Path] = None,
+    *,
+    top_k: int = 5,
+) -> pd.DataFrame:
+    """
+    Batch version of `predict_disease_risk`.
 
-    return out
+    `foods` is a DataFrame (columns matched by feature name, missing -> 0) or a
+    2-D array already in the model's feature order. Returns a DataFrame aligned
+    with the input rows and, per target, the columns
+    `<target>_probability`, `<target>_label` and `<target>_top_factors`.
+    """
+    loaded = _loaded_models(model_dir)
+    if isinstance(foods, pd.DataFrame):
+        index = foods.index
+    else:
+        index = pd.RangeIndex(len(foods))
+    if loaded is None:
+        return pd.DataFrame(index=index)
+
+    feature_names = loaded.feature_names
+    if isinstance(foods, pd.DataFrame):
+        X = (
+            foods.reindex(columns=feature_names)
+            .apply(pd.to_numeric, errors="coerce")
+            .fillna(0)
+            .to_numpy(dtype=float)
+        )
+    else:
+        X = np.asarray(foods, dtype=float)
+        if X.ndim != 2 or X.shape[1] != len(feature_names):
+            raise ValueError(f"Expected an (n, {len(feature_names)}) array in feature order {feature_names}")
+
+    columns: Dict[str, Any] = {}
+    for target, res in _risk_arrays(loaded, X, top_k).items():
+        columns[f"{target}_probability"] = res["probability"]
+        columns[f"{target}_label"] = res["label"]
+        if "factor_idx" in res:
+            columns[f"{target}_top_factors"] = [
+                _factors_dict(feature_names, i, v) for i, v in zip(res["factor_idx"], res["factor_score"])
+            ]
+        else:
+            columns[f"{target}_top_factors"] = [{} for _ in range(len(X))]
+    return pd.DataFrame(columns, index=index)
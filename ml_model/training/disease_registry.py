@@ -0,0 +1,212 @@
+"""
+Process-wide registry of loaded disease suitability models.
+
+`predict_disease` / `predict_disease_risk` used to re-read metadata.json and
+re-unpickle every target model on each call. The registry loads a model
+directory once, keeps it in memory, and reloads only when a file signature
+(name, mtime, size) changes. Signatures are re-checked at most every
+`check_interval` seconds so the hot path is a dict lookup.
+
+Models are `<target>.forest` artifacts (forest_engine / artifacts), opened as
+read-only memory maps so worker processes share pages; legacy `<target>.pkl`
+files are used only when no artifact exists.
+
+The feature order comes from the models themselves (sklearn
+`feature_names_in_`, or the artifact manifest) when they agree with each other
+but not with metadata.json / feature_names.json. A model whose inputs still do
+not match is skipped with a warning; `status()` reports loaded vs skipped.
+"""
+
+from __future__ import annotations
+
+import logging
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ml_model.training.disease_model import SAVED_MODEL_DIR, TARGETS, _load_metadata
+from ml_model.training.artifacts import MANIFEST, is_artifact
+from ml_model.training.forest_engine import FlatForest, forest_path
+
+logger = logging.getLogger(__name__)
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+@dataclass(frozen=True)
+class LoadedDiseaseModels:
+    model_dir: Path
+    signature: Signature
+    metadata: Dict[str, Any]
+    feature_names: List[str]
+    means: np.ndarray  # aligned with feature_names
+    stds: np.ndarray  # aligned with feature_names, zeros replaced by 1
+    models: Dict[str, Any]  # target -> fitted classifier
+    load_seconds: float
+    # target -> {"source", "load_seconds", "mapped_bytes", "resident_bytes"}
+    artifact_stats: Dict[str, Dict[str, Any]]
+    skipped: Dict[str, str] = field(default_factory=dict)  # target -> reason
+    feature_source: str = "metadata"  # or "model" when taken from the fitted models
+
+
+def _watched_files(model_dir: Path) -> List[Path]:
+    return (
+        [model_dir / "metadata.json", model_dir / "feature_names.json"]
+        + [model_dir / f"{t}.pkl" for t in TARGETS]
+        + [forest_path(model_dir, t) / MANIFEST for t in TARGETS]
+    )
+
+
+def file_signature(model_dir: Path) -> Signature:
+    sig = []
+    for p in _watched_files(model_dir):
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        sig.append((p.name, st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+def model_feature_names(clf) -> Optional[List[str]]:
+    """Input columns a fitted model was trained on, if it recorded them."""
+    names = getattr(clf, "feature_names_in_", None)
+    if names is None and getattr(clf, "artifact", None) is not None:
+        names = clf.artifact.manifest.get("feature_names")
+    return [str(n) for n in names] if names is not None else None
+
+
+def _load(model_dir: Path, signature: Signature) -> Optional[LoadedDiseaseModels]:
+    t0 = time.perf_counter()
+    meta = _load_metadata(model_dir)
+    if not meta:
+        return None
+    feature_names: List[str] = list(meta.get("feature_names", []))
+
+    candidates: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+    for target in TARGETS:
+        pkl_path = model_dir / f"{target}.pkl"
+        flat_path = forest_path(model_dir, target)
+        t_model = time.perf_counter()
+        if is_artifact(flat_path):
+            clf = FlatForest.load(flat_path)
+            stats = {"source": "artifact", **clf.artifact.stats()}
+        elif pkl_path.exists():
+            with open(pkl_path, "rb") as f:
+                clf = pickle.load(f)
+            stats = {"source": "pickle", "load_seconds": round(time.perf_counter() - t_model, 6)}
+        else:
+            continue
+        candidates[target] = (clf, stats)
+
+    # Trust the fitted models' own column order over stale metadata
+    feature_source = "metadata"
+    own = {tuple(n) for n in (model_feature_names(clf) for clf, _ in candidates.values()) if n}
+    if len(own) == 1 and list(next(iter(own))) != feature_names:
+        model_names = list(next(iter(own)))
+        logger.warning(
+            "%s: metadata lists %d features but the models were fitted on %d; using the models' order",
+            model_dir,
+            len(feature_names),
+            len(model_names),
+        )
+        feature_names, feature_source = model_names, "model"
+
+    means_d: Dict[str, float] = meta.get("means", {}) or {}
+    stds_d: Dict[str, float] = meta.get("stds", {}) or {}
+    means = np.array([float(means_d.get(c, 0.0)) for c in feature_names], dtype=float)
+    stds = np.array([float(stds_d.get(c, 1.0) or 1.0) for c in feature_names], dtype=float)
+
+    models: Dict[str, Any] = {}
+    artifact_stats: Dict[str, Dict[str, Any]] = {}
+    skipped: Dict[str, str] = {}
+    for target, (clf, stats) in candidates.items():
+        n_in = getattr(clf, "n_features_in_", len(feature_names))
+        names = model_feature_names(clf)
+        if n_in != len(feature_names) or (names is not None and names != feature_names):
+            # Model and features disagree; predicting would raise (or silently misalign) on every call
+            skipped[target] = f"model expects {n_in} features, serving {len(feature_names)}"
+            logger.warning("Skipping %s from %s: %s", target, model_dir, skipped[target])
+            continue
+        models[target] = clf
+        artifact_stats[target] = stats
+        logger.info("Loaded %s from %s: %s", target, model_dir, stats)
+    if candidates and not models:
+        logger.warning("No usable disease models in %s; callers fall back to the threshold rules", model_dir)
+
+    return LoadedDiseaseModels(
+        model_dir=model_dir,
+        signature=signature,
+        metadata=meta,
+        feature_names=feature_names,
+        means=means,
+        stds=stds,
+        models=models,
+        load_seconds=time.perf_counter() - t0,
+        artifact_stats=artifact_stats,
+        skipped=skipped,
+        feature_source=feature_source,
+    )
+
+
+class DiseaseModelRegistry:
+    """Thread-safe cache of `LoadedDiseaseModels` keyed by resolved model directory."""
+
+    def __init__(self, *, check_interval: float = 2.0):
+        self._check_interval = float(check_interval)
+        self._lock = threading.Lock()
+        self._entries: Dict[Path, Optional[LoadedDiseaseModels]] = {}
+        self._signatures: Dict[Path, Signature] = {}
+        self._checked_at: Dict[Path, float] = {}
+
+    def get(self, model_dir: Optional[Path] = None) -> Optional[LoadedDiseaseModels]:
+        key = Path(model_dir or SAVED_MODEL_DIR).resolve()
+        now = time.monotonic()
+        if key in self._entries and now - self._checked_at.get(key, 0.0) < self._check_interval:
+            return self._entries[key]
+
+        with self._lock:
+            sig = file_signature(key)
+            if key not in self._entries or self._signatures.get(key) != sig:
+                self._entries[key] = _load(key, sig) if sig else None
+                self._signatures[key] = sig
+            self._checked_at[key] = time.monotonic()
+            return self._entries[key]
+
+    def status(self, model_dir: Optional[Path] = None) -> Dict[str, Any]:
+        """Loaded vs skipped targets for one model directory (loads it if needed)."""
+        loaded = self.get(model_dir)
+        if loaded is None:
+            return {"loaded": 0, "skipped": 0, "models": {}, "skipped_reasons": {}}
+        return {
+            "loaded": len(loaded.models),
+            "skipped": len(loaded.skipped),
+            "feature_source": loaded.feature_source,
+            "n_features": len(loaded.feature_names),
+            "models": loaded.artifact_stats,
+            "skipped_reasons": dict(loaded.skipped),
+        }
+
+    def invalidate(self, model_dir: Optional[Path] = None) -> None:
+        with self._lock:
+            if model_dir is None:
+                self._entries.clear()
+                self._signatures.clear()
+                self._checked_at.clear()
+            else:
+                key = Path(model_dir).resolve()
+                self._entries.pop(key, None)
+                self._signatures.pop(key, None)
+                self._checked_at.pop(key, None)
+
+
+_registry = DiseaseModelRegistry()
+
+
+def get_registry() -> DiseaseModelRegistry:
+    return _registry
@@ -0,0 +1,172 @@
+"""
+Export the trained food CNN for lightweight CPU serving.
+
+Usage:
+  python -m ml_model.training.export_food_cnn --format tflite --quantize dynamic
+  python -m ml_model.training.export_food_cnn --format tflite --quantize int8 --calibration 200
+  python -m ml_model.training.export_food_cnn --format onnx
+
+Quantization modes (TFLite):
+  none     float32 weights and activations
+  dynamic  int8 weights, float activations (no calibration data needed)
+  int8     full-integer weights and activations, calibrated on training images
+
+Calibration and evaluation images come from the training layout
+(<data_dir>/<class_name>/*.jpg), using the same 80/20 split as training.
+After export the Keras model and the exported model are compared on the
+held-out images. The report (top-1 agreement, accuracy of each, accuracy
+delta, p50/p95 latency at batch 1, size on disk) is printed and written to
+<model_dir>/export_report.json.
+
+Exported models have two outputs, class probabilities and the pooled
+backbone embedding, so the serving kNN index (food_index) works with every
+backend.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+from ml_model.training.food_backends import (
+    ONNX_FILE,
+    TFLITE_FILE,
+    KerasBackend,
+    dual_output_model,
+    load_backend,
+    load_class_names,
+    top1_agreement,
+)
+from ml_model.training.image_shards import split_image_paths
+
+FOOD101_IMAGES = PROJECT_ROOT / "datasets" / "food101" / "images"
+SAVED_MODELS_DIR = PROJECT_ROOT / "ml_model" / "saved_models" / "food_cnn"
+
+
+def load_images(paths: List[Path]) -> np.ndarray:
+    from backend.utils.image_preprocessing import mobilenetv2_input_from_bytes
+
+    return np.stack([mobilenetv2_input_from_bytes(p.read_bytes()) for p in paths]).astype(np.float32)
+
+
+def convert_tflite(model, quantize: str, calibration: np.ndarray) -> bytes:
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize in ("dynamic", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == "int8":
+        if len(calibration) == 0:
+            raise SystemExit("int8 quantization needs calibration images (--data_dir)")
+
+        def representative() -> Iterator[List[np.ndarray]]:
+            for img in calibration:
+                yield [img[None, ...]]
+
+        converter.representative_dataset = representative
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+def convert_onnx(model, out_path: Path) -> None:
+    try:
+        import tensorflow as tf
+        import tf2onnx
+    except ImportError:
+        raise SystemExit("ONNX export needs tf2onnx: pip install tf2onnx onnxruntime")
+    spec = (tf.TensorSpec((None, *model.input_shape[1:]), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=str(out_path))
+
+
+def latency_ms(backend, sample: np.ndarray, runs: int = 30) -> Dict[str, float]:
+    backend.predict_batch(sample[:1])  # warm-up
+    times = []
+    for i in range(runs):
+        x = sample[i % len(sample)][None, ...]
+        t0 = time.perf_counter()
+        backend.predict_batch(x)
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return {"p50": float(np.percentile(times, 50)), "p95": float(np.percentile(times, 95))}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model_dir", type=str, default=str(SAVED_MODELS_DIR))
+    parser.add_argument("--data_dir", type=str, default=str(FOOD101_IMAGES))
+    parser.add_argument("--format", choices=("tflite", "onnx"), default="tflite")
+    parser.add_argument("--quantize", choices=("none", "dynamic", "int8"), default="dynamic")
+    parser.add_argument("--calibration", type=int, default=200, help="Training images used for int8 calibration")
+    parser.add_argument("--eval", type=int, default=300, help="Held-out images used for the comparison")
+    args = parser.parse_args(argv)
+
+    model_dir = Path(args.model_dir)
+    class_names = load_class_names(model_dir)
+    keras_backend = KerasBackend(model_dir)
+
+    data_dir = Path(args.data_dir)
+    train_paths, eval_paths = split_image_paths(data_dir, class_names) if data_dir.exists() else ([], [])
+    calibration = load_images(train_paths[: args.calibration]) if train_paths else np.zeros((0,))
+    eval_paths = eval_paths[: args.eval]
+
+    # Export probabilities + backbone embedding (for the kNN index) when the model has a backbone
+    serving_model = dual_output_model(keras_backend.model) or keras_backend.model
+
+    t0 = time.perf_counter()
+    if args.format == "tflite":
+        out_path = model_dir / TFLITE_FILE
+        out_path.write_bytes(convert_tflite(serving_model, args.quantize, calibration))
+    else:
+        if args.quantize != "none":
+            print("Note: --quantize applies to TFLite only; exporting float ONNX.")
+        out_path = model_dir / ONNX_FILE
+        convert_onnx(serving_model, out_path)
+    report = {
+        "format": args.format,
+        "quantize": args.quantize if args.format == "tflite" else "none",
+        "path": str(out_path),
+        "export_seconds": round(time.perf_counter() - t0, 2),
+        "size_bytes": out_path.stat().st_size,
+        "keras_size_bytes": sum(
+            p.stat().st_size for p in model_dir.glob("model.*") if p.suffix in (".keras", ".h5")
+        ),
+    }
+
+    exported = load_backend(args.format, model_dir)
+    if eval_paths:
+        x = load_images(eval_paths)
+        labels = np.array([class_names.index(p.parent.name) for p in eval_paths])
+        ref = np.concatenate([keras_backend.predict_batch(x[i:i + 32]) for i in range(0, len(x), 32)])
+        new = np.concatenate([exported.predict_batch(x[i:i + 32]) for i in range(0, len(x), 32)])
+        keras_acc = float(np.mean(ref.argmax(axis=1) == labels))
+        new_acc = float(np.mean(new.argmax(axis=1) == labels))
+        report.update(
+            {
+                "eval_images": len(eval_paths),
+                "top1_agreement": top1_agreement(ref, new),
+                "keras_accuracy": keras_acc,
+                "exported_accuracy": new_acc,
+                "accuracy_delta": new_acc - keras_acc,
+                "keras_latency_ms": latency_ms(keras_backend, x),
+                "exported_latency_ms": latency_ms(exported, x),
+            }
+        )
+    else:
+        print(f"No evaluation images under {data_dir}; skipping accuracy/latency comparison.")
+
+    (model_dir / "export_report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Pluggable CPU inference backends for the food CNN.
+
+Every backend takes a float32 batch (n, 224, 224, 3) already scaled to [-1, 1]
+(MobileNetV2 preprocessing) and returns (n, n_classes) probabilities.
+`warmup(batch_sizes)` runs dummy batches so tracing / allocation happens
+before the first real request:
+
+- KerasBackend:  model.keras / model.h5 via `load_saved_model` (full TensorFlow)
+- TFLiteBackend: model.tflite (float, dynamic-range or full-int8), run with
+                 `tflite_runtime` when installed, else `tf.lite`
+- OnnxBackend:   model.onnx via onnxruntime
+
+`load_backend("auto", model_dir)` picks the first artifact present in the
+order tflite, onnx, keras. Artifacts are produced by
+`python -m ml_model.training.export_food_cnn`.
+
+`model_digests(model_dir)` fingerprints the serving artifacts by content, and
+`served_artifact` names the one a backend was loaded from; the kNN index
+records the former so serving can tell whether it still matches the model.
+
+`predict_batch_full(x)` returns (probabilities, pooled backbone embeddings)
+from the same forward pass, for the embedding kNN index (food_index). Keras
+splits the model at its backbone; exported models carry the embedding as a
+second output (the wider one, 1280-d vs n_classes). Backends without it
+return None for the embeddings.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+INPUT_SHAPE = (224, 224, 3)
+TFLITE_FILE = "model.tflite"
+ONNX_FILE = "model.onnx"
+BACKENDS = ("auto", "keras", "tflite", "onnx")
+KERAS_FILES = ("model.keras", "model.h5")
+
+
+def dual_output_model(model):
+    """
+    (probs, embedding) Keras model sharing the classifier's weights: the input
+    runs through the backbone sub-model once and the layers after it (Dropout,
+    Dense) are re-applied to its output. None if there is no backbone sub-model.
+    """
+    import tensorflow as tf
+
+    layers = model.layers
+    idx = next((i for i, layer in enumerate(layers) if isinstance(layer, tf.keras.Model)), None)
+    if idx is None:
+        return None
+    inputs = tf.keras.layers.Input(shape=model.input_shape[1:])
+    emb = layers[idx](inputs, training=False)
+    x = emb
+    for layer in layers[idx + 1:]:
+        x = layer(x, training=False)
+    return tf.keras.Model(inputs, [x, emb])
+
+
+def _split_outputs(outputs: Sequence[np.ndarray]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    if len(outputs) < 2:
+        return np.asarray(outputs[0]), None
+    a, b = np.asarray(outputs[0]), np.asarray(outputs[1])
+    return (a, b) if a.shape[-1] <= b.shape[-1] else (b, a)
+
+
+def load_class_names(model_dir: Path) -> List[str]:
+    path = Path(model_dir) / "class_names.txt"
+    if not path.exists():
+        return []
+    return [line.strip() for line in open(path, encoding="utf-8") if line.strip()]
+
+
+class KerasBackend:
+    """
+    Keras model served through one `tf.function` with a fixed input signature
+    (batch dimension left open), so calls go straight to the traced graph
+    instead of building a `model.predict` data adapter per request.
+    """
+
+    name = "keras"
+
+    def __init__(self, model_dir: Path):
+        import tensorflow as tf
+
+        from ml_model.training.food_cnn import load_saved_model
+
+        self.model, _ = load_saved_model(Path(model_dir))
+        dual = dual_output_model(self.model)
+        model = dual if dual is not None else self.model
+        self.has_embeddings = dual is not None
+        self._fn = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec(shape=(None, *INPUT_SHAPE), dtype=tf.float32)],
+        )
+
+    def predict_batch_full(self, x: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        out = self._fn(np.asarray(x, dtype=np.float32))
+        if self.has_embeddings:
+            return out[0].numpy(), out[1].numpy()
+        return out.numpy(), None
+
+    def predict_batch(self, x: np.ndarray) -> np.ndarray:
+        return self.predict_batch_full(x)[0]
+
+    def warmup(self, batch_sizes: Sequence[int]) -> None:
+        for n in batch_sizes:
+            self.predict_batch(np.zeros((n, *INPUT_SHAPE), dtype=np.float32))
+
+
+def _tflite_interpreter(path: Path):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=str(path))
+
+
+class TFLiteBackend:
+    """
+    TFLite interpreters are not thread-safe and have a fixed input shape, so
+    calls are serialized and the input tensor is resized when the batch size
+    changes. Quantized int8/uint8 inputs and outputs are (de)quantized here.
+    """
+
+    name = "tflite"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._interp = _tflite_interpreter(self.path)
+        self._interp.allocate_tensors()
+        self._read_details()
+        self._batch = int(self._in["shape"][0])
+        self._lock = threading.Lock()
+
+    def _read_details(self) -> None:
+        self._in = self._interp.get_input_details()[0]
+        self._outs = self._interp.get_output_details()
+        self.has_embeddings = len(self._outs) > 1
+
+    @property
+    def quantized_input(self) -> bool:
+        return self._in["dtype"] in (np.int8, np.uint8)
+
+    def _quantize(self, x: np.ndarray) -> np.ndarray:
+        if not self.quantized_input:
+            return x.astype(np.float32, copy=False)
+        scale, zero = self._in["quantization"]
+        info = np.iinfo(self._in["dtype"])
+        return np.clip(np.round(x / scale + zero), info.min, info.max).astype(self._in["dtype"])
+
+    @staticmethod
+    def _dequantize(detail, y: np.ndarray) -> np.ndarray:
+        if detail["dtype"] not in (np.int8, np.uint8):
+            return y.astype(np.float32, copy=False)
+        scale, zero = detail["quantization"]
+        return (y.astype(np.float32) - zero) * scale
+
+    def predict_batch_full(self, x: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        with self._lock:
+            if x.shape[0] != self._batch:
+                self._interp.resize_tensor_input(self._in["index"], list(x.shape))
+                self._interp.allocate_tensors()
+                self._read_details()
+                self._batch = x.shape[0]
+            self._interp.set_tensor(self._in["index"], self._quantize(x))
+            self._interp.invoke()
+            return _split_outputs(
+                [self._dequantize(d, self._interp.get_tensor(d["index"])).copy() for d in self._outs]
+            )
+
+    def predict_batch(self, x: np.ndarray) -> np.ndarray:
+        return self.predict_batch_full(x)[0]
+
+    def warmup(self, batch_sizes: Sequence[int]) -> None:
+        # Ends on the largest size so steady-state batches rarely reallocate
+        for n in sorted(batch_sizes):
+            self.predict_batch(np.zeros((n, *INPUT_SHAPE), dtype=np.float32))
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, path: Path):
+        import onnxruntime as ort
+
+        self.path = Path(path)
+        self._session = ort.InferenceSession(str(self.path), providers=["CPUExecutionProvider"])
+        self._input = self._session.get_inputs()[0].name
+        self.has_embeddings = len(self._session.get_outputs()) > 1
+
+    def predict_batch_full(self, x: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        return _split_outputs(self._session.run(None, {self._input: x.astype(np.float32, copy=False)}))
+
+    def predict_batch(self, x: np.ndarray) -> np.ndarray:
+        return self.predict_batch_full(x)[0]
+
+    def warmup(self, batch_sizes: Sequence[int]) -> None:
+        for n in batch_sizes:
+            self.predict_batch(np.zeros((n, *INPUT_SHAPE), dtype=np.float32))
+
+
+def load_backend(kind: str, model_dir: Path):
+    """Instantiate backend `kind` (see BACKENDS) for the artifacts in model_dir."""
+    model_dir = Path(model_dir)
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown food model backend {kind!r}; expected one of {BACKENDS}")
+    if kind == "auto":
+        if (model_dir / TFLITE_FILE).exists():
+            kind = "tflite"
+        elif (model_dir / ONNX_FILE).exists():
+            kind = "onnx"
+        else:
+            kind = "keras"
+    if kind == "tflite":
+        return TFLiteBackend(model_dir / TFLITE_FILE)
+    if kind == "onnx":
+        return OnnxBackend(model_dir / ONNX_FILE)
+    return KerasBackend(model_dir)
+
+
+def served_artifact(backend, model_dir: Path) -> Optional[Path]:
+    """The file a loaded backend serves (TFLite/ONNX path, else the Keras model file), if known."""
+    path = getattr(backend, "path", None)
+    if path is not None:
+        return Path(path)
+    for name in KERAS_FILES:
+        if (Path(model_dir) / name).exists():
+            return Path(model_dir) / name
+    return None
+
+
+def artifact_digest(path: Path) -> str:
+    """sha256 of a model file's bytes (survives copies and checkouts, unlike mtimes)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def model_digests(model_dir: Path) -> Dict[str, str]:
+    """file name -> content digest for every serving artifact present in model_dir."""
+    model_dir = Path(model_dir)
+    return {
+        name: artifact_digest(model_dir / name)
+        for name in (TFLITE_FILE, ONNX_FILE, *KERAS_FILES)
+        if (model_dir / name).is_file()
+    }
+
+
+def top1_agreement(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Fraction of rows whose top-1 class matches."""
+    return float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1)))
@@ -0,0 +1,266 @@
+"""
+Frozen-backbone embedding cache and classifier-head retraining.
+
+Full training runs MobileNetV2 over every image on every epoch. When only the
+classifier changes (a new food class, relabelled images) the backbone output
+is the same every time, so this mode computes the pooled 1280-d embeddings
+once, stores them per class as memory-mapped artifacts, and trains just the
+Dropout + Dense head on them:
+
+    food_embeddings/
+      dal.emb/     manifest.json (image paths, backbone hash), embeddings.npy
+      roti.emb/
+      ...
+
+A class is re-embedded only when its image list or the backbone weights
+change, so adding a class costs one backbone pass over that class's images.
+The validation split is a stable hash of each image path (not a shuffle), so
+existing images stay on the same side when classes are added.
+
+After training, the head is attached back onto the backbone, giving the same
+Input -> MobileNetV2 -> Dropout -> Dense model as build_food_cnn, saved as
+model.keras + class_names.txt for serving or export_food_cnn.
+
+Usage:
+  python -m ml_model.training.food_embeddings --data_dir datasets/food101/images --epochs 20
+  python -m ml_model.training.food_embeddings --base_model ml_model/saved_models/food_cnn --out_dir /tmp/food_cnn_v2
+"""
+
+import argparse
+import json
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+from ml_model.training.artifacts import data_hash, is_artifact, load_artifact, read_manifest, save_artifact
+from ml_model.training.batch_predict_food import IMAGE_EXTS
+from ml_model.training.image_shards import get_class_names
+
+FOOD101_IMAGES = PROJECT_ROOT / "datasets" / "food101" / "images"
+SAVED_MODELS_DIR = PROJECT_ROOT / "ml_model" / "saved_models" / "food_cnn"
+EMBEDDINGS_DIR = PROJECT_ROOT / "datasets" / "food_embeddings"
+EMB_SUFFIX = ".emb"
+VAL_FRACTION = 0.2
+
+# paths -> (paths actually embedded, (n, dim) embeddings); unreadable images are dropped
+EmbedFn = Callable[[Sequence[str]], Tuple[List[str], np.ndarray]]
+
+
+def class_image_paths(class_dir: Path) -> List[str]:
+    return sorted(str(p) for p in Path(class_dir).iterdir() if p.suffix.lower() in IMAGE_EXTS)
+
+
+def is_val_path(path: str, fraction: float = VAL_FRACTION) -> bool:
+    """Stable split: depends only on the file name within its class, not on dataset order."""
+    key = "/".join(Path(path).parts[-2:])
+    return (zlib.crc32(key.encode("utf-8")) % 1000) < fraction * 1000
+
+
+def _is_fresh(path: Path, image_paths: Sequence[str], backbone_hash: str) -> bool:
+    if not is_artifact(path):
+        return False
+    manifest = read_manifest(path)
+    return manifest.get("backbone_hash") == backbone_hash and manifest.get("source_paths") == list(image_paths)
+
+
+def build_embedding_cache(
+    data_dir: Path,
+    out_dir: Path,
+    embed: EmbedFn,
+    *,
+    backbone_hash: str,
+) -> Dict[str, Any]:
+    """Embed every class whose images or backbone changed; returns per-class stats."""
+    data_dir, out_dir = Path(data_dir), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stats: Dict[str, Any] = {"embedded": {}, "reused": [], "seconds": 0.0}
+    t0 = time.perf_counter()
+    for name in get_class_names(data_dir):
+        paths = class_image_paths(data_dir / name)
+        target = out_dir / f"{name}{EMB_SUFFIX}"
+        if _is_fresh(target, paths, backbone_hash):
+            stats["reused"].append(name)
+            continue
+        kept, emb = embed(paths)
+        emb = np.asarray(emb, dtype=np.float16)
+        if len(emb) != len(kept):
+            raise ValueError(f"Embedding function returned {len(emb)} rows for {len(kept)} paths of {name!r}")
+        save_artifact(
+            target,
+            {"embeddings": emb},
+            kind="food-embeddings",
+            extra={"class_name": name, "paths": list(kept), "source_paths": paths, "backbone_hash": backbone_hash},
+        )
+        stats["embedded"][name] = len(paths)
+    stats["seconds"] = round(time.perf_counter() - t0, 2)
+    return stats
+
+
+def load_embedding_cache(
+    out_dir: Path, class_names: Sequence[str]
+) -> Tuple[Tuple[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+    """((x_train, y_train), (x_val, y_val)) from the per-class artifacts, in class_names order."""
+    xs, ys, val = [], [], []
+    for idx, name in enumerate(class_names):
+        art = load_artifact(Path(out_dir) / f"{name}{EMB_SUFFIX}", mmap=True)
+        emb = art.arrays["embeddings"]
+        xs.append(emb)
+        ys.append(np.full(len(emb), idx, dtype=np.int32))
+        val.append(np.fromiter((is_val_path(p) for p in art.manifest["paths"]), dtype=bool, count=len(emb)))
+    x = np.concatenate(xs).astype(np.float32)
+    y, is_val = np.concatenate(ys), np.concatenate(val)
+    return (x[~is_val], y[~is_val]), (x[is_val], y[is_val])
+
+
+# ---- TensorFlow side ----
+
+
+def load_backbone(base_model: Optional[Path] = None):
+    """MobileNetV2 feature extractor (pooled 1280-d): from a trained model_dir, else ImageNet weights."""
+    import tensorflow as tf
+
+    if base_model is not None:
+        from ml_model.training.food_cnn import load_saved_model
+
+        model, _ = load_saved_model(Path(base_model))
+        for layer in model.layers:
+            if isinstance(layer, tf.keras.Model):
+                return layer
+        raise ValueError(f"No backbone sub-model found in {base_model}")
+    from ml_model.training.food_cnn import INPUT_SHAPE
+
+    return tf.keras.applications.MobileNetV2(
+        input_shape=INPUT_SHAPE, include_top=False, weights="imagenet", pooling="avg"
+    )
+
+
+def backbone_hash(backbone) -> str:
+    return data_hash(*backbone.get_weights())
+
+
+def make_embed_fn(backbone, batch_size: int = 64) -> EmbedFn:
+    import tensorflow as tf
+
+    from ml_model.training.batch_predict_food import make_dataset
+
+    fn = tf.function(lambda x: backbone(x, training=False))
+
+    def embed(paths: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        kept: List[str] = []
+        out: List[np.ndarray] = []
+        for batch_paths, images in make_dataset(paths, batch_size):
+            kept.extend(p.decode("utf-8") for p in batch_paths.numpy())
+            out.append(fn(images).numpy())
+        dim = backbone.output_shape[-1]
+        return kept, (np.concatenate(out) if out else np.zeros((0, dim), dtype=np.float32))
+
+    return embed
+
+
+def build_head(embedding_dim: int, num_classes: int):
+    """Same Dropout + Dense head as build_food_cnn, on embeddings."""
+    import tensorflow as tf
+
+    inputs = tf.keras.layers.Input(shape=(embedding_dim,))
+    x = tf.keras.layers.Dropout(0.3)(inputs)
+    outputs = tf.keras.layers.Dense(num_classes, activation="softmax")(x)
+    head = tf.keras.Model(inputs, outputs)
+    head.compile(
+        optimizer=tf.keras.optimizers.Adam(1e-3),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return head
+
+
+def attach_head(backbone, head):
+    """Full image model: Input -> backbone -> Dropout -> Dense (weights from the trained head)."""
+    import tensorflow as tf
+
+    inputs = tf.keras.layers.Input(shape=backbone.input_shape[1:])
+    x = backbone(inputs, training=False)
+    x = tf.keras.layers.Dropout(0.3)(x)
+    dense = tf.keras.layers.Dense(head.output_shape[-1], activation="softmax")
+    outputs = dense(x)
+    dense.set_weights(head.layers[-1].get_weights())
+    model = tf.keras.Model(inputs, outputs)
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(1e-4),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return model
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data_dir", type=str, default=str(FOOD101_IMAGES))
+    parser.add_argument("--cache_dir", type=str, default=str(EMBEDDINGS_DIR))
+    parser.add_argument("--base_model", type=str, default=None, help="Trained model_dir to take the backbone from")
+    parser.add_argument("--out_dir", type=str, default=str(SAVED_MODELS_DIR))
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch_size", type=int, default=256, help="Head training batch size")
+    parser.add_argument("--embed_batch_size", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    import tensorflow as tf
+
+    data_dir = Path(args.data_dir)
+    class_names = get_class_names(data_dir)
+    if not class_names:
+        print(f"No class folders under {data_dir}.")
+        return 1
+
+    backbone = load_backbone(Path(args.base_model) if args.base_model else None)
+    bh = backbone_hash(backbone)
+    cache = build_embedding_cache(
+        data_dir, Path(args.cache_dir), make_embed_fn(backbone, args.embed_batch_size), backbone_hash=bh
+    )
+    print(f"Embeddings: {len(cache['embedded'])} classes embedded, {len(cache['reused'])} reused ({cache['seconds']}s)")
+
+    (x_train, y_train), (x_val, y_val) = load_embedding_cache(Path(args.cache_dir), class_names)
+    head = build_head(x_train.shape[1], len(class_names))
+    t0 = time.perf_counter()
+    head.fit(
+        x_train,
+        y_train,
+        validation_data=(x_val, y_val) if len(x_val) else None,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        callbacks=[tf.keras.callbacks.EarlyStopping(patience=3, monitor="val_accuracy", restore_best_weights=True)]
+        if len(x_val)
+        else [],
+        verbose=2,
+    )
+    head_seconds = round(time.perf_counter() - t0, 2)
+    # Scored after fit: EarlyStopping restored the best epoch, which is what gets saved
+    val_accuracy = float(head.evaluate(x_val, y_val, verbose=0, return_dict=True)["accuracy"]) if len(x_val) else 0.0
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    attach_head(backbone, head).save(out_dir / "model.keras")
+    (out_dir / "class_names.txt").write_text("\n".join(class_names), encoding="utf-8")
+    report = {
+        "classes": len(class_names),
+        "train_images": int(len(y_train)),
+        "val_images": int(len(y_val)),
+        "val_accuracy": val_accuracy,
+        "embed_seconds": cache["seconds"],
+        "head_seconds": head_seconds,
+        "backbone_hash": bh,
+    }
+    print(json.dumps(report, indent=2))
+    print(f"Model saved to {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Embedding kNN index over reference images of Indian dishes.
+
+The food CNN's softmax only knows its training classes, so an unseen dish is
+forced into the nearest Food-101 class and then mapped to a rough Indian dish
+by food_mapping.json. This index instead compares the image's pooled backbone
+embedding with embeddings of labelled reference photos:
+
+    datasets/indian_dish_refs/
+      Gulab Jamun/*.jpg
+      Masala Dosa/*.jpg
+      ...
+
+Reference embeddings are cached per dish (food_embeddings), so adding a dish
+means dropping its photos into a new folder and re-running the build; only
+that dish is embedded, and nothing is retrained. The compiled index is a
+memory-mapped artifact in the model dir:
+
+    food_index/  manifest.json (dish names, backbone hash, model digests), vectors.npy (L2-normalised), labels.npy
+
+Embeddings only mean something for the backbone that produced them, so the
+manifest records the content digest of every serving artifact in the model
+dir at build time. `index_matches_model` checks the artifact being served
+against it; serving skips a stale index (retrained or replaced model).
+
+`FoodEmbeddingIndex.search` is a single matrix-vector product (cosine
+similarity) plus an argpartition; results are per dish (best reference).
+
+Usage:
+  python -m ml_model.training.food_index --refs datasets/indian_dish_refs --model_dir ml_model/saved_models/food_cnn
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+from ml_model.training.artifacts import load_artifact, save_artifact
+from ml_model.training.food_embeddings import EMB_SUFFIX, build_embedding_cache
+from ml_model.training.image_shards import get_class_names
+
+REFERENCE_IMAGES = PROJECT_ROOT / "datasets" / "indian_dish_refs"
+REFERENCE_CACHE = PROJECT_ROOT / "datasets" / "indian_dish_refs_embeddings"
+SAVED_MODELS_DIR = PROJECT_ROOT / "ml_model" / "saved_models" / "food_cnn"
+INDEX_DIR = "food_index"
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+class FoodEmbeddingIndex:
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        labels: np.ndarray,
+        names: Sequence[str],
+        backbone_hash: str = "",
+        model_digests: Optional[Dict[str, str]] = None,
+    ):
+        self.vectors = vectors  # (n, d) float32, unit rows
+        self.labels = labels  # (n,) int32 index into names
+        self.names = list(names)
+        self.backbone_hash = backbone_hash
+        self.model_digests = dict(model_digests or {})  # serving artifact name -> sha256 at build time
+        # References are stored grouped by dish; each group's first row
+        self._starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        if len(self._starts) != len(self.names):
+            raise ValueError("Index references must be grouped by dish, with every dish present")
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @property
+    def dim(self) -> int:
+        return int(self.vectors.shape[1])
+
+    @classmethod
+    def build(
+        cls,
+        per_dish: Sequence[Tuple[str, np.ndarray]],
+        backbone_hash: str = "",
+        model_digests: Optional[Dict[str, str]] = None,
+    ) -> "FoodEmbeddingIndex":
+        kept = [(name, emb) for name, emb in per_dish if len(emb)]
+        vectors = _normalize(np.concatenate([emb for _, emb in kept]))
+        labels = np.concatenate([np.full(len(emb), i, dtype=np.int32) for i, (_, emb) in enumerate(kept)])
+        return cls(vectors, labels, [name for name, _ in kept], backbone_hash, model_digests)
+
+    def search_batch(self, queries: np.ndarray, k: int = 3) -> List[List[Tuple[str, float]]]:
+        """Top-k dishes per query by cosine similarity (best reference per dish)."""
+        q = _normalize(np.atleast_2d(queries))
+        sims = q @ self.vectors.T  # (m, n)
+        per_dish = np.maximum.reduceat(sims, self._starts, axis=1)  # best reference per dish
+        k = min(k, len(self.names))
+        top = np.argpartition(-per_dish, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(per_dish, top, axis=1).argsort(axis=1)[:, ::-1]
+        top = np.take_along_axis(top, order, axis=1)
+        return [[(self.names[j], float(row[j])) for j in idx] for idx, row in zip(top, per_dish)]
+
+    def search(self, query: np.ndarray, k: int = 3) -> List[Tuple[str, float]]:
+        return self.search_batch(query[None, :], k)[0]
+
+    def save(self, path: Path) -> Path:
+        return save_artifact(
+            path,
+            {"vectors": self.vectors, "labels": self.labels},
+            kind="food-embedding-index",
+            extra={"names": self.names, "backbone_hash": self.backbone_hash, "model_digests": self.model_digests},
+        )
+
+    @classmethod
+    def load(cls, path: Path, *, mmap: bool = True) -> "FoodEmbeddingIndex":
+        art = load_artifact(path, mmap=mmap)
+        return cls(
+            art.arrays["vectors"],
+            art.arrays["labels"],
+            art.manifest["names"],
+            art.manifest.get("backbone_hash", ""),
+            art.manifest.get("model_digests"),
+        )
+
+
+def index_matches_model(index: FoodEmbeddingIndex, artifact: Optional[Path]) -> Tuple[bool, str]:
+    """(usable, reason): does the served model file match what the index was built with?"""
+    from ml_model.training.food_backends import artifact_digest
+
+    if artifact is None:
+        return True, "served artifact unknown; not checked"
+    if not index.model_digests:
+        return False, "index records no model digests (built before they were tracked); rebuild it"
+    recorded = index.model_digests.get(artifact.name)
+    if recorded is None:
+        return False, f"index was built without {artifact.name}; rebuild it against the serving model"
+    if recorded != artifact_digest(artifact):
+        return False, f"{artifact.name} changed since the index was built; rebuild it"
+    return True, "match"
+
+
+def compile_index(
+    cache_dir: Path,
+    dish_names: Sequence[str],
+    backbone_hash: str = "",
+    model_digests: Optional[Dict[str, str]] = None,
+) -> FoodEmbeddingIndex:
+    per_dish = []
+    for name in dish_names:
+        art = load_artifact(Path(cache_dir) / f"{name}{EMB_SUFFIX}", mmap=True)
+        per_dish.append((name, np.asarray(art.arrays["embeddings"], dtype=np.float32)))
+    return FoodEmbeddingIndex.build(per_dish, backbone_hash, model_digests)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refs", type=str, default=str(REFERENCE_IMAGES), help="<refs>/<Dish Name>/*.jpg")
+    parser.add_argument("--cache_dir", type=str, default=str(REFERENCE_CACHE))
+    parser.add_argument("--model_dir", type=str, default=str(SAVED_MODELS_DIR), help="Serving model (its backbone)")
+    parser.add_argument("--out", type=str, default=None, help="Index dir (default: <model_dir>/food_index)")
+    args = parser.parse_args(argv)
+
+    from ml_model.training.food_backends import model_digests
+    from ml_model.training.food_embeddings import backbone_hash, load_backbone, make_embed_fn
+
+    refs = Path(args.refs)
+    dishes = get_class_names(refs)
+    if not dishes:
+        print(f"No dish folders under {refs}.")
+        return 1
+    backbone = load_backbone(Path(args.model_dir))
+    bh = backbone_hash(backbone)
+    stats = build_embedding_cache(refs, Path(args.cache_dir), make_embed_fn(backbone), backbone_hash=bh)
+    index = compile_index(Path(args.cache_dir), dishes, bh, model_digests(Path(args.model_dir)))
+    out = Path(args.out) if args.out else Path(args.model_dir) / INDEX_DIR
+    index.save(out)
+    print(json.dumps({
+        "dishes": len(index.names),
+        "references": len(index),
+        "embedded": stats["embedded"],
+        "reused": len(stats["reused"]),
+        "path": str(out),
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Flattened-array inference for the disease RandomForest models.
+
+`FlatForest.from_sklearn` copies every tree of a fitted
+RandomForestClassifier into one set of contiguous arrays (feature, threshold,
+left, right, value) with per-tree root offsets. `predict_proba` then walks
+all trees for a whole batch at once: each step is a handful of NumPy gathers
+over an (n_rows, n_trees) node-index matrix, repeated `max_depth` times.
+
+Leaves point at themselves, so rows that reach a leaf early simply stay put.
+Forests persist as memory-mappable artifact directories (see artifacts.py):
+loading runs no pickle code, does not import scikit-learn, and worker
+processes share the arrays through the page cache. `FlatForest` exposes the
+parts of the sklearn API the predict functions use (`predict`,
+`predict_proba`, `classes_`, `n_features_in_`, `feature_importances_`).
+"""
+
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+from ml_model.training.artifacts import Artifact, load_artifact, save_artifact
+
+FOREST_SUFFIX = ".forest"
+ARTIFACT_KIND = "random_forest"
+# Rows per traversal chunk; bounds the (rows, trees) temporaries
+CHUNK_ROWS = 8192
+
+
+@dataclass
+class FlatForest:
+    feature: np.ndarray  # int32 (n_nodes,), 0 for leaves
+    threshold: np.ndarray  # float64 (n_nodes,)
+    left: np.ndarray  # int32 (n_nodes,), self-index for leaves
+    right: np.ndarray  # int32 (n_nodes,), self-index for leaves
+    value: np.ndarray  # float64 (n_classes, n_nodes), per-node class probabilities
+    roots: np.ndarray  # int32 (n_trees,)
+    classes_: np.ndarray
+    feature_importances_: np.ndarray
+    max_depth: int
+    artifact: Optional[Artifact] = field(default=None, repr=False, compare=False)
+    _children: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def n_features_in_(self) -> int:
+        return int(len(self.feature_importances_))
+
+    @property
+    def n_trees(self) -> int:
+        return int(len(self.roots))
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "FlatForest":
+        """Flatten a fitted RandomForestClassifier (or any estimator with `estimators_` of trees)."""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est in forest.estimators_:
+            t = est.tree_
+            n = t.node_count
+            is_leaf = t.children_left < 0
+            idx = np.arange(n, dtype=np.int64) + offset
+            left = np.where(is_leaf, idx, t.children_left + offset)
+            right = np.where(is_leaf, idx, t.children_right + offset)
+            val = t.value[:, 0, :].astype(float)
+            totals = val.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+
+            features.append(np.where(is_leaf, 0, t.feature))
+            thresholds.append(np.where(is_leaf, 0.0, t.threshold))
+            lefts.append(left)
+            rights.append(right)
+            values.append(val / totals)
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, int(t.max_depth))
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.ascontiguousarray(np.concatenate(values).T, dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes_=np.asarray(forest.classes_),
+            feature_importances_=np.asarray(forest.feature_importances_, dtype=float),
+            max_depth=max_depth,
+        )
+
+    @property
+    def children(self) -> np.ndarray:
+        """children[2 * node + go_left]: right/left interleaved for one flat gather per level."""
+        if self._children is None:
+            self._children = np.stack([self.right, self.left], axis=1).ravel().astype(np.int64)
+        return self._children
+
+    # ---------- inference ----------
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows, n_trees) leaf index reached by each row in each tree."""
+        children = self.children
+        flat_x = X.ravel()
+        row_base = (np.arange(X.shape[0], dtype=np.int64) * X.shape[1])[:, None]
+        # flat gathers via np.take beat 2-D fancy indexing
+        nodes = np.broadcast_to(self.roots.astype(np.int64), (X.shape[0], self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_left = np.take(flat_x, row_base + np.take(self.feature, nodes)) <= np.take(self.threshold, nodes)
+            nodes = np.take(children, 2 * nodes + go_left)
+        return nodes
+
+    def predict_proba(self, X) -> np.ndarray:
+        # sklearn trees split on float32 inputs; match that for exact parity
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected an (n, {self.n_features_in_}) array, got shape {X.shape}")
+        out = np.empty((X.shape[0], self.value.shape[0]), dtype=float)
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            leaves = self._leaves(X[start:start + CHUNK_ROWS])
+            for k in range(self.value.shape[0]):
+                out[start:start + len(leaves), k] = np.take(self.value[k], leaves).mean(axis=1)
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    # ---------- persistence ----------
+
+    def save(
+        self,
+        path: Union[str, Path],
+        *,
+        feature_names=None,
+        metrics: Optional[Mapping[str, Any]] = None,
+        train_data_hash: Optional[str] = None,
+    ) -> Path:
+        return save_artifact(
+            path,
+            {
+                "feature": self.feature,
+                "threshold": self.threshold,
+                "left": self.left,
+                "right": self.right,
+                "children": self.children,
+                "value": self.value,
+                "roots": self.roots,
+                "classes": self.classes_,
+                "feature_importances": self.feature_importances_,
+            },
+            kind=ARTIFACT_KIND,
+            feature_names=feature_names,
+            metrics=metrics,
+            train_data_hash=train_data_hash,
+            extra={"max_depth": int(self.max_depth), "n_trees": self.n_trees},
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path], *, mmap: bool = True, verify: bool = False) -> "FlatForest":
+        art = load_artifact(path, mmap=mmap, verify=verify)
+        if art.manifest.get("kind") != ARTIFACT_KIND:
+            raise ValueError(f"{path} is a {art.manifest.get('kind')!r} artifact, not {ARTIFACT_KIND!r}")
+        a: Dict[str, np.ndarray] = art.arrays
+        forest = cls(
+            feature=a["feature"],
+            threshold=a["threshold"],
+            left=a["left"],
+            right=a["right"],
+            value=a["value"],
+            roots=a["roots"],
+            classes_=a["classes"],
+            feature_importances_=a["feature_importances"],
+            max_depth=int(art.manifest["max_depth"]),
+            artifact=art,
+        )
+        forest._children = a["children"]
+        return forest
+
+
+def forest_path(model_dir: Path, target: str) -> Path:
+    return Path(model_dir) / f"{target}{FOREST_SUFFIX}"
+
+
+def export_forests(model_dir: Optional[Path] = None) -> list:
+    """Convert every legacy `<target>.pkl` in model_dir to a `<target>.forest` artifact."""
+    import pickle
+
+    from ml_model.training.disease_model import SAVED_MODEL_DIR, TARGETS, _load_metadata
+
+    model_dir = Path(model_dir or SAVED_MODEL_DIR)
+    meta = _load_metadata(model_dir) or {}
+    written = []
+    for target in TARGETS:
+        pkl_path = model_dir / f"{target}.pkl"
+        if not pkl_path.exists():
+            continue
+        with open(pkl_path, "rb") as f:
+            clf = pickle.load(f)
+        written.append(
+            FlatForest.from_sklearn(clf).save(
+                forest_path(model_dir, target),
+                feature_names=list(getattr(clf, "feature_names_in_", meta.get("feature_names") or [])) or None,
+                metrics=(meta.get("metrics") or {}).get(target),
+            )
+        )
+    return written
+
+
+if __name__ == "__main__":
+    for p in export_forests(Path(sys.argv[1]) if len(sys.argv) > 1 else None):
+        print(f"Wrote {p}")
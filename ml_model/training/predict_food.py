@@ -2,10 +2,12 @@
 Predict food class from an image using the trained CNN.
 
 Loads model from ml_model/saved_models/food_cnn/ and returns
-class name (and optional nutrient lookup key).
+class name (and optional nutrient lookup key). The model is loaded once per
+model_dir; for many images use ml_model.training.batch_predict_food.
 """
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -18,6 +20,13 @@ import numpy as np
 SAVED_MODEL_DIR = PROJECT_ROOT / "ml_model" / "saved_models" / "food_cnn"
 
 
+@lru_cache(maxsize=2)
+def _load(model_dir: Path):
+    from ml_model.training.food_cnn import load_saved_model
+
+    return load_saved_model(model_dir)
+
+
 def predict_food_from_image(
     image_path: str | Path,
     model_dir: Optional[Path] = None,
@@ -34,20 +43,20 @@ def predict_food_from_image(
         (e.g. normalize to food_name_normalized: lowercase, spaces).
     """
     import tensorflow as tf
-    from ml_model.training.food_cnn import load_saved_model, IMG_SIZE
+    from ml_model.training.food_cnn import IMG_SIZE
 
-    model_dir = Path(model_dir or SAVED_MODEL_DIR)
-    model, class_names = load_saved_model(model_dir)
+    model_dir = Path(model_dir or SAVED_MODEL_DIR).resolve()
+    model, class_names = _load(model_dir)
     if not class_names:
         return "unknown", 0.0
 
     img = tf.io.read_file(str(image_path))
-    img = tf.io.decode_jpeg(img, channels=3)
+    img = tf.io.decode_image(img, channels=3, expand_animations=False)
     img = tf.image.resize(img, IMG_SIZE)
     img = tf.keras.applications.mobilenet_v2.preprocess_input(img)
     img = tf.expand_dims(img, 0)
 
-    logits = model.predict(img, verbose=0)
+    logits = model(img, training=False).numpy()
     idx = int(np.argmax(logits[0]))
     conf = float(logits[0][idx])
     name = class_names[idx] if idx < len(class_names) else "unknown"
@@ -2,9 +2,10 @@
 Train disease prediction models from unified_food_features.csv.
 
 Run after Step 1 preprocessing:
-  python -m ml_model.training.train_disease_model
+  python -m ml_model.training.train_disease_model [--jobs N] [--cv K]
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -12,10 +13,15 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from ml_model.training.disease_model import load_unified_data, train_disease_models, UNIFIED_CSV
+from ml_model.training.disease_model import load_unified_data, train_disease_models, UNIFIED_CSV, SAVED_MODEL_DIR, _load_metadata
 
 
-def main() -> int:
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1, help="CPU budget; targets train in parallel (-1 = all cores)")
+    parser.add_argument("--cv", type=int, default=0, help="Stratified k-fold cross-validation folds (0 = off)")
+    args = parser.parse_args(argv)
+
     if not UNIFIED_CSV.exists():
         print("Run preprocessing first: python -m ml_model.preprocessing.run_preprocessing")
         return 1
@@ -23,7 +29,7 @@ def main() -> int:
     if df.empty:
         print("Unified CSV is empty. Add datasets and re-run preprocessing.")
         return 1
-    results = train_disease_models(df)
+    results = train_disease_models(df, n_jobs=args.jobs, cv_folds=args.cv)
     if not results:
         print("No targets with enough variation to train. Add disease/diet data and re-run.")
         return 1
@@ -33,6 +39,16 @@ def main() -> int:
         rec = meta.get("recall", 0)
         f1 = meta.get("f1", 0)
         print(f"  {target}: acc={acc:.4f} precision={prec:.4f} recall={rec:.4f} f1={f1:.4f}")
+        cv = meta.get("cv")
+        if cv:
+            print(f"    {cv['folds']}-fold cv: acc={cv['accuracy_mean']:.4f}±{cv['accuracy_std']:.4f} f1={cv['f1_mean']:.4f}±{cv['f1_std']:.4f}")
+    timings = (_load_metadata(SAVED_MODEL_DIR) or {}).get("timings", {})
+    if timings:
+        print(
+            f"  timings: prepare={timings['prepare_seconds']:.2f}s fit={timings['fit_seconds']:.2f}s "
+            f"(workers={timings['workers']}, n_jobs/worker={timings['inner_jobs']}) "
+            f"save={timings['save_seconds']:.2f}s total={timings['total_seconds']:.2f}s"
+        )
     print("Models saved to ml_model/saved_models/disease_model/")
     return 0
 
@@ -7,6 +7,10 @@ Usage:
 
   python -m ml_model.training.train_food_cnn --epochs 5 --batch_size 32
 
+  For repeated runs, decode the images once into shards and train from them:
+  python -m ml_model.training.image_shards --data_dir datasets/food101/images
+  python -m ml_model.training.train_food_cnn --shards datasets/food101_shards --cache
+
 If Food-101 is not present, run with --dry_run to print expected structure.
 """
 
@@ -63,7 +67,7 @@ def make_dataset_simple(
 
     def decode_and_preprocess(path, label):
         img = tf.io.read_file(path)
-        img = tf.io.decode_jpeg(img, channels=3)
+        img = tf.io.decode_image(img, channels=3, expand_animations=False)
         img = tf.image.resize(img, IMG_SIZE)
         img = tf.keras.applications.mobilenet_v2.preprocess_input(img)
         return img, tf.cast(label, tf.int32)
@@ -126,6 +130,8 @@ def main():
     parser.add_argument("--data_dir",   type=str, default=str(FOOD101_IMAGES))
     parser.add_argument("--epochs",     type=int, default=5)
     parser.add_argument("--batch_size", type=int, default=32)
+    parser.add_argument("--shards",     type=str, default=None, help="Preprocessed shards dir (image_shards)")
+    parser.add_argument("--cache",      action="store_true", help="Cache decoded shard images in memory")
     parser.add_argument("--dry_run",    action="store_true")
     args = parser.parse_args()
 
@@ -140,12 +146,22 @@ def main():
             print(f"  {f}")
         return 0
 
-    train_ds, class_names = make_dataset_simple(
-        data_dir, args.batch_size, True, "train"
-    )
-    val_ds, _ = make_dataset_simple(
-        data_dir, args.batch_size, False, "val"
-    )
+    if args.shards:
+        from ml_model.training.image_shards import make_shard_dataset
+
+        train_ds, class_names = make_shard_dataset(
+            Path(args.shards), "train", args.batch_size, True, cache=args.cache
+        )
+        val_ds, _ = make_shard_dataset(
+            Path(args.shards), "val", args.batch_size, False, cache=args.cache
+        )
+    else:
+        train_ds, class_names = make_dataset_simple(
+            data_dir, args.batch_size, True, "train"
+        )
+        val_ds, _ = make_dataset_simple(
+            data_dir, args.batch_size, False, "val"
+        )
 
     if train_ds is None or not class_names:
         print("No data found. Use --dry_run to see expected structure.")